@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from .models import ApartmentDailyStats, ApartmentMonthlyStats
+
+
+class RollupStatsAdmin(admin.ModelAdmin):
+    list_filter = ['city']
+    search_fields = ['apartment__name', 'city']
+    list_select_related = ['apartment']
+    
+    def has_add_permission(self, request):
+        # Rows are derived from reservations; edit those instead
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ApartmentDailyStats)
+class ApartmentDailyStatsAdmin(RollupStatsAdmin):
+    list_display = ['apartment', 'date', 'city', 'nights_sold', 'room_revenue', 'services_revenue', 'check_ins']
+    date_hierarchy = 'date'
+
+
+@admin.register(ApartmentMonthlyStats)
+class ApartmentMonthlyStatsAdmin(RollupStatsAdmin):
+    list_display = ['apartment', 'month', 'city', 'nights_sold', 'room_revenue', 'services_revenue', 'check_ins']
+    date_hierarchy = 'month'
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.analytics'
+    
+    def ready(self):
+        """Import signals when the app is ready."""
+        import apps.analytics.signals  # noqa
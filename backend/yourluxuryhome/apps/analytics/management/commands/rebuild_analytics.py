@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analytics.rollups import rebuild_all
+
+
+def _date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily analytics rollups from reservations (run nightly to repair any drift)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_date, help='First night to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=_date, help='Night after the last one to rebuild (YYYY-MM-DD)')
+    
+    def handle(self, *args, **options):
+        start, end = options['start'], options['end']
+        if (start is None) != (end is None):
+            raise CommandError('Pass both --start and --end, or neither to rebuild everything.')
+        written = rebuild_all(start, end)
+        self.stdout.write(f'Rebuilt analytics: {written} daily row(s) written')
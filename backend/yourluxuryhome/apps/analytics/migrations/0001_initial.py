@@ -0,0 +1,55 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('apartments', '0006_alter_roomconnection_hotspot_color'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApartmentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month the period falls in')),
+                ('city', models.CharField(help_text="Apartment's city when the row was built", max_length=100)),
+                ('nights_sold', models.PositiveIntegerField(default=0)),
+                ('room_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Booking-time price of the nights sold', max_digits=12)),
+                ('services_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Service revenue of stays checking in during the period', max_digits=12)),
+                ('check_ins', models.PositiveIntegerField(default=0)),
+                ('date', models.DateField()),
+                ('apartment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='apartments.apartment')),
+            ],
+            options={
+                'verbose_name': 'Apartment daily stats',
+                'verbose_name_plural': 'Apartment daily stats',
+                'indexes': [models.Index(fields=['date'], name='daily_stats_date_idx'), models.Index(fields=['city', 'date'], name='daily_stats_city_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('apartment', 'date'), name='unique_apartment_daily_stats')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ApartmentMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month the period falls in')),
+                ('city', models.CharField(help_text="Apartment's city when the row was built", max_length=100)),
+                ('nights_sold', models.PositiveIntegerField(default=0)),
+                ('room_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Booking-time price of the nights sold', max_digits=12)),
+                ('services_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Service revenue of stays checking in during the period', max_digits=12)),
+                ('check_ins', models.PositiveIntegerField(default=0)),
+                ('apartment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='apartments.apartment')),
+            ],
+            options={
+                'verbose_name': 'Apartment monthly stats',
+                'verbose_name_plural': 'Apartment monthly stats',
+                'indexes': [models.Index(fields=['month'], name='monthly_stats_month_idx')],
+                'constraints': [models.UniqueConstraint(fields=('apartment', 'month'), name='unique_apartment_monthly_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class RollupStats(models.Model):
+    """Booked nights and revenue of one apartment over a period."""
+    apartment = models.ForeignKey(
+        'apartments.Apartment',
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    month = models.DateField(help_text=_('First day of the month the period falls in'))
+    city = models.CharField(max_length=100, help_text=_("Apartment's city when the row was built"))
+    nights_sold = models.PositiveIntegerField(default=0)
+    room_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                       help_text=_('Booking-time price of the nights sold'))
+    services_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                           help_text=_('Service revenue of stays checking in during the period'))
+    check_ins = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+
+
+class ApartmentDailyStats(RollupStats):
+    """
+    One row per apartment and night sold.
+    
+    Rows are derived from confirmed and completed reservations and are rebuilt
+    whenever those change, so reports never touch the reservation tables.
+    """
+    date = models.DateField()
+    
+    class Meta:
+        verbose_name = _('Apartment daily stats')
+        verbose_name_plural = _('Apartment daily stats')
+        constraints = [
+            models.UniqueConstraint(fields=['apartment', 'date'], name='unique_apartment_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['date'], name='daily_stats_date_idx'),
+            models.Index(fields=['city', 'date'], name='daily_stats_city_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.apartment_id} on {self.date}"
+
+
+class ApartmentMonthlyStats(RollupStats):
+    """Monthly totals of ApartmentDailyStats, kept in step with it for month-aligned reports."""
+    
+    class Meta:
+        verbose_name = _('Apartment monthly stats')
+        verbose_name_plural = _('Apartment monthly stats')
+        constraints = [
+            models.UniqueConstraint(fields=['apartment', 'month'], name='unique_apartment_monthly_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['month'], name='monthly_stats_month_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.apartment_id} in {self.month:%Y-%m}"
@@ -0,0 +1,91 @@
+from calendar import monthrange
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, F, Sum
+
+from apps.apartments.models import Apartment
+
+from .models import ApartmentDailyStats, ApartmentMonthlyStats
+
+
+GROUPINGS = ['apartment', 'city', 'month']
+
+CENT = Decimal('0.01')
+
+
+def _month_days(start, end):
+    """Return ``{first day of month: nights of that month inside [start, end)}``."""
+    days = {}
+    month = start.replace(day=1)
+    while month < end:
+        next_month = month + timedelta(days=monthrange(month.year, month.month)[1])
+        days[month] = (min(next_month, end) - max(month, start)).days
+        month = next_month
+    return days
+
+
+def performance_report(start, end, group_by, city=None, apartment_id=None):
+    """
+    Occupancy, ADR and revenue for nights in [start, end), grouped by apartment, city or month.
+    
+    Sold nights and revenue come from the rollup tables only: the monthly table
+    when the range starts and ends on the first of a month, the daily table
+    otherwise. Available nights are every night of the range for each
+    apartment in scope, counted from the apartments table in one grouped query.
+    """
+    if start.day == 1 and end.day == 1:
+        stats = ApartmentMonthlyStats.objects.filter(month__gte=start, month__lt=end)
+    else:
+        stats = ApartmentDailyStats.objects.filter(date__gte=start, date__lt=end)
+    apartments = Apartment.objects.all()
+    if city:
+        stats = stats.filter(city=city)
+        apartments = apartments.filter(city=city)
+    if apartment_id:
+        stats = stats.filter(apartment_id=apartment_id)
+        apartments = apartments.filter(pk=apartment_id)
+    
+    nights = (end - start).days
+    if group_by == 'apartment':
+        stats = stats.values(key=F('apartment_id'))
+        available = {str(pk): nights for pk in apartments.values_list('pk', flat=True)}
+    elif group_by == 'city':
+        stats = stats.values(key=F('city'))
+        available = {row['city']: row['count'] * nights for row in apartments.values('city').annotate(count=Count('pk'))}
+    else:
+        stats = stats.values(key=F('month'))
+        apartment_count = apartments.count()
+        available = {month: days * apartment_count for month, days in _month_days(start, end).items()}
+    
+    totals = stats.annotate(
+        nights_sold=Sum('nights_sold'),
+        room_revenue=Sum('room_revenue'),
+        services_revenue=Sum('services_revenue'),
+        check_ins=Sum('check_ins'),
+    ).order_by('key')
+    
+    rows = []
+    for row in totals:
+        key = row['key']
+        if isinstance(key, date):
+            key = key.strftime('%Y-%m')
+            nights_available = available.get(row['key'], 0)
+        else:
+            key = str(key)
+            nights_available = available.get(key, 0)
+        nights_sold = row['nights_sold'] or 0
+        rows.append({
+            'key': key,
+            'nights_sold': nights_sold,
+            'nights_available': nights_available,
+            'occupancy_rate': (
+                Decimal(nights_sold) / nights_available if nights_available else Decimal('0')
+            ).quantize(Decimal('0.0001')),
+            'adr': (row['room_revenue'] / nights_sold if nights_sold else Decimal('0')).quantize(CENT),
+            'room_revenue': row['room_revenue'],
+            'services_revenue': row['services_revenue'],
+            'revenue': row['room_revenue'] + row['services_revenue'],
+            'check_ins': row['check_ins'],
+        })
+    return rows
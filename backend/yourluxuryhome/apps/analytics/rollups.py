@@ -0,0 +1,154 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, Min, Q, Sum
+
+from apps.reservations.models import Reservation, ReservationStatus
+
+from .models import ApartmentDailyStats, ApartmentMonthlyStats
+
+
+# Reservations that count as sold nights
+BOOKED_STATUSES = [ReservationStatus.CONFIRMED, ReservationStatus.COMPLETED]
+
+CENT = Decimal('0.01')
+
+
+def _night_prices(stay):
+    """Return ``{date: price}`` for every night of a stay, from its booking-time snapshot."""
+    if stay['nightly_rates']:
+        return {date.fromisoformat(night['date']): Decimal(night['price']) for night in stay['nightly_rates']}
+    
+    # Reservations made before price snapshots: spread the stored price evenly
+    nights = (stay['check_out_date'] - stay['check_in_date']).days
+    if nights <= 0:
+        return {}
+    price = stay['accommodation_price']
+    if price is None:
+        price = (stay['total_price'] or Decimal('0')) - (stay['services_price'] or Decimal('0'))
+    price /= nights
+    return {stay['check_in_date'] + timedelta(days=i): price.quantize(CENT) for i in range(nights)}
+
+
+def next_month(month):
+    return (month.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _rebuild_months(first_month, last_month, apartment_ids):
+    """Recompute the monthly rows of the given months from the daily rows."""
+    daily = ApartmentDailyStats.objects.filter(month__gte=first_month, month__lte=last_month)
+    monthly = ApartmentMonthlyStats.objects.filter(month__gte=first_month, month__lte=last_month)
+    if apartment_ids is not None:
+        daily = daily.filter(apartment_id__in=apartment_ids)
+        monthly = monthly.filter(apartment_id__in=apartment_ids)
+    
+    totals = daily.values('apartment_id', 'month').annotate(
+        city_name=Max('city'),
+        total_nights=Sum('nights_sold'),
+        total_room_revenue=Sum('room_revenue'),
+        total_services_revenue=Sum('services_revenue'),
+        total_check_ins=Sum('check_ins'),
+    ).order_by()
+    monthly.delete()
+    ApartmentMonthlyStats.objects.bulk_create(
+        [
+            ApartmentMonthlyStats(
+                apartment_id=row['apartment_id'], month=row['month'], city=row['city_name'],
+                nights_sold=row['total_nights'], room_revenue=row['total_room_revenue'],
+                services_revenue=row['total_services_revenue'], check_ins=row['total_check_ins']
+            )
+            for row in totals
+        ],
+        batch_size=1000
+    )
+
+
+def rebuild_rollups(start, end, apartment_ids=None):
+    """
+    Recompute the rollup rows for nights in [start, end), optionally for some apartments only.
+    
+    The daily rows in the range are deleted and rebuilt from the reservations
+    overlapping it, then the monthly rows of the months touched are re-summed
+    from the daily rows, all in one transaction, so running it again is
+    harmless. Returns the number of daily rows written.
+    """
+    stays = Reservation.objects.filter(
+        status__in=BOOKED_STATUSES,
+        check_in_date__lt=end,
+        check_out_date__gt=start
+    )
+    existing = ApartmentDailyStats.objects.filter(date__gte=start, date__lt=end)
+    if apartment_ids is not None:
+        stays = stays.filter(apartment_id__in=apartment_ids)
+        existing = existing.filter(apartment_id__in=apartment_ids)
+    
+    rows = defaultdict(lambda: {'nights_sold': 0, 'room_revenue': Decimal('0'),
+                                'services_revenue': Decimal('0'), 'check_ins': 0})
+    cities = {}
+    stays = stays.values(
+        'apartment_id', 'apartment__city', 'check_in_date', 'check_out_date',
+        'nightly_rates', 'accommodation_price', 'services_price', 'total_price'
+    )
+    for stay in stays.iterator(chunk_size=2000):
+        apartment_id = stay['apartment_id']
+        cities[apartment_id] = stay['apartment__city']
+        for night, price in _night_prices(stay).items():
+            if start <= night < end:
+                row = rows[apartment_id, night]
+                row['nights_sold'] += 1
+                row['room_revenue'] += price
+        if start <= stay['check_in_date'] < end:
+            row = rows[apartment_id, stay['check_in_date']]
+            row['check_ins'] += 1
+            row['services_revenue'] += stay['services_price'] or Decimal('0')
+    
+    with transaction.atomic():
+        existing.delete()
+        ApartmentDailyStats.objects.bulk_create(
+            [
+                ApartmentDailyStats(
+                    apartment_id=apartment_id, date=night, month=night.replace(day=1),
+                    city=cities[apartment_id], **values
+                )
+                for (apartment_id, night), values in rows.items()
+            ],
+            batch_size=1000
+        )
+        _rebuild_months(start.replace(day=1), (end - timedelta(days=1)).replace(day=1), apartment_ids)
+    return len(rows)
+
+
+def rebuild_all(start=None, end=None):
+    """
+    Rebuild the rollup rows between ``start`` and ``end`` one calendar month at a time.
+    
+    Pass both dates or neither. Without dates the full reservation history is
+    rebuilt and rows outside it are dropped. Working a month at a time keeps
+    memory flat and each transaction short. Returns the number of daily rows
+    written.
+    """
+    if start is None and end is None:
+        span = Reservation.objects.filter(status__in=BOOKED_STATUSES).aggregate(
+            first=Min('check_in_date'), last=Max('check_out_date')
+        )
+        start, end = span['first'], span['last']
+        daily, monthly = ApartmentDailyStats.objects.all(), ApartmentMonthlyStats.objects.all()
+        if start is not None:
+            daily = daily.filter(Q(date__lt=start) | Q(date__gte=end))
+            monthly = monthly.filter(
+                Q(month__lt=start.replace(day=1)) | Q(month__gt=(end - timedelta(days=1)).replace(day=1))
+            )
+        daily.delete()
+        monthly.delete()
+        if start is None:
+            return 0
+    
+    written = 0
+    window_start = start
+    while window_start < end:
+        window_end = min(next_month(window_start), end)
+        written += rebuild_rollups(window_start, window_end)
+        window_start = window_end
+    return written
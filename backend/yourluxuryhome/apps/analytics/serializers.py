@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+
+class PerformanceRowSerializer(serializers.Serializer):
+    """One group of the performance report (an apartment, a city or a month)."""
+    key = serializers.CharField()
+    nights_sold = serializers.IntegerField()
+    nights_available = serializers.IntegerField()
+    occupancy_rate = serializers.DecimalField(max_digits=5, decimal_places=4)
+    adr = serializers.DecimalField(max_digits=12, decimal_places=2, help_text='Average daily rate')
+    room_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    services_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    check_ins = serializers.IntegerField()
@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.reservations.models import Reservation, ReservationService
+from apps.reservations.signals import reservations_transitioned
+
+from .tasks import refresh_stays
+
+
+def _stay(apartment_id, check_in, check_out):
+    return [str(apartment_id), check_in.isoformat(), check_out.isoformat()]
+
+
+def _refresh(stays):
+    """Queue a rollup refresh in the caller's transaction, so it only runs if the change commits."""
+    stays = {tuple(stay) for stay in stays}
+    if stays:
+        refresh_stays.enqueue(stays=[list(stay) for stay in sorted(stays)])
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_previous_stay(sender, instance, raw, update_fields=None, **kwargs):
+    """Remember the stored apartment and dates, so a moved stay also clears its old nights."""
+    instance._previous_stay = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {'apartment', 'check_in_date', 'check_out_date'} & set(update_fields):
+        return
+    instance._previous_stay = Reservation.objects.filter(pk=instance.pk).values_list(
+        'apartment_id', 'check_in_date', 'check_out_date'
+    ).first()
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def refresh_reservation_rollups(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    stays = [_stay(instance.apartment_id, instance.check_in_date, instance.check_out_date)]
+    previous = getattr(instance, '_previous_stay', None)
+    if previous:
+        stays.append(_stay(*previous))
+    _refresh(stays)
+
+
+@receiver(post_save, sender=ReservationService)
+@receiver(post_delete, sender=ReservationService)
+def refresh_service_rollups(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        reservation = instance.reservation
+    except Reservation.DoesNotExist:
+        # Deleted together with its reservation, whose own signal covers the stay
+        return
+    _refresh([_stay(reservation.apartment_id, reservation.check_in_date, reservation.check_out_date)])
+
+
+@receiver(reservations_transitioned)
+def refresh_transitioned_rollups(sender, reservation_ids, **kwargs):
+    stays = Reservation.objects.filter(pk__in=reservation_ids).values_list(
+        'apartment_id', 'check_in_date', 'check_out_date'
+    )
+    _refresh([_stay(*stay) for stay in stays])
@@ -0,0 +1,12 @@
+from datetime import date
+
+from apps.tasks.registry import task
+
+from .rollups import rebuild_rollups
+
+
+@task('analytics.refresh_stays')
+def refresh_stays(stays):
+    """Rebuild the rollup rows of each ``[apartment_id, check_in, check_out]`` stay."""
+    for apartment_id, check_in, check_out in stays:
+        rebuild_rollups(date.fromisoformat(check_in), date.fromisoformat(check_out), apartment_ids=[apartment_id])
@@ -0,0 +1,158 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.analytics.models import ApartmentDailyStats, ApartmentMonthlyStats
+from apps.apartments.models import Apartment, ApartmentAvailability
+from apps.reservations.models import Reservation, ReservationService, ReservationStatus
+from apps.reservations.pricing import price_stay
+from apps.services.models import Service, ServiceType
+from apps.tasks.worker import Worker
+from apps.users.models import User
+
+
+class AnalyticsRollupTests(APITestCase):
+    def setUp(self):
+        """Create an admin, a guest and three apartments in two cities."""
+        self.admin_user = User.objects.create_superuser(
+            username='analyticsadmin',
+            email='analyticsadmin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(
+            username='analyticsuser',
+            email='analytics@example.com',
+            password='userpassword'
+        )
+        self.vienna = Apartment.objects.create(
+            name='Vienna Analytics Apartment', description='-', address='1 Ring',
+            city='Vienna', country='Austria', price_per_night=Decimal('100.00')
+        )
+        self.vienna_two = Apartment.objects.create(
+            name='Second Vienna Analytics Apartment', description='-', address='2 Ring',
+            city='Vienna', country='Austria', price_per_night=Decimal('80.00')
+        )
+        self.paris = Apartment.objects.create(
+            name='Paris Analytics Apartment', description='-', address='1 Rue',
+            city='Paris', country='France', price_per_night=Decimal('200.00')
+        )
+        ApartmentAvailability.objects.create(
+            apartment=self.vienna, date=date(2030, 1, 2), status='available', price_override=Decimal('150.00')
+        )
+
+    def _reservation(self, apartment, check_in, check_out, reservation_status=ReservationStatus.CONFIRMED):
+        reservation = Reservation(
+            user=self.user, apartment=apartment, check_in_date=check_in,
+            check_out_date=check_out, status=reservation_status
+        )
+        price_stay(reservation)
+        reservation.save()
+        return reservation
+
+    def _report(self, group_by, start='2030-01-01', end='2030-03-01', **params):
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(
+            reverse('analytics:performance'), {'start': start, 'end': end, 'group_by': group_by, **params}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['key']: row for row in response.data['results']}
+
+    def test_changes_refresh_rollups_through_the_worker(self):
+        """Booking, adding a service and cancelling are reflected once the worker has run."""
+        reservation = self._reservation(self.vienna, date(2030, 1, 1), date(2030, 1, 4))
+        Worker().run(burst=True)
+        nights = ApartmentDailyStats.objects.filter(apartment=self.vienna).order_by('date')
+        self.assertEqual([row.room_revenue for row in nights], [Decimal('100.00'), Decimal('150.00'), Decimal('100.00')])
+
+        service = Service.objects.create(name='Chef', price=Decimal('60.00'), type=ServiceType.objects.create(name='Food'))
+        ReservationService.objects.create(reservation=reservation, service=service, unit_price=Decimal('60.00'),
+                                          price=Decimal('60.00'))
+        Reservation.objects.filter(pk=reservation.pk).update(services_price=Decimal('60.00'))
+        Worker().run(burst=True)
+        self.assertEqual(nights.all()[0].services_revenue, Decimal('60.00'))
+
+        Reservation.objects.filter(pk=reservation.pk).transition(ReservationStatus.CANCELLED)
+        Worker().run(burst=True)
+        self.assertFalse(ApartmentDailyStats.objects.exists())
+
+    def test_moved_stay_clears_old_nights(self):
+        """Changing a reservation's dates removes the nights it no longer covers."""
+        reservation = self._reservation(self.vienna, date(2030, 1, 10), date(2030, 1, 12))
+        reservation.check_in_date, reservation.check_out_date = date(2030, 2, 10), date(2030, 2, 11)
+        price_stay(reservation)
+        reservation.save()
+        Worker().run(burst=True)
+        self.assertEqual(list(ApartmentDailyStats.objects.values_list('date', flat=True)), [date(2030, 2, 10)])
+
+    def test_pending_reservations_are_not_sold_nights(self):
+        """Only confirmed and completed reservations count."""
+        self._reservation(self.paris, date(2030, 1, 5), date(2030, 1, 7), ReservationStatus.PENDING)
+        Worker().run(burst=True)
+        self.assertFalse(ApartmentDailyStats.objects.exists())
+
+    def test_report_groupings(self):
+        """Occupancy, ADR and revenue per city, month and apartment."""
+        self._reservation(self.vienna, date(2030, 1, 1), date(2030, 1, 4))
+        self._reservation(self.vienna_two, date(2030, 2, 1), date(2030, 2, 3))
+        self._reservation(self.paris, date(2030, 1, 30), date(2030, 2, 2))
+        Worker().run(burst=True)
+
+        by_city = self._report('city')
+        self.assertEqual(by_city['Vienna']['nights_sold'], 5)
+        self.assertEqual(by_city['Vienna']['nights_available'], 2 * 59)
+        self.assertEqual(by_city['Vienna']['room_revenue'], '510.00')
+        self.assertEqual(by_city['Vienna']['adr'], '102.00')
+        self.assertEqual(by_city['Paris']['occupancy_rate'], '0.0508')
+
+        by_month = self._report('month')
+        self.assertEqual(by_month['2030-01']['nights_sold'], 5)
+        self.assertEqual(by_month['2030-01']['nights_available'], 3 * 31)
+        self.assertEqual(by_month['2030-02']['revenue'], '360.00')
+
+        by_apartment = self._report('apartment', city='Vienna')
+        self.assertEqual(set(by_apartment), {str(self.vienna.pk), str(self.vienna_two.pk)})
+
+        # Ranges not aligned to months are read from the daily rollups
+        unaligned = self._report('city', start='2030-01-02', end='2030-02-02')
+        self.assertEqual(unaligned['Vienna']['nights_sold'], 3)
+        self.assertEqual(unaligned['Vienna']['nights_available'], 2 * 31)
+        self.assertEqual(unaligned['Paris']['check_ins'], 1)
+
+    def test_report_is_admin_only_and_validated(self):
+        """Guests are refused and bad parameters are rejected."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('analytics:performance')
+        self.assertEqual(
+            self.client.get(url, {'start': '2030-01-01', 'end': '2030-02-01'}).status_code,
+            status.HTTP_403_FORBIDDEN
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        for params in [{}, {'start': '2030-02-01', 'end': '2030-01-01'},
+                       {'start': '2030-01-01', 'end': '2030-02-01', 'group_by': 'country'},
+                       {'start': '2030-01-01', 'end': '2030-02-01', 'apartment': 'nope'}]:
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command_matches_incremental_rollups(self):
+        """A full rebuild produces the same rows as the incremental refreshes."""
+        self._reservation(self.vienna, date(2030, 1, 1), date(2030, 1, 4))
+        self._reservation(self.paris, date(2030, 1, 30), date(2030, 2, 2))
+        Worker().run(burst=True)
+        fields = ['apartment_id', 'month', 'nights_sold', 'room_revenue', 'services_revenue', 'check_ins']
+        incremental = [
+            list(model.objects.order_by(*fields).values(*fields))
+            for model in (ApartmentDailyStats, ApartmentMonthlyStats)
+        ]
+
+        ApartmentDailyStats.objects.create(apartment=self.paris, date=date(2029, 6, 1), month=date(2029, 6, 1), city='Paris', nights_sold=1)
+        out = StringIO()
+        call_command('rebuild_analytics', stdout=out)
+        self.assertIn('6 daily row(s) written', out.getvalue())
+        self.assertEqual([
+            list(model.objects.order_by(*fields).values(*fields))
+            for model in (ApartmentDailyStats, ApartmentMonthlyStats)
+        ], incremental)
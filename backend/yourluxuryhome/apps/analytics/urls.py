@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import PerformanceReportView
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('performance/', PerformanceReportView.as_view(), name='performance'),
+]
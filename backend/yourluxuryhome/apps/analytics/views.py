@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .reports import GROUPINGS, performance_report
+from .serializers import PerformanceRowSerializer
+
+
+class PerformanceReportView(APIView):
+    """
+    Occupancy rate, ADR and revenue per apartment, city or month (admin only).
+    
+    Expects ``start`` and ``end`` (exclusive, YYYY-MM-DD) and ``group_by``
+    (apartment, city or month); ``city`` and ``apartment`` narrow the scope.
+    Reads the monthly rollup table for month-aligned ranges and the daily one otherwise.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        try:
+            start = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+            end = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {"error": "start and end (YYYY-MM-DD) are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        group_by = request.query_params.get('group_by', 'month')
+        if group_by not in GROUPINGS:
+            return Response(
+                {"error": f"group_by must be one of: {', '.join(GROUPINGS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end <= start:
+            return Response({"error": "end must be after start."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days > 1096:
+            return Response({"error": "The range cannot exceed 3 years."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            apartment_id = uuid.UUID(request.query_params['apartment']) if request.query_params.get('apartment') else None
+        except ValueError:
+            return Response({"error": "apartment must be a valid id."}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rows = performance_report(
+            start, end, group_by,
+            city=request.query_params.get('city'),
+            apartment_id=apartment_id
+        )
+        return Response({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'group_by': group_by,
+            'results': PerformanceRowSerializer(rows, many=True).data,
+        })
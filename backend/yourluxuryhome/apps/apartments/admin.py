@@ -20,6 +20,16 @@ from .models import (
     VirtualTourHotspot
 )
 
+def preview_html(obj, width, height):
+    """List thumbnail of an image or panorama, never the full-size original."""
+    src = obj.thumbnail.url if obj.thumbnail else obj.placeholder
+    if src:
+        return format_html(
+            '<img src="{}" width="{}" height="{}" loading="lazy" style="object-fit: cover; border-radius: 4px;" />',
+            src, width, height
+        )
+    return "No Image"
+
 class ApartmentImageInline(admin.TabularInline):
     model = ApartmentImage
     extra = 1
@@ -118,12 +128,17 @@ class ApartmentAmenityAdmin(admin.ModelAdmin):
 
 @admin.register(ApartmentImage)
 class ApartmentImageAdmin(admin.ModelAdmin):
-    list_display = ['apartment', 'caption', 'is_primary', 'created_at']
+    list_display = ['apartment', 'image_preview', 'caption', 'is_primary', 'created_at']
     list_filter = ['is_primary', 'apartment']
     search_fields = ['caption', 'apartment__name']
     list_editable = ['is_primary']
     readonly_fields = ['created_at']
 
+    def image_preview(self, obj):
+        """Small image preview for list display."""
+        return preview_html(obj, 80, 60)
+    image_preview.short_description = "Preview"
+
 @admin.register(ApartmentReview)
 class ApartmentReviewAdmin(admin.ModelAdmin):
     list_display = ['apartment', 'user', 'rating', 'created_at']
@@ -233,12 +248,7 @@ class VirtualTourRoomAdmin(admin.ModelAdmin):
     
     def image_preview(self, obj):
         """Small image preview for list display."""
-        if obj.panoramic_image:
-            return format_html(
-                '<img src="{}" width="80" height="40" style="object-fit: cover; border-radius: 4px;" />',
-                obj.panoramic_image.url
-            )
-        return "No Image"
+        return preview_html(obj, 80, 40)
     image_preview.short_description = "Preview"
     
     def image_preview_large(self, obj):
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApartmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.apartments'
+    
+    def ready(self):
+        """Import signals when the app is ready."""
+        import apps.apartments.signals  # noqa
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.apartments.models import ApartmentImage, VirtualTourRoom
+from apps.apartments.tours import bump_tour_version
+from apps.common.images import refresh_previews
+
+
+class Command(BaseCommand):
+    help = 'Generate missing or outdated thumbnails and placeholders for apartment images and panoramas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Number of rows loaded per query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        images = sum(
+            refresh_previews(image, 'image')
+            for image in ApartmentImage.objects.exclude(image='').iterator(chunk_size=batch_size)
+        )
+        rooms = 0
+        for room in VirtualTourRoom.objects.exclude(panoramic_image='').iterator(chunk_size=batch_size):
+            if refresh_previews(room, 'panoramic_image'):
+                bump_tour_version(room.apartment_id)
+                rooms += 1
+        self.stdout.write(f'Generated previews for {images} image(s) and {rooms} panorama(s)')
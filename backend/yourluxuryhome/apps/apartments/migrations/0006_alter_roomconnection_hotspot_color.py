@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0005_hotspot_navigation_enhancements'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='roomconnection',
+            name='hotspot_color',
+            field=models.CharField(default='#d9b38a', help_text='Hotspot color in hex', max_length=7),
+        ),
+    ]
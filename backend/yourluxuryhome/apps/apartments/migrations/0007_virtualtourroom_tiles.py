@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0006_alter_roomconnection_hotspot_color'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='virtualtourroom',
+            name='tiles',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
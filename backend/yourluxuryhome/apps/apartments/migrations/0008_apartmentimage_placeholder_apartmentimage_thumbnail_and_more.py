@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0007_virtualtourroom_tiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apartmentimage',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='apartmentimage',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='apartment_images/'),
+        ),
+        migrations.AddField(
+            model_name='virtualtourroom',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='virtualtourroom',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='virtual_tour/panoramas/'),
+        ),
+    ]
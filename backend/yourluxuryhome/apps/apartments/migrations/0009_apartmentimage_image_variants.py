@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0008_apartmentimage_placeholder_apartmentimage_thumbnail_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apartmentimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -107,13 +107,10 @@ class Apartment(models.Model):
     
     def is_booked(self, check_in_date, check_out_date):
         # Check if apartment is booked for the given dates
-        from apps.reservations.models import Reservation, ReservationStatus
+        from apps.reservations.models import Reservation
         
-        overlapping_reservations = Reservation.objects.filter(
-            apartment=self,
-            status__in=[ReservationStatus.PENDING, ReservationStatus.CONFIRMED],
-            check_in_date__lt=check_out_date,
-            check_out_date__gt=check_in_date
+        overlapping_reservations = Reservation.objects.filter(apartment=self).overlapping(
+            check_in_date, check_out_date
         )
         
         return overlapping_reservations.exists()
@@ -124,6 +121,11 @@ class ApartmentImage(models.Model):
     image = models.ImageField(upload_to='apartment_images/')
     caption = models.CharField(max_length=200, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
+    # Generated from the image on upload (see apps.common.images)
+    thumbnail = models.ImageField(upload_to='apartment_images/', blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)
+    # Responsive variant manifest written by the common.build_image_variants task
+    image_variants = models.JSONField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -224,6 +226,12 @@ class VirtualTourRoom(models.Model):
     initial_yaw = models.FloatField(default=0.0, help_text=_('Initial horizontal viewing angle in degrees'))
     initial_pitch = models.FloatField(default=0.0, help_text=_('Initial vertical viewing angle in degrees'))
     
+    # Generated from the panorama on upload (see apps.common.images)
+    thumbnail = models.ImageField(upload_to='virtual_tour/panoramas/', blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)
+    # Cube tile manifest written by the apartments.build_panorama_tiles task (see apps.apartments.panoramas)
+    tiles = models.JSONField(blank=True, null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
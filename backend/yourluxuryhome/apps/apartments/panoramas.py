@@ -0,0 +1,164 @@
+"""
+Cube faces and tile pyramids for equirectangular panoramas.
+
+An uploaded panorama is projected onto the six faces of a cube, and each face
+is cut into ``TILE_SIZE`` tiles at every level of ``LEVEL_FACE_SIZES`` up to
+the panorama's native face size (a quarter of its width). Viewers start from a
+small preview strip of all faces and fetch only the tiles in view at the level
+matching their zoom, instead of the whole original.
+
+Tiles are stored next to the original: ``<name>_tiles/<size>/<face>_<x>_<y>.jpg``,
+``x`` counting columns and ``y`` rows, plus ``<name>_tiles/preview.jpg`` with the
+faces stacked top to bottom in ``FACES`` order.
+
+Faces use the usual cube map orientation, with y pointing up: the front face
+looks at the middle of the panorama, right/back/left follow turning right, the
+bottom edge of the up face and the top edge of the down face meet the front face.
+
+The projection uses Pillow's mesh transform: every face is split into cells,
+each mapped bilinearly to the source quadrilateral under its corners. Cells are
+subdivided until their corners span at most ``MAX_CELL_SPAN`` radians, which
+keeps the mapping accurate near the poles, and the source is padded
+horizontally so cells crossing the panorama's left/right seam stay contiguous.
+"""
+import math
+import posixpath
+
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from apps.common.images import encode, replace_file
+
+
+FACES = ('f', 'r', 'b', 'l', 'u', 'd')
+TILE_SIZE = 512
+# Face edge of each level: the first suits phones, the larger ones desktops and zooming
+LEVEL_FACE_SIZES = (512, 1024, 2048)
+PREVIEW_FACE_SIZE = 256
+JPEG_QUALITY = 85
+
+MAX_CELL_SPAN = math.radians(3)
+INITIAL_CELLS = 16
+MIN_CELL_SIZE = 2
+
+
+def _direction(face, a, b):
+    """Direction through face coordinates ``a`` (rightwards) and ``b`` (downwards), both in [-1, 1]."""
+    if face == 'f':
+        return a, -b, 1.0
+    if face == 'r':
+        return 1.0, -b, -a
+    if face == 'b':
+        return -a, -b, -1.0
+    if face == 'l':
+        return -1.0, -b, a
+    if face == 'u':
+        return a, 1.0, b
+    return a, -1.0, -b
+
+
+def _angles(face, a, b, fallback_longitude=0.0):
+    x, y, z = _direction(face, a, b)
+    horizontal = math.hypot(x, z)
+    longitude = math.atan2(x, z) if horizontal > 1e-12 else fallback_longitude
+    return longitude, math.atan2(y, horizontal)
+
+
+def _mesh(face, size, width, height):
+    """Return Pillow MESH data mapping a ``size`` face onto a source padded by ``width / 2`` on each side."""
+    mesh = []
+    scale = 2 / size
+
+    def add(x0, y0, x1, y1):
+        center, _ = _angles(face, (x0 + x1) * scale / 2 - 1, (y0 + y1) * scale / 2 - 1)
+        # Upper left, lower left, lower right, upper right, as MESH expects
+        corners = [
+            _angles(face, x * scale - 1, y * scale - 1, center)
+            for x, y in ((x0, y0), (x0, y1), (x1, y1), (x1, y0))
+        ]
+        # Unwrap longitudes around the cell's center so cells crossing the seam stay contiguous
+        longitudes = [lon + 2 * math.pi * round((center - lon) / (2 * math.pi)) for lon, _ in corners]
+        latitudes = [lat for _, lat in corners]
+        span = max(max(longitudes) - min(longitudes), max(latitudes) - min(latitudes))
+        if span > MAX_CELL_SPAN and x1 - x0 >= 2 * MIN_CELL_SIZE:
+            xm, ym = (x0 + x1) // 2, (y0 + y1) // 2
+            for box in ((x0, y0, xm, ym), (xm, y0, x1, ym), (x0, ym, xm, y1), (xm, ym, x1, y1)):
+                add(*box)
+            return
+        quad = []
+        for lon, lat in zip(longitudes, latitudes):
+            quad += [(lon / (2 * math.pi) + 1) * width, (0.5 - lat / math.pi) * height]
+        mesh.append(((x0, y0, x1, y1), quad))
+
+    step = size / INITIAL_CELLS
+    edges = [round(i * step) for i in range(INITIAL_CELLS + 1)]
+    for y0, y1 in zip(edges, edges[1:]):
+        for x0, x1 in zip(edges, edges[1:]):
+            add(x0, y0, x1, y1)
+    return mesh
+
+
+def cube_faces(panorama, size):
+    """Project an equirectangular ``panorama`` onto cube faces of ``size`` pixels; returns ``{face: image}``."""
+    panorama = panorama.convert('RGB')
+    width, height = panorama.size
+    padded = Image.new('RGB', (2 * width, height))
+    for offset in (-width // 2, width // 2, width + width // 2):
+        padded.paste(panorama, (offset, 0))
+    return {
+        face: padded.transform((size, size), Image.Transform.MESH, _mesh(face, size, width, height),
+                               resample=Image.Resampling.BILINEAR)
+        for face in FACES
+    }
+
+
+def level_sizes(width):
+    """Face sizes of the levels generated for a panorama ``width`` pixels wide."""
+    native = width // 4
+    return [size for size in LEVEL_FACE_SIZES if size <= native] or [native]
+
+
+def _save(storage, path, image):
+    replace_file(storage, path, encode(image, 'JPEG', JPEG_QUALITY))
+
+
+def build_tiles(name, storage=default_storage):
+    """
+    Generate the cube tiles and preview for the panorama stored as ``name``; returns the tile manifest.
+
+    The manifest records the source it was built from, the tile directory
+    (``base``, a storage name), the tile size, face order, preview file and,
+    per level, the face size and number of tiles along each face edge.
+    """
+    with storage.open(name) as source:
+        panorama = Image.open(source)
+        panorama.load()
+    base = f'{posixpath.splitext(name)[0]}_tiles'
+    sizes = level_sizes(panorama.width)
+    faces = cube_faces(panorama, sizes[-1])
+
+    levels = []
+    for size in sizes:
+        count = math.ceil(size / TILE_SIZE)
+        for face, image in faces.items():
+            scaled = image if image.width == size else image.resize((size, size), Image.Resampling.LANCZOS)
+            for y in range(count):
+                for x in range(count):
+                    box = (x * TILE_SIZE, y * TILE_SIZE, min((x + 1) * TILE_SIZE, size), min((y + 1) * TILE_SIZE, size))
+                    _save(storage, f'{base}/{size}/{face}_{x}_{y}.jpg', scaled.crop(box))
+        levels.append({'size': size, 'tiles': count})
+
+    preview = Image.new('RGB', (PREVIEW_FACE_SIZE, PREVIEW_FACE_SIZE * len(FACES)))
+    for index, face in enumerate(FACES):
+        thumbnail = faces[face].resize((PREVIEW_FACE_SIZE, PREVIEW_FACE_SIZE), Image.Resampling.LANCZOS)
+        preview.paste(thumbnail, (0, index * PREVIEW_FACE_SIZE))
+    _save(storage, f'{base}/preview.jpg', preview)
+
+    return {
+        'source': name,
+        'base': base,
+        'tile_size': TILE_SIZE,
+        'faces': list(FACES),
+        'preview': 'preview.jpg',
+        'levels': levels,
+    }
@@ -4,6 +4,7 @@ from .models import (
     Apartment, ApartmentCategory, ApartmentAmenity, ApartmentImage, ApartmentReview, ApartmentAvailability,
     VirtualTourRoom, RoomConnection, VirtualTourHotspot
 )
+from apps.common.fields import ImageVariantsField
 from apps.services.serializers import ServiceListSerializer
 from datetime import date, timedelta
 
@@ -21,9 +22,12 @@ class ApartmentAmenitySerializer(serializers.ModelSerializer):
 
 
 class ApartmentImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField('image')
+    
     class Meta:
         model = ApartmentImage
-        fields = ['id', 'image', 'caption', 'is_primary']
+        fields = ['id', 'image', 'thumbnail', 'placeholder', 'image_variants', 'caption', 'is_primary']
+        read_only_fields = ['thumbnail', 'placeholder']
 
 
 class ApartmentReviewSerializer(serializers.ModelSerializer):
@@ -57,11 +61,11 @@ class ApartmentListSerializer(serializers.ModelSerializer):
     def get_primary_image(self, obj):
         primary_image = obj.images.filter(is_primary=True).first()
         if primary_image:
-            return ApartmentImageSerializer(primary_image).data
+            return ApartmentImageSerializer(primary_image, context=self.context).data
         # If no primary image, return the first image
         first_image = obj.images.first()
         if first_image:
-            return ApartmentImageSerializer(first_image).data
+            return ApartmentImageSerializer(first_image, context=self.context).data
         return None
     
     def get_average_rating(self, obj):
@@ -75,6 +79,20 @@ class ApartmentListSerializer(serializers.ModelSerializer):
         return obj.amenities.count()
 
 
+class FlexibleStaySerializer(ApartmentListSerializer):
+    """Apartment card annotated with the check-in dates found by a flexible-date search."""
+    earliest_check_in = serializers.SerializerMethodField()
+    available_check_ins = serializers.ListField(
+        child=serializers.DateField(), source='flexible_check_ins', read_only=True
+    )
+    
+    class Meta(ApartmentListSerializer.Meta):
+        fields = ApartmentListSerializer.Meta.fields + ['earliest_check_in', 'available_check_ins']
+    
+    def get_earliest_check_in(self, obj):
+        return obj.flexible_check_ins[0].isoformat()
+
+
 class ApartmentDetailSerializer(serializers.ModelSerializer):
     category = ApartmentCategorySerializer(read_only=True)
     amenities = ApartmentAmenitySerializer(many=True, read_only=True)
@@ -274,33 +292,51 @@ class VirtualTourRoomSerializer(serializers.ModelSerializer):
     connections_from = RoomConnectionSerializer(many=True, read_only=True)
     hotspots = VirtualTourHotspotSerializer(many=True, read_only=True)
     panoramic_image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    tiles = serializers.SerializerMethodField()
     
     class Meta:
         model = VirtualTourRoom
         fields = [
             'id', 'name', 'room_type', 'panoramic_image', 'panoramic_image_url',
+            'thumbnail_url', 'placeholder',
             'description', 'order', 'is_starting_room', 'initial_yaw', 'initial_pitch',
-            'connections_from', 'hotspots'
+            'connections_from', 'hotspots', 'tiles'
         ]
     
+    def _absolute_url(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
     def get_panoramic_image_url(self, obj):
         if obj.panoramic_image and hasattr(obj.panoramic_image, 'url'):
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.panoramic_image.url)
-            return obj.panoramic_image.url
+            return self._absolute_url(obj.panoramic_image.url)
         return None
-
-
-class VirtualTourSerializer(serializers.Serializer):
-    apartment_id = serializers.UUIDField(read_only=True)
-    apartment_name = serializers.CharField(read_only=True)
-    rooms = VirtualTourRoomSerializer(many=True, read_only=True)
-    starting_room = VirtualTourRoomSerializer(read_only=True)
-    room_count = serializers.IntegerField(read_only=True)
     
-    class Meta:
-        fields = ['apartment_id', 'apartment_name', 'rooms', 'starting_room', 'room_count']
+    def get_thumbnail_url(self, obj):
+        if obj.thumbnail:
+            return self._absolute_url(obj.thumbnail.url)
+        return None
+    
+    def get_tiles(self, obj):
+        """
+        Tile manifest of the panorama, or None until the tiles are generated.
+        
+        Tile URLs follow ``url_template``, with ``{size}`` one of the level
+        sizes, ``{face}`` one of ``faces`` and ``{x}``/``{y}`` the tile column
+        and row, from 0 to the level's ``tiles`` minus one.
+        """
+        tiles = obj.tiles
+        if not tiles or not obj.panoramic_image or tiles['source'] != obj.panoramic_image.name:
+            return None
+        base_url = self._absolute_url(obj.panoramic_image.storage.url(tiles['base']))
+        return {
+            'preview_url': f"{base_url}/{tiles['preview']}",
+            'url_template': base_url + '/{size}/{face}_{x}_{y}.jpg',
+            'tile_size': tiles['tile_size'],
+            'faces': tiles['faces'],
+            'levels': tiles['levels'],
+        }
 
 
 class VirtualTourRoomCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,102 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from .models import ApartmentAvailability
+
+
+# Calendar statuses that make a night unbookable, in addition to reservations.
+BLOCKED_AVAILABILITY_STATUSES = ['pending', 'booked', 'maintenance']
+
+
+def build_occupancy(apartment_ids, window_start, window_end):
+    """
+    Build a per-apartment occupancy array for the nights in [window_start, window_end).
+
+    Index ``i`` of each array is the night starting on ``window_start + i`` and is
+    truthy when that night is taken by an active reservation or blocked in the
+    availability calendar. Reservations are loaded in a single query and applied
+    with a difference array, so the cost is linear in nights plus reservations.
+    """
+    from apps.reservations.models import Reservation
+
+    nights = (window_end - window_start).days
+    deltas = defaultdict(lambda: [0] * (nights + 1))
+
+    reservations = Reservation.objects.filter(apartment_id__in=apartment_ids).overlapping(
+        window_start, window_end
+    ).values_list('apartment_id', 'check_in_date', 'check_out_date')
+
+    for apartment_id, check_in, check_out in reservations:
+        first = max((check_in - window_start).days, 0)
+        last = min((check_out - window_start).days, nights)
+        delta = deltas[apartment_id]
+        delta[first] += 1
+        delta[last] -= 1
+
+    blocked_dates = ApartmentAvailability.objects.filter(
+        apartment_id__in=apartment_ids,
+        status__in=BLOCKED_AVAILABILITY_STATUSES,
+        date__gte=window_start,
+        date__lt=window_end
+    ).values_list('apartment_id', 'date')
+
+    blocked = defaultdict(list)
+    for apartment_id, day in blocked_dates:
+        blocked[apartment_id].append((day - window_start).days)
+
+    occupancy = {}
+    for apartment_id in apartment_ids:
+        nights_taken = [False] * nights
+        if apartment_id in deltas:
+            running = 0
+            delta = deltas[apartment_id]
+            for i in range(nights):
+                running += delta[i]
+                nights_taken[i] = running > 0
+        for i in blocked.get(apartment_id, ()):
+            nights_taken[i] = True
+        occupancy[apartment_id] = nights_taken
+    return occupancy
+
+
+def feasible_start_offsets(nights_taken, nights, first_only=False):
+    """
+    Return the offsets at which ``nights`` consecutive free nights begin.
+
+    Uses a sliding window that keeps a running count of occupied nights, so each
+    occupancy array is scanned exactly once.
+    """
+    offsets = []
+    if nights > len(nights_taken):
+        return offsets
+
+    occupied = sum(nights_taken[:nights])
+    for start in range(len(nights_taken) - nights + 1):
+        if start:
+            occupied += nights_taken[start + nights - 1] - nights_taken[start - 1]
+        if not occupied:
+            offsets.append(start)
+            if first_only:
+                break
+    return offsets
+
+
+def find_flexible_stays(apartments, nights, window_start, window_end, all_dates=False):
+    """
+    Find apartments free for ``nights`` consecutive nights within a date window.
+
+    ``window_start`` is the earliest check-in and ``window_end`` the latest
+    check-out. Returns a list of ``(apartment, check_in_dates)`` tuples in the
+    order of ``apartments``, where ``check_in_dates`` holds the earliest feasible
+    check-in, or every feasible check-in when ``all_dates`` is true. Apartments
+    without any feasible start are left out.
+    """
+    apartments = list(apartments)
+    occupancy = build_occupancy([a.id for a in apartments], window_start, window_end)
+
+    matches = []
+    for apartment in apartments:
+        offsets = feasible_start_offsets(occupancy[apartment.id], nights, first_only=not all_dates)
+        if offsets:
+            matches.append((apartment, [window_start + timedelta(days=o) for o in offsets]))
+    return matches
@@ -0,0 +1,45 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common.images import refresh_previews, request_variants
+
+from .models import ApartmentImage, RoomConnection, VirtualTourHotspot, VirtualTourRoom
+from .tasks import build_panorama_tiles, tiles_are_current
+from .tours import bump_tour_version
+
+
+@receiver(post_save, sender=ApartmentImage)
+def make_image_previews(sender, instance, **kwargs):
+    refresh_previews(instance, 'image')
+    request_variants(instance, 'image')
+
+
+# Registered before the tour invalidation below, so the rebuilt tour has the new previews
+@receiver(post_save, sender=VirtualTourRoom)
+def make_panorama_previews(sender, instance, **kwargs):
+    refresh_previews(instance, 'panoramic_image')
+
+
+@receiver(post_save, sender=VirtualTourRoom)
+@receiver(post_delete, sender=VirtualTourRoom)
+def invalidate_tour_for_room(sender, instance, **kwargs):
+    bump_tour_version(instance.apartment_id)
+
+
+@receiver(post_save, sender=VirtualTourRoom)
+def queue_panorama_tiles(sender, instance, **kwargs):
+    """Queue tile generation for a new or replaced panorama."""
+    if instance.panoramic_image and not tiles_are_current(instance):
+        build_panorama_tiles.enqueue(room_id=instance.pk)
+
+
+@receiver(post_save, sender=RoomConnection)
+@receiver(post_delete, sender=RoomConnection)
+def invalidate_tour_for_connection(sender, instance, **kwargs):
+    bump_tour_version(instance.from_room.apartment_id)
+
+
+@receiver(post_save, sender=VirtualTourHotspot)
+@receiver(post_delete, sender=VirtualTourHotspot)
+def invalidate_tour_for_hotspot(sender, instance, **kwargs):
+    bump_tour_version(instance.room.apartment_id)
@@ -0,0 +1,22 @@
+from apps.tasks.registry import task
+
+from .models import VirtualTourRoom
+from .panoramas import build_tiles
+from .tours import bump_tour_version
+
+
+@task('apartments.build_panorama_tiles')
+def build_panorama_tiles(room_id):
+    """Generate the cube tiles of a room's panorama and store their manifest on the room."""
+    room = VirtualTourRoom.objects.filter(pk=room_id).first()
+    if room is None or not room.panoramic_image or tiles_are_current(room):
+        return
+    manifest = build_tiles(room.panoramic_image.name)
+    # Skip the write if the panorama was replaced meanwhile; its own task builds the new tiles
+    if VirtualTourRoom.objects.filter(pk=room_id, panoramic_image=manifest['source']).update(tiles=manifest):
+        bump_tour_version(room.apartment_id)
+
+
+def tiles_are_current(room):
+    """Whether the room's tile manifest was built from its current panorama."""
+    return bool(room.tiles) and room.tiles.get('source') == room.panoramic_image.name
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, ApartmentAvailability
+from apps.apartments.services import feasible_start_offsets
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.users.models import User
+
+
+class FeasibleStartOffsetsTests(SimpleTestCase):
+    def test_finds_every_free_window(self):
+        """Every start whose window contains no occupied night is returned."""
+        nights_taken = [False, False, True, False, False, False, True]
+        self.assertEqual(feasible_start_offsets(nights_taken, 2), [0, 3, 4])
+        self.assertEqual(feasible_start_offsets(nights_taken, 3), [3])
+        self.assertEqual(feasible_start_offsets(nights_taken, 4), [])
+
+    def test_first_only_stops_at_earliest(self):
+        """first_only returns just the earliest feasible start."""
+        self.assertEqual(feasible_start_offsets([True, False, False, False], 2, first_only=True), [1])
+
+    def test_stay_longer_than_window(self):
+        """A stay longer than the window has no feasible start."""
+        self.assertEqual(feasible_start_offsets([False, False], 3), [])
+
+
+class FlexibleDateSearchAPITests(APITestCase):
+    def setUp(self):
+        """Create two apartments, one partially booked, and a guest."""
+        self.user = User.objects.create_user(
+            username='flexuser',
+            email='flex@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartment1 = Apartment.objects.create(
+            name='Harbour Suite',
+            description='Suite by the harbour.',
+            address='1 Quay Street',
+            city='Lisbon',
+            country='Portugal',
+            price_per_night=300.00
+        )
+        self.apartment2 = Apartment.objects.create(
+            name='Old Town Loft',
+            description='Loft in the old town.',
+            address='2 Castle Road',
+            city='Lisbon',
+            country='Portugal',
+            price_per_night=200.00
+        )
+        self.window_start = timezone.now().date() + timedelta(days=10)
+        self.window_end = self.window_start + timedelta(days=10)
+        self.url = reverse('apartments:apartment-flexible-dates')
+
+    def _search(self, nights, **extra):
+        params = {
+            'nights': nights,
+            'window_start': self.window_start.isoformat(),
+            'window_end': self.window_end.isoformat(),
+        }
+        params.update(extra)
+        return self.client.get(self.url, params)
+
+    def _results(self, response):
+        return {item['id']: item for item in response.data['results']}
+
+    def test_returns_earliest_check_in(self):
+        """A reservation at the start of the window pushes the earliest check-in back."""
+        Reservation.objects.create(
+            user=self.user,
+            apartment=self.apartment1,
+            check_in_date=self.window_start,
+            check_out_date=self.window_start + timedelta(days=3),
+            status=ReservationStatus.CONFIRMED
+        )
+        response = self._search(5)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = self._results(response)
+        self.assertEqual(
+            results[str(self.apartment1.id)]['earliest_check_in'],
+            (self.window_start + timedelta(days=3)).isoformat()
+        )
+        self.assertEqual(results[str(self.apartment2.id)]['earliest_check_in'], self.window_start.isoformat())
+
+    def test_all_dates_lists_every_start(self):
+        """all_dates=true lists every feasible check-in date."""
+        ApartmentAvailability.objects.create(
+            apartment=self.apartment2,
+            date=self.window_start + timedelta(days=5),
+            status='maintenance'
+        )
+        response = self._search(5, all_dates='true')
+        results = self._results(response)
+        self.assertEqual(
+            results[str(self.apartment2.id)]['available_check_ins'],
+            [self.window_start.isoformat()]
+        )
+        self.assertEqual(len(results[str(self.apartment1.id)]['available_check_ins']), 6)
+
+    def test_fully_booked_apartment_is_excluded(self):
+        """Apartments with no run of free nights long enough are left out."""
+        Reservation.objects.create(
+            user=self.user,
+            apartment=self.apartment1,
+            check_in_date=self.window_start + timedelta(days=4),
+            check_out_date=self.window_start + timedelta(days=6)
+        )
+        response = self._search(5)
+        results = self._results(response)
+        self.assertNotIn(str(self.apartment1.id), results)
+        self.assertIn(str(self.apartment2.id), results)
+
+    def test_cancelled_reservations_do_not_block(self):
+        """Cancelled reservations leave their nights free."""
+        Reservation.objects.create(
+            user=self.user,
+            apartment=self.apartment1,
+            check_in_date=self.window_start,
+            check_out_date=self.window_end,
+            status=ReservationStatus.CANCELLED
+        )
+        results = self._results(self._search(10))
+        self.assertIn(str(self.apartment1.id), results)
+
+    def test_invalid_parameters(self):
+        """Missing or inconsistent parameters are rejected."""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._search(0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._search(11).status_code, status.HTTP_400_BAD_REQUEST)
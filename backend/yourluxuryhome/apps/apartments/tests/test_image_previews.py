@@ -0,0 +1,115 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.contrib.admin.sites import site
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, ApartmentImage, VirtualTourRoom
+from apps.common.images import PLACEHOLDER_SIZE, THUMBNAIL_SIZE
+from apps.users.models import User
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def upload(size=(1600, 1200), name='photo.jpg', color=(200, 120, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImagePreviewTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Create an apartment for the images and tour rooms."""
+        self.apartment = Apartment.objects.create(
+            name='Preview Test Apartment',
+            description='An apartment used by image preview tests.',
+            address='1 Preview Street',
+            city='Bergen',
+            country='Norway',
+            price_per_night=120.00
+        )
+
+    def test_upload_generates_thumbnail_and_placeholder(self):
+        """Saving an image stores a small WebP thumbnail and a tiny WebP data URI."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        image.refresh_from_db()
+
+        self.assertTrue(image.thumbnail.name.endswith('_thumb.webp'))
+        with default_storage.open(image.thumbnail.name) as thumbnail:
+            opened = Image.open(thumbnail)
+            self.assertEqual(opened.format, 'WEBP')
+            self.assertEqual(opened.size, (THUMBNAIL_SIZE, 240))
+
+        prefix = 'data:image/webp;base64,'
+        self.assertTrue(image.placeholder.startswith(prefix))
+        placeholder = Image.open(io.BytesIO(base64.b64decode(image.placeholder[len(prefix):])))
+        self.assertEqual(max(placeholder.size), PLACEHOLDER_SIZE)
+        self.assertLess(len(image.placeholder), 1000)
+
+    def test_previews_follow_replaced_image_only(self):
+        """A plain save keeps the previews; a new upload regenerates them."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        thumbnail = image.thumbnail.name
+        image.caption = 'Living room'
+        image.save()
+        self.assertEqual(image.thumbnail.name, thumbnail)
+
+        image.image = upload(name='other.jpg', color=(10, 20, 200))
+        image.save()
+        image.refresh_from_db()
+        self.assertNotEqual(image.thumbnail.name, thumbnail)
+        self.assertTrue(image.thumbnail.name.startswith(image.image.name.rsplit('.', 1)[0]))
+
+    def test_api_exposes_previews(self):
+        """Image and tour room responses include the thumbnail and placeholder."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload(), is_primary=True)
+        VirtualTourRoom.objects.create(
+            apartment=self.apartment, name='Hall', room_type='living_room',
+            panoramic_image=upload((1024, 512), 'hall.jpg')
+        )
+
+        self.client.force_authenticate(user=User.objects.create_user(
+            username='previewuser', email='previewuser@example.com', password='userpassword'
+        ))
+        data = self.client.get(reverse('apartments:apartment-image-detail', kwargs={'pk': image.pk})).json()
+        self.assertTrue(data['thumbnail'].endswith('_thumb.webp'))
+        self.assertTrue(data['placeholder'].startswith('data:image/webp;base64,'))
+
+        url = reverse('apartments:apartment-virtual-tour', kwargs={'slug': self.apartment.slug})
+        room = self.client.get(url).json()['rooms'][0]
+        self.assertTrue(room['thumbnail_url'].startswith('http://testserver/media/'))
+        self.assertTrue(room['thumbnail_url'].endswith('hall_thumb.webp'))
+        self.assertTrue(room['placeholder'].startswith('data:image/webp;base64,'))
+
+    def test_admin_list_shows_thumbnail(self):
+        """Admin list previews point at the thumbnail, not the original."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        html = site._registry[ApartmentImage].image_preview(image)
+        self.assertIn(image.thumbnail.url, html)
+        self.assertNotIn(f'src="{image.image.url}"', html)
+
+    def test_backfill_command(self):
+        """The command fills in previews missing from existing rows."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        ApartmentImage.objects.filter(pk=image.pk).update(thumbnail='', placeholder='')
+
+        out = io.StringIO()
+        call_command('build_image_previews', stdout=out)
+        image.refresh_from_db()
+        self.assertTrue(image.thumbnail.name.endswith('_thumb.webp'))
+        self.assertIn('1 image(s)', out.getvalue())
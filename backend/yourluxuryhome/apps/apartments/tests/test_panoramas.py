@@ -0,0 +1,114 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image, ImageDraw
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, VirtualTourRoom
+from apps.apartments.panoramas import cube_faces, level_sizes
+from apps.tasks.models import Task
+from apps.tasks.worker import Worker
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def panorama(width=2048):
+    """An equirectangular test image: white sky, black floor, a green mark ahead and a red one to the right."""
+    height = width // 2
+    image = Image.new('RGB', (width, height), (128, 128, 128))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width, height // 4], fill=(255, 255, 255))
+    draw.rectangle([0, 3 * height // 4, width, height], fill=(0, 0, 0))
+    mark = width // 40
+    draw.rectangle([width // 2 - mark, height // 2 - mark, width // 2 + mark, height // 2 + mark], fill=(0, 255, 0))
+    draw.rectangle([3 * width // 4 - mark, height // 2 - mark, 3 * width // 4 + mark, height // 2 + mark],
+                   fill=(255, 0, 0))
+    draw.rectangle([0, height // 2 - mark, mark, height // 2 + mark], fill=(255, 0, 255))
+    draw.rectangle([width - mark, height // 2 - mark, width, height // 2 + mark], fill=(255, 0, 255))
+    return image
+
+
+def upload(image, name='room.jpg'):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PanoramaTileTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Create an apartment for the tour rooms."""
+        self.apartment = Apartment.objects.create(
+            name='Panorama Test Apartment',
+            description='An apartment used by panorama tests.',
+            address='1 Panorama Street',
+            city='Oslo',
+            country='Norway',
+            price_per_night=140.00
+        )
+
+    def test_faces_follow_cube_map_orientation(self):
+        """Each face looks the expected way, including the back face across the panorama's seam."""
+        faces = cube_faces(panorama(1024), 64)
+        centers = {face: image.getpixel((32, 32)) for face, image in faces.items()}
+        self.assertEqual(centers['f'], (0, 255, 0))
+        self.assertEqual(centers['r'], (255, 0, 0))
+        self.assertEqual(centers['b'], (255, 0, 255))
+        self.assertEqual(centers['l'], (128, 128, 128))
+        self.assertEqual(centers['u'], (255, 255, 255))
+        self.assertEqual(centers['d'], (0, 0, 0))
+
+    def test_levels_stop_at_the_native_face_size(self):
+        """Levels above a quarter of the panorama width are not generated."""
+        self.assertEqual(level_sizes(8192), [512, 1024, 2048])
+        self.assertEqual(level_sizes(4096), [512, 1024])
+        self.assertEqual(level_sizes(1024), [256])
+
+    def test_uploaded_panorama_is_tiled_and_exposed_in_the_tour(self):
+        """Saving a room queues tiling; the tour then lists the tile manifest with absolute URLs."""
+        room = VirtualTourRoom.objects.create(
+            apartment=self.apartment, name='Lounge', room_type='living_room', panoramic_image=upload(panorama())
+        )
+        self.assertTrue(Task.objects.filter(name='apartments.build_panorama_tiles').exists())
+        Worker().run(burst=True)
+
+        room.refresh_from_db()
+        base = room.tiles['base']
+        self.assertEqual(room.tiles['levels'], [{'size': 512, 'tiles': 1}])
+        with default_storage.open(f'{base}/512/f_0_0.jpg') as tile:
+            self.assertEqual(Image.open(tile).size, (512, 512))
+        with default_storage.open(f'{base}/preview.jpg') as preview:
+            self.assertEqual(Image.open(preview).size, (256, 256 * 6))
+
+        url = reverse('apartments:apartment-virtual-tour', kwargs={'slug': self.apartment.slug})
+        tiles = self.client.get(url).json()['rooms'][0]['tiles']
+        self.assertEqual(tiles['faces'], ['f', 'r', 'b', 'l', 'u', 'd'])
+        self.assertTrue(tiles['url_template'].startswith(f'http://testserver/media/{base}/'))
+        self.assertTrue(tiles['url_template'].endswith('/{size}/{face}_{x}_{y}.jpg'))
+        self.assertTrue(tiles['preview_url'].endswith('/preview.jpg'))
+
+    def test_replaced_panorama_hides_stale_tiles(self):
+        """Tiles built from a previous upload are not exposed, and new ones are queued."""
+        room = VirtualTourRoom.objects.create(
+            apartment=self.apartment, name='Study', room_type='office', panoramic_image=upload(panorama())
+        )
+        Worker().run(burst=True)
+        room.refresh_from_db()
+        room.panoramic_image = upload(panorama(), 'study-new.jpg')
+        room.save()
+
+        url = reverse('apartments:apartment-virtual-tour', kwargs={'slug': self.apartment.slug})
+        self.assertIsNone(self.client.get(url).json()['rooms'][0]['tiles'])
+        Worker().run(burst=True)
+        self.assertIsNotNone(self.client.get(url).json()['rooms'][0]['tiles'])
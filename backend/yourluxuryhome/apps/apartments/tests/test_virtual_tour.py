@@ -0,0 +1,86 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, RoomConnection, VirtualTourHotspot, VirtualTourRoom
+from apps.apartments.tours import bump_tour_version
+
+
+class VirtualTourTests(APITestCase):
+    def setUp(self):
+        """Create an apartment with two connected rooms and a hotspot."""
+        self.apartment = Apartment.objects.create(
+            name='Tour Test Apartment',
+            description='An apartment used by virtual tour tests.',
+            address='1 Tour Street',
+            city='Lisbon',
+            country='Portugal',
+            price_per_night=110.00
+        )
+        self.hall = VirtualTourRoom.objects.create(
+            apartment=self.apartment, name='Hall', room_type='hallway',
+            panoramic_image='virtual_tour/panoramas/hall.jpg', order=0
+        )
+        self.kitchen = VirtualTourRoom.objects.create(
+            apartment=self.apartment, name='Kitchen', room_type='kitchen',
+            panoramic_image='virtual_tour/panoramas/kitchen.jpg', order=1, is_starting_room=True
+        )
+        RoomConnection.objects.create(from_room=self.hall, to_room=self.kitchen, hotspot_x=50, hotspot_y=50)
+        VirtualTourHotspot.objects.create(room=self.kitchen, title='Oven', position_x=0.2, position_y=0.5)
+        self.url = reverse('apartments:apartment-virtual-tour', kwargs={'slug': self.apartment.slug})
+
+    def test_document_is_built_with_one_query_per_relation(self):
+        """Rooms, connections and hotspots are loaded once; the starting room is the marked one."""
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['room_count'], 2)
+        self.assertEqual([room['name'] for room in data['rooms']], ['Hall', 'Kitchen'])
+        self.assertEqual(data['starting_room'], data['rooms'][1])
+        self.assertEqual(data['rooms'][0]['connections_from'][0]['to_room_name'], 'Kitchen')
+        self.assertEqual(data['rooms'][1]['hotspots'][0]['title'], 'Oven')
+        self.assertTrue(data['rooms'][0]['panoramic_image_url'].startswith('http://testserver/'))
+
+    def test_cached_document_and_etag(self):
+        """Repeat requests only look up the apartment, and a matching If-None-Match gets 304."""
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_invalidate_the_document(self):
+        """Saving a room, connection or hotspot replaces the cached document."""
+        etags = {self.client.get(self.url)['ETag']}
+        self.kitchen.name = 'Open Kitchen'
+        self.kitchen.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['rooms'][0]['connections_from'][0]['to_room_name'], 'Open Kitchen')
+        etags.add(response['ETag'])
+
+        VirtualTourHotspot.objects.create(room=self.hall, title='Coat rack', position_x=0.1, position_y=0.4)
+        etags.add(self.client.get(self.url)['ETag'])
+        RoomConnection.objects.get().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['rooms'][0]['connections_from'], [])
+        etags.add(response['ETag'])
+        self.assertEqual(len(etags), 4)
+
+    def test_bump_is_stored_on_the_apartment(self):
+        """A bump moves the apartment row, which every process reads, rather than a per-process cache entry."""
+        etag = self.client.get(self.url)['ETag']
+        VirtualTourRoom.objects.filter(pk=self.hall.pk).update(name='Entrance')
+        self.assertEqual(self.client.get(self.url)['ETag'], etag)
+
+        updated_at = self.apartment.updated_at
+        bump_tour_version(self.apartment.pk)
+        self.apartment.refresh_from_db()
+        self.assertGreater(self.apartment.updated_at, updated_at)
+        self.assertEqual(self.client.get(self.url).json()['rooms'][0]['name'], 'Entrance')
+
+    def test_apartment_without_tour(self):
+        """An apartment without rooms has no tour."""
+        VirtualTourRoom.objects.all().delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,78 @@
+"""
+Pre-rendered virtual tour documents.
+
+A tour document is built from three queries (rooms, their connections with the
+target rooms, and hotspots), rendered to JSON once and kept in the Django cache
+with an ETag derived from its bytes. Cache keys include the apartment's
+``updated_at``, which signals move whenever a room, connection or hotspot of
+the apartment is saved or deleted. The view loads the apartment row anyway, so
+every process sees the new key as soon as the change commits. Bulk
+``QuerySet.update()`` calls bypass the signals; call ``bump_tour_version()``
+after them.
+
+Image URLs are absolute, so documents are also keyed by the request's base URL.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .models import Apartment, RoomConnection, VirtualTourHotspot, VirtualTourRoom
+from .serializers import VirtualTourRoomSerializer
+
+
+TOUR_DOCUMENT_TTL = 24 * 60 * 60
+
+
+def bump_tour_version(apartment_id):
+    """Invalidate every cached tour document of the apartment by moving its ``updated_at``."""
+    Apartment.objects.filter(pk=apartment_id).update(updated_at=timezone.now())
+
+
+def build_tour_document(apartment, request=None):
+    """
+    Return the apartment's tour rendered as JSON bytes, or ``None`` when it has no rooms.
+
+    The starting room is the one marked as such, or else the first room, and
+    is the same serialized data as its entry in ``rooms``.
+    """
+    rooms = list(
+        VirtualTourRoom.objects.filter(apartment=apartment).prefetch_related(
+            Prefetch('connections_from', queryset=RoomConnection.objects.select_related('to_room').order_by('pk')),
+            Prefetch('hotspots', queryset=VirtualTourHotspot.objects.order_by('pk')),
+        )
+    )
+    if not rooms:
+        return None
+
+    data = VirtualTourRoomSerializer(rooms, many=True, context={'request': request}).data
+    starting_room = next((entry for room, entry in zip(rooms, data) if room.is_starting_room), data[0])
+    return JSONRenderer().render({
+        'apartment_id': apartment.id,
+        'apartment_name': apartment.name,
+        'rooms': data,
+        'starting_room': starting_room,
+        'room_count': len(rooms),
+    })
+
+
+def get_tour_document(apartment, request):
+    """
+    Return ``(etag, content)`` for the apartment's tour, building it on a cache miss.
+
+    ``content`` is ``None`` when the apartment has no tour; that answer is cached too.
+    """
+    key = 'apartments:tour:{}:{}:{}'.format(
+        apartment.id,
+        apartment.updated_at.timestamp(),
+        request.build_absolute_uri('/'),
+    )
+    document = cache.get(key)
+    if document is None:
+        content = build_tour_document(apartment, request)
+        etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"' if content is not None else None
+        document = (etag, content)
+        cache.set(key, document, TOUR_DOCUMENT_TTL)
+    return document
@@ -1,6 +1,9 @@
+from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from datetime import datetime
 
 from rest_framework import status, permissions, generics, viewsets, filters
 from rest_framework.views import APIView
@@ -9,10 +12,11 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .models import Apartment, ApartmentCategory, ApartmentAmenity, ApartmentImage, ApartmentReview, VirtualTourRoom
+from .models import Apartment, ApartmentCategory, ApartmentAmenity, ApartmentImage, ApartmentReview
 from .serializers import (
     ApartmentListSerializer,
     ApartmentDetailSerializer,
+    FlexibleStaySerializer,
     ApartmentCreateUpdateSerializer,
     ApartmentCategorySerializer,
     ApartmentAmenitySerializer,
@@ -21,9 +25,10 @@ from .serializers import (
     ApartmentReviewSerializer,
     ApartmentReviewCreateSerializer,
     ApartmentReviewUpdateSerializer,
-    VirtualTourSerializer,
     VirtualTourRoomSerializer
 )
+from .services import find_flexible_stays
+from .tours import get_tour_document
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -42,6 +47,8 @@ class ApartmentCategoryViewSet(viewsets.ModelViewSet):
     queryset = ApartmentCategory.objects.all()
     serializer_class = ApartmentCategorySerializer
     permission_classes = [IsAuthenticated]
+    # Reads that only need the user id: authenticated from the token claims (see apps.users.authentication)
+    token_user_actions = ['list', 'retrieve']
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
@@ -51,6 +58,8 @@ class ApartmentAmenityViewSet(viewsets.ModelViewSet):
     queryset = ApartmentAmenity.objects.all()
     serializer_class = ApartmentAmenitySerializer
     permission_classes = [IsAuthenticated]
+    # Reads that only need the user id: authenticated from the token claims (see apps.users.authentication)
+    token_user_actions = ['list', 'retrieve']
     filter_backends = [filters.SearchFilter]
     search_fields = ['name']
 
@@ -58,6 +67,8 @@ class ApartmentAmenityViewSet(viewsets.ModelViewSet):
 class ApartmentViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and editing Apartment instances."""
     permission_classes = [IsAuthenticated]
+    # Reads that only need the user id: authenticated from the token claims (see apps.users.authentication)
+    token_user_actions = ['list', 'retrieve', 'flexible_dates', 'availability', 'virtual_tour']
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['city', 'country', 'bedrooms', 'bathrooms', 'max_guests', 'category', 'is_available']
     search_fields = ['name', 'description', 'address', 'city', 'country']
@@ -87,12 +98,10 @@ class ApartmentViewSet(viewsets.ModelViewSet):
         check_out_date = self.request.query_params.get('check_out_date')
         if check_in_date and check_out_date:
             # Exclude apartments that have overlapping reservations
-            from apps.reservations.models import Reservation, ReservationStatus
+            from apps.reservations.models import Reservation
             
-            unavailable_apartments = Reservation.objects.filter(
-                status__in=[ReservationStatus.PENDING, ReservationStatus.CONFIRMED],
-                check_in_date__lt=check_out_date,
-                check_out_date__gt=check_in_date
+            unavailable_apartments = Reservation.objects.overlapping(
+                check_in_date, check_out_date
             ).values_list('apartment_id', flat=True)
             
             queryset = queryset.exclude(id__in=unavailable_apartments)
@@ -102,10 +111,58 @@ class ApartmentViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'list':
             return ApartmentListSerializer
+        elif self.action == 'flexible_dates':
+            return FlexibleStaySerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return ApartmentCreateUpdateSerializer
         return ApartmentDetailSerializer
     
+    @action(detail=False, methods=['get'])
+    def flexible_dates(self, request):
+        """
+        Find apartments free for a number of consecutive nights within a date window.
+        
+        Expects ``nights``, ``window_start`` and ``window_end`` (latest check-out).
+        Each result carries its earliest feasible check-in, or every feasible
+        check-in when ``all_dates=true``.
+        """
+        try:
+            nights = int(request.query_params.get('nights', ''))
+            window_start = datetime.strptime(request.query_params.get('window_start', ''), '%Y-%m-%d').date()
+            window_end = datetime.strptime(request.query_params.get('window_end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {"error": "nights, window_start and window_end (YYYY-MM-DD) are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if nights < 1:
+            return Response({"error": "nights must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
+        if window_start < timezone.now().date():
+            return Response({"error": "window_start cannot be in the past."}, status=status.HTTP_400_BAD_REQUEST)
+        if (window_end - window_start).days < nights:
+            return Response(
+                {"error": "The window must be at least as long as the requested stay."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (window_end - window_start).days > 365:
+            return Response({"error": "The window cannot exceed 365 days."}, status=status.HTTP_400_BAD_REQUEST)
+        
+        all_dates = request.query_params.get('all_dates', '').lower() == 'true'
+        apartments = self.filter_queryset(self.get_queryset()).filter(is_available=True)
+        
+        results = []
+        for apartment, check_ins in find_flexible_stays(apartments, nights, window_start, window_end, all_dates):
+            apartment.flexible_check_ins = check_ins
+            results.append(apartment)
+        
+        page = self.paginate_queryset(results)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(results, many=True)
+        return Response(serializer.data)
+    
     @action(detail=True, methods=['get'])
     def availability(self, request, slug=None):
         """Check apartment availability for specific dates."""
@@ -142,7 +199,7 @@ class ApartmentViewSet(viewsets.ModelViewSet):
         from apps.reservations.models import Reservation
         from apps.reservations.serializers import ReservationSerializer
         
-        reservations = Reservation.objects.filter(apartment=apartment)
+        reservations = Reservation.objects.with_details().filter(apartment=apartment)
         serializer = ReservationSerializer(reservations, many=True)
         
         return Response(serializer.data)
@@ -151,41 +208,19 @@ class ApartmentViewSet(viewsets.ModelViewSet):
     def virtual_tour(self, request, slug=None):
         """Get virtual tour data for this apartment including all 360° rooms and connections."""
         apartment = self.get_object()
-        
-        # Get all virtual tour rooms for this apartment
-        rooms = VirtualTourRoom.objects.filter(apartment=apartment).order_by('order', 'created_at')
-        
-        if not rooms.exists():
+        etag, content = get_tour_document(apartment, request)
+        if content is None:
             return Response(
                 {"detail": "No virtual tour available for this apartment."},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get the starting room (default to first room if none is marked as starting)
-        starting_room = rooms.filter(is_starting_room=True).first()
-        if not starting_room:
-            starting_room = rooms.first()
-        
-        # Create a simple object to hold the data for VirtualTourSerializer
-        class TourData:
-            def __init__(self, apartment_id, apartment_name, rooms, starting_room, room_count):
-                self.apartment_id = apartment_id
-                self.apartment_name = apartment_name
-                self.rooms = rooms
-                self.starting_room = starting_room
-                self.room_count = room_count
-
-        # Prepare the response data
-        tour_data = TourData(
-            apartment_id=apartment.id,
-            apartment_name=apartment.name,
-            rooms=rooms,
-            starting_room=starting_room,
-            room_count=rooms.count()
+        # The document is already rendered JSON; clients holding it get a 304
+        response = get_conditional_response(request, etag=etag) or HttpResponse(
+            content, content_type='application/json'
         )
-        
-        serializer = VirtualTourSerializer(tour_data, context={'request': request})
-        return Response(serializer.data)
+        response['ETag'] = etag
+        return response
 
 
 class ApartmentImageViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from .images import request_variants, variant_srcsets
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only responsive variants of a model's image field, as returned by ``variant_srcsets``.
+    
+    While the variants are missing or stale the value is ``None`` and their
+    build is queued, so clients fall back to the original image until then.
+    """
+    
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, instance):
+        request = self.context.get('request')
+        variants = variant_srcsets(instance, self.image_field, request.build_absolute_uri if request else None)
+        if variants is None:
+            request_variants(instance, self.image_field)
+        return variants
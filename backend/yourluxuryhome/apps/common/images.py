@@ -0,0 +1,210 @@
+"""
+Small derived images for uploaded photos and panoramas.
+
+For a model with an image field plus ``thumbnail`` and ``placeholder`` fields,
+``refresh_previews`` stores:
+
+* a WebP thumbnail, at most ``THUMBNAIL_SIZE`` pixels on its longest edge,
+  next to the original as ``<name>_thumb.webp``;
+* a placeholder: a ``data:`` URI of a WebP at most ``PLACEHOLDER_SIZE`` pixels
+  on its longest edge (a few hundred bytes), meant to be shown stretched and
+  blurred while the real image loads.
+
+JPEG sources are decoded at a reduced scale (``Image.draft``), so even a large
+panorama takes milliseconds and the previews can be made at upload time.
+
+Responsive variants are larger and made by a background task: the image scaled
+to each of ``VARIANT_WIDTHS`` below its own width (and once at its own width, up
+to the largest), each in WebP and a JPEG fallback, stored next to the original
+as ``<name>_w<width>.<ext>``. Their manifest is kept in the model's
+``<field>_variants`` JSON field, recording the source it was built from, so a
+replaced image never serves stale variants. ``request_variants`` queues the
+task when a model is saved, and again the first time a serializer finds the
+variants missing (e.g. for images uploaded before they existed).
+"""
+import base64
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from apps.tasks.registry import task
+
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 320
+THUMBNAIL_QUALITY = 75
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+# Extension -> Pillow format, preferred first; JPEG is the fallback for clients without WebP
+VARIANT_FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+VARIANT_QUALITY = 80
+# Seconds before a missing manifest may queue another build, e.g. after a failed task
+VARIANT_REQUEST_TTL = 60 * 60
+
+
+def derived_name(name, suffix, extension):
+    """Storage name of an image derived from ``name``, e.g. ``photo.jpg`` -> ``photo_thumb.webp``."""
+    return f'{posixpath.splitext(name)[0]}_{suffix}.{extension}'
+
+
+def open_scaled(file, size):
+    """Open an image file, upright and in RGB, scaled down to at most ``size`` pixels on its longest edge."""
+    image = Image.open(file)
+    image.draft('RGB', (size, size))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+    image.thumbnail((size, size), Image.Resampling.LANCZOS)
+    return image
+
+
+def encode(image, image_format='WEBP', quality=THUMBNAIL_QUALITY):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def placeholder_data_uri(image):
+    """Return a tiny WebP of ``image`` as a ``data:`` URI."""
+    tiny = image.copy()
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+    return 'data:image/webp;base64,' + base64.b64encode(encode(tiny, quality=PLACEHOLDER_QUALITY)).decode('ascii')
+
+
+def replace_file(storage, name, content):
+    """Save ``content`` as ``name``, overwriting an existing file; returns the stored name."""
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(content))
+
+
+def refresh_previews(instance, field_name):
+    """
+    Make the thumbnail and placeholder of ``instance.<field_name>`` unless they match the current image.
+
+    Returns whether anything was generated. The new values are written with a
+    queryset ``update()``, so saving them sends no further signals. A missing or
+    unreadable image is logged and skipped rather than failing the save.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return False
+    thumbnail_name = derived_name(field_file.name, 'thumb', 'webp')
+    if instance.thumbnail.name == thumbnail_name:
+        return False
+
+    try:
+        with field_file.open('rb'):
+            image = open_scaled(field_file, THUMBNAIL_SIZE)
+    except OSError:
+        logger.warning("Could not make previews of %s", field_file.name, exc_info=True)
+        return False
+    instance.thumbnail.name = replace_file(field_file.storage, thumbnail_name, encode(image))
+    instance.placeholder = placeholder_data_uri(image)
+    type(instance)._default_manager.filter(pk=instance.pk).update(
+        thumbnail=instance.thumbnail.name, placeholder=instance.placeholder
+    )
+    return True
+
+
+def variant_widths(width):
+    """Widths of the variants made for an image ``width`` pixels wide; never upscaled."""
+    largest = min(width, VARIANT_WIDTHS[-1])
+    return [size for size in VARIANT_WIDTHS if size < largest] + [largest]
+
+
+def build_variants(name, storage):
+    """Store the responsive variants of the image stored as ``name``; returns their manifest."""
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image.draft('RGB', (VARIANT_WIDTHS[-1], 1))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+    widths = variant_widths(image.width)
+    height = max(round(image.height * widths[-1] / image.width), 1)
+    # Largest first, each scaled from the previous one rather than from the original
+    for width in reversed(widths):
+        image = image.resize((width, max(round(image.height * width / image.width), 1)), Image.Resampling.LANCZOS)
+        for extension, image_format in VARIANT_FORMATS.items():
+            replace_file(storage, derived_name(name, f'w{width}', extension), encode(image, image_format, VARIANT_QUALITY))
+    return {
+        'source': name,
+        'widths': widths,
+        'formats': list(VARIANT_FORMATS),
+        'width': widths[-1],
+        'height': height,
+    }
+
+
+def variants_are_current(instance, field_name):
+    """Whether the variant manifest of ``instance.<field_name>`` was built from its current image."""
+    manifest = getattr(instance, f'{field_name}_variants')
+    return bool(manifest) and manifest.get('source') == getattr(instance, field_name).name
+
+
+def request_variants(instance, field_name):
+    """
+    Queue building the variants of ``instance.<field_name>`` unless they are current; returns whether it did.
+
+    A request per image is queued at most once every ``VARIANT_REQUEST_TTL``
+    seconds, so serializing a list of images without variants stays cheap.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file or variants_are_current(instance, field_name):
+        return False
+    key = f'images:variants-requested:{instance._meta.label_lower}:{instance.pk}:{field_name}:{field_file.name}'
+    if not cache.add(key, True, VARIANT_REQUEST_TTL):
+        return False
+    build_image_variants.enqueue(model=instance._meta.label_lower, pk=instance.pk, field_name=field_name)
+    return True
+
+
+def variant_srcsets(instance, field_name, build_url=None):
+    """
+    Return the variants of ``instance.<field_name>`` for clients, or ``None`` until they are built.
+
+    ``srcset`` maps each format to an HTML ``srcset`` value; ``width`` and
+    ``height`` are those of the largest variant, for reserving layout space.
+    """
+    if not variants_are_current(instance, field_name):
+        return None
+    manifest = getattr(instance, f'{field_name}_variants')
+    storage = getattr(instance, field_name).storage
+    build_url = build_url or (lambda url: url)
+    return {
+        'width': manifest['width'],
+        'height': manifest['height'],
+        'srcset': {
+            extension: ', '.join(
+                f"{build_url(storage.url(derived_name(manifest['source'], f'w{width}', extension)))} {width}w"
+                for width in manifest['widths']
+            )
+            for extension in manifest['formats']
+        },
+    }
+
+
+@task('common.build_image_variants')
+def build_image_variants(model, pk, field_name):
+    """Build the variants of an image field and store their manifest on the row."""
+    model_class = apps.get_model(model)
+    instance = model_class._default_manager.filter(pk=pk).first()
+    if instance is None or not getattr(instance, field_name) or variants_are_current(instance, field_name):
+        return
+    field_file = getattr(instance, field_name)
+    manifest = build_variants(field_file.name, field_file.storage)
+
+    with transaction.atomic():
+        instance = model_class._default_manager.filter(pk=pk).first()
+        # Skip the write if the image was replaced meanwhile; its own task builds the new variants
+        if instance is not None and getattr(instance, field_name).name == manifest['source']:
+            setattr(instance, f'{field_name}_variants', manifest)
+            # A regular save, so receivers such as cache invalidation see the change
+            instance.save(update_fields=[f'{field_name}_variants'])
@@ -0,0 +1,119 @@
+"""
+Rate-limit counters shared by every worker process on the host.
+
+Counters live in a small SQLite database (``THROTTLE_STORE_PATH``) in WAL mode,
+separate from the application database, so throttle checks never wait on
+booking transactions. Each key is one row holding the index of the current
+fixed window, the hits counted in it and the hits counted in the window before.
+A check estimates the rate over the sliding window ending now as
+
+    previous * (share of the previous window still inside it) + current
+
+which keeps memory per key constant, unlike a list of request timestamps. The
+read, the decision and the increment happen in one ``BEGIN IMMEDIATE``
+transaction, so concurrent workers never admit more requests than the limit.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+
+# Rows idle for two windows are deleted at most this often (seconds) per process
+PRUNE_INTERVAL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    slot INTEGER NOT NULL,
+    current INTEGER NOT NULL,
+    previous INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+# Moves the row into ``slot``, shifting or resetting the counts, and returns them.
+# Right-hand sides of SET see the row as it was before the update.
+_ADVANCE = """
+INSERT INTO counters (key, slot, current, previous, expires_at) VALUES (?, ?, 0, 0, ?)
+ON CONFLICT (key) DO UPDATE SET
+    previous = CASE slot WHEN excluded.slot THEN previous WHEN excluded.slot - 1 THEN current ELSE 0 END,
+    current = CASE slot WHEN excluded.slot THEN current ELSE 0 END,
+    slot = excluded.slot,
+    expires_at = excluded.expires_at
+RETURNING current, previous
+"""
+
+
+class CounterStore:
+    """Sliding-window counters in a SQLite file, one connection per thread and process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._pruned_at = time.monotonic()
+
+    def _connection(self):
+        # Connections are not carried across fork(), e.g. from a preloading server
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def hit(self, key, limit, duration, now=None):
+        """
+        Count a request for ``key`` if fewer than ``limit`` fall in the last ``duration`` seconds.
+
+        Returns ``(allowed, wait)``, where ``wait`` is the number of seconds until a
+        request would be allowed again, or ``None`` when this one was allowed.
+        """
+        now = time.time() if now is None else now
+        slot = int(now // duration)
+        elapsed = now / duration - slot
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            current, previous = connection.execute(_ADVANCE, (key, slot, (slot + 2) * duration)).fetchone()
+            allowed = previous * (1 - elapsed) + current < limit
+            if allowed:
+                connection.execute('UPDATE counters SET current = current + 1 WHERE key = ?', (key,))
+            if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+                connection.execute('DELETE FROM counters WHERE expires_at < ?', (now,))
+                self._pruned_at = time.monotonic()
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+        if allowed:
+            return True, None
+        if current >= limit:
+            # Only the next window can free capacity
+            return False, (1 - elapsed) * duration
+        # The previous window's weight falls until the estimate drops below the limit
+        return False, max((1 - (limit - current) / previous - elapsed) * duration, 0)
+
+    def clear(self):
+        """Delete every counter."""
+        self._connection().execute('DELETE FROM counters')
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def counter_store():
+    """Return the process-wide store for ``THROTTLE_STORE_PATH``."""
+    global _store
+    path = str(settings.THROTTLE_STORE_PATH)
+    if _store is None or _store.path != path:
+        with _store_lock:
+            if _store is None or _store.path != path:
+                _store = CounterStore(path)
+    return _store
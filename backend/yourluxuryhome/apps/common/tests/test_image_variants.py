@@ -0,0 +1,120 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, ApartmentImage
+from apps.common.images import variant_widths
+from apps.tasks.models import Task
+from apps.tasks.worker import Worker
+from apps.users.models import User
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def upload(size=(2000, 1500), name='photo.jpg'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (90, 140, 200)).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageVariantTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        """Create a signed-in user and an apartment for the images."""
+        self.user = User.objects.create_user(
+            username='variantuser',
+            email='variantuser@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartment = Apartment.objects.create(
+            name='Variant Test Apartment',
+            description='An apartment used by image variant tests.',
+            address='1 Variant Street',
+            city='Trondheim',
+            country='Norway',
+            price_per_night=110.00
+        )
+
+    def image_variants(self, image):
+        url = reverse('apartments:apartment-image-detail', kwargs={'pk': image.pk})
+        return self.client.get(url).json()['image_variants']
+
+    def test_widths_are_never_upscaled(self):
+        """Widths above the original are dropped, and the original width caps the list."""
+        self.assertEqual(variant_widths(4000), [320, 640, 1024, 1600])
+        self.assertEqual(variant_widths(1200), [320, 640, 1024, 1200])
+        self.assertEqual(variant_widths(200), [200])
+
+    def test_upload_builds_webp_and_jpeg_variants(self):
+        """Saving an image queues the build; the API then lists both formats as srcsets."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        self.assertEqual(Task.objects.filter(name='common.build_image_variants').count(), 1)
+        Worker().run(burst=True)
+
+        image.refresh_from_db()
+        self.assertEqual(image.image_variants['widths'], [320, 640, 1024, 1600])
+        stem = image.image.name.rsplit('.', 1)[0]
+        with default_storage.open(f'{stem}_w640.webp') as variant:
+            opened = Image.open(variant)
+            self.assertEqual((opened.format, opened.size), ('WEBP', (640, 480)))
+        with default_storage.open(f'{stem}_w1600.jpg') as variant:
+            self.assertEqual(Image.open(variant).size, (1600, 1200))
+
+        variants = self.image_variants(image)
+        self.assertEqual((variants['width'], variants['height']), (1600, 1200))
+        self.assertEqual(list(variants['srcset']), ['webp', 'jpg'])
+        webp = variants['srcset']['webp'].split(', ')
+        self.assertEqual(len(webp), 4)
+        self.assertEqual(webp[0], f'http://testserver/media/{stem}_w320.webp 320w')
+
+    def test_replaced_image_hides_stale_variants(self):
+        """Variants built from a previous upload are not exposed."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        Worker().run(burst=True)
+        image.refresh_from_db()
+        image.image = upload(name='replacement.jpg')
+        image.save()
+
+        self.assertIsNone(self.image_variants(image))
+        Worker().run(burst=True)
+        self.assertIn('replacement_w320.webp', self.image_variants(image)['srcset']['webp'])
+
+    def test_missing_variants_are_queued_once_on_request(self):
+        """An image without variants gets one build queued by the first request that serializes it."""
+        image = ApartmentImage.objects.create(apartment=self.apartment, image=upload())
+        Task.objects.all().delete()
+        cache.clear()
+
+        self.assertIsNone(self.image_variants(image))
+        self.assertIsNone(self.image_variants(image))
+        self.assertEqual(Task.objects.filter(name='common.build_image_variants').count(), 1)
+        Worker().run(burst=True)
+        self.assertIsNotNone(self.image_variants(image))
+
+    def test_profile_photo_variants(self):
+        """A small profile photo gets a single variant at its own width."""
+        profile = self.user.profile
+        profile.photo = upload((300, 300), 'avatar.jpg')
+        profile.save()
+        Worker().run(burst=True)
+
+        # Reload the user, as the authentication cache would after the profile changed
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        variants = self.client.get(reverse('users:profile')).json()['photo_variants']
+        self.assertEqual((variants['width'], variants['height']), (300, 300))
+        self.assertTrue(variants['srcset']['jpg'].endswith('avatar_w300.jpg 300w'))
@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.common.ratelimit import CounterStore, counter_store
+from apps.common.throttling import LoginRateThrottle
+
+
+class LoginProbeView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [LoginRateThrottle]
+
+    def post(self, request):
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CounterStoreTests(SimpleTestCase):
+    def setUp(self):
+        """Use the per-test store file."""
+        self.store = counter_store()
+
+    def test_limit_within_a_window(self):
+        """Hits beyond the limit are refused until the next window."""
+        self.assertEqual([self.store.hit('k', 3, 10, now=100 + i)[0] for i in range(4)], [True, True, True, False])
+        allowed, wait = self.store.hit('k', 3, 10, now=104)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 6)
+
+    def test_previous_window_weight_slides_out(self):
+        """Hits in the previous window count in proportion to how much of it is still covered."""
+        for _ in range(4):
+            self.store.hit('k', 4, 10, now=101)
+        # 4 * 0.8 + 0 < 4, then 4 * 0.8 + 1 >= 4 until the weight drops to 0.75
+        self.assertTrue(self.store.hit('k', 4, 10, now=112)[0])
+        allowed, wait = self.store.hit('k', 4, 10, now=112)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.5)
+        self.assertTrue(self.store.hit('k', 4, 10, now=113)[0])
+
+    def test_counters_are_shared_between_connections(self):
+        """Separate stores on one file, as in separate worker processes, share each limit."""
+        other = CounterStore(self.store.path)
+        self.assertTrue(self.store.hit('shared', 2, 60, now=0)[0])
+        self.assertTrue(other.hit('shared', 2, 60, now=1)[0])
+        self.assertFalse(self.store.hit('shared', 2, 60, now=2)[0])
+        self.assertTrue(other.hit('another', 2, 60, now=2)[0])
+
+    def test_idle_rows_are_pruned(self):
+        """Rows idle for two windows are deleted during a later hit."""
+        self.store.hit('old', 1, 10, now=0)
+        self.store._pruned_at = float('-inf')
+        self.store.hit('new', 1, 10, now=100)
+        keys = [row[0] for row in self.store._connection().execute('SELECT key FROM counters')]
+        self.assertEqual(keys, ['new'])
+
+
+class SharedRateThrottleTests(SimpleTestCase):
+    def test_throttled_response_has_retry_after(self):
+        """Requests over the rate get 429 with a Retry-After header."""
+        view = LoginProbeView.as_view()
+        factory = APIRequestFactory()
+        codes = [view(factory.post('/')).status_code for _ in range(LoginRateThrottle().num_requests)]
+        response = view(factory.post('/'))
+        self.assertEqual(set(codes), {status.HTTP_204_NO_CONTENT})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
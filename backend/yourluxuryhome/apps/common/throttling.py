@@ -1,4 +1,38 @@
-from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
+from rest_framework import throttling
+
+from .ratelimit import counter_store
+
+
+class SharedRateThrottleMixin:
+    """
+    Count requests in the host-wide counter store instead of the default cache.
+    
+    DRF's throttles keep every request timestamp per key in the cache, which
+    is local to each worker process; the shared store keeps two counters per
+    key and is seen by all workers, so a limit holds however many there are.
+    """
+    
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        
+        allowed, self.wait_seconds = counter_store().hit(self.key, self.num_requests, self.duration, self.timer())
+        return allowed
+    
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonRateThrottle(SharedRateThrottleMixin, throttling.AnonRateThrottle):
+    """Rate limit for anonymous requests ('anon' scope), shared across processes."""
+
+
+class UserRateThrottle(SharedRateThrottleMixin, throttling.UserRateThrottle):
+    """Rate limit per user, or per IP for anonymous requests ('user' scope), shared across processes."""
 
 
 class LoginRateThrottle(AnonRateThrottle):
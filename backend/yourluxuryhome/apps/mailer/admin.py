@@ -0,0 +1,25 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxEmail, OutboxStatus
+from .tasks import flush_outbox
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subject', 'status', 'attempts', 'created_at', 'sent_at', 'latency']
+    list_filter = ['status']
+    search_fields = ['subject', 'to', 'last_error']
+    readonly_fields = ['created_at', 'sent_at', 'latency']
+    date_hierarchy = 'created_at'
+    
+    actions = ['retry_emails']
+    
+    def retry_emails(self, request, queryset):
+        updated = queryset.filter(status=OutboxStatus.FAILED).update(
+            status=OutboxStatus.QUEUED, attempts=0, next_attempt_at=timezone.now()
+        )
+        if updated:
+            flush_outbox.enqueue()
+        self.message_user(request, f'{updated} failed email(s) queued for retry.')
+    retry_emails.short_description = 'Retry selected failed emails'
@@ -0,0 +1,58 @@
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from apps.tasks.models import Task, TaskStatus
+
+from .models import OutboxEmail
+from .tasks import flush_outbox
+
+
+def _html_alternative(message):
+    for content, mimetype in getattr(message, 'alternatives', []):
+        if mimetype == 'text/html':
+            return content
+    return ''
+
+
+def to_outbox(message):
+    """Build an unsaved OutboxEmail from an EmailMessage."""
+    if message.attachments:
+        raise ValueError("The outbox email backend does not support attachments.")
+    body, html = message.body, _html_alternative(message)
+    if message.content_subtype == 'html':
+        body, html = '', message.body
+    return OutboxEmail(
+        subject=message.subject,
+        body=body,
+        html=html,
+        from_email=message.from_email,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers)
+    )
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Store outgoing email in the outbox instead of talking to the mail server.
+    
+    Saving is a single INSERT in the caller's transaction, so a request never
+    waits on SMTP and an email from a rolled back transaction is never sent.
+    Delivery happens in the ``mailer.flush_outbox`` task, which sends queued
+    emails in batches over one connection to ``MAILER['DELIVERY_BACKEND']``.
+    """
+    
+    def send_messages(self, email_messages):
+        rows = [to_outbox(message) for message in email_messages if message.recipients()]
+        if not rows:
+            return 0
+        OutboxEmail.objects.bulk_create(rows)
+        # One due flush drains the whole outbox, so don't pile up more; a retry
+        # flush delayed by backoff does not count, or new mail would wait for it
+        if not Task.objects.filter(
+            name=flush_outbox.task_name, status=TaskStatus.QUEUED, run_at__lte=timezone.now()
+        ).exists():
+            flush_outbox.enqueue()
+        return len(rows)
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+DEFAULTS = {
+    'DELIVERY_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+    'BATCH_SIZE': 50,  # emails claimed per round trip to the database
+    'MAX_ATTEMPTS': 5,
+    'LEASE': 300,  # seconds a claimed email stays invisible to other workers
+    'TEMPLATE_VERSION': '1',  # bump to drop pre-rendered email templates after a deploy
+}
+
+
+def mailer_setting(name):
+    return getattr(settings, 'MAILER', {}).get(name, DEFAULTS[name])
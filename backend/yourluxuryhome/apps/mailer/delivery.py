@@ -0,0 +1,145 @@
+import logging
+import os
+import socket
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.tasks.worker import retry_delay
+
+from .conf import mailer_setting
+from .models import OutboxEmail, OutboxStatus
+
+
+logger = logging.getLogger(__name__)
+
+DeliveryReport = namedtuple('DeliveryReport', ['sent', 'failed', 'retry_at'])
+
+
+def _ready(now):
+    """Emails due for delivery, including ones left claimed by a crashed worker."""
+    return (
+        Q(status=OutboxStatus.QUEUED, next_attempt_at__lte=now) |
+        Q(status=OutboxStatus.SENDING, locked_until__lt=now)
+    )
+
+
+def claim_emails(limit, lease, worker_id):
+    """Claim up to ``limit`` due emails with a conditional UPDATE, like ``claim_tasks``."""
+    now = timezone.now()
+    candidates = list(
+        OutboxEmail.objects.filter(_ready(now)).order_by('next_attempt_at').values_list('pk', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+    
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    OutboxEmail.objects.filter(_ready(now), pk__in=candidates).update(
+        status=OutboxStatus.SENDING,
+        locked_until=now + timedelta(seconds=lease),
+        locked_by=token
+    )
+    return list(OutboxEmail.objects.filter(pk__in=candidates, locked_by=token).order_by('pk'))
+
+
+def to_message(email, connection=None):
+    """Rebuild the EmailMessage for an outbox row."""
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection
+    )
+    if email.html and email.body:
+        message.attach_alternative(email.html, 'text/html')
+    elif email.html:
+        message.body = email.html
+        message.content_subtype = 'html'
+    return message
+
+
+def deliver_outbox(batch_size=None):
+    """
+    Send every due outbox email and return a DeliveryReport.
+    
+    Emails are claimed ``batch_size`` at a time and all batches share one open
+    connection to the delivery backend, so the SMTP handshake and TLS
+    negotiation happen once per flush instead of once per email. An email that
+    the server rejects is retried with backoff until ``MAX_ATTEMPTS``; if the
+    server cannot be reached at all, the claimed batch is released and the
+    error propagates so the task queue retries the flush.
+    """
+    batch_size = batch_size or mailer_setting('BATCH_SIZE')
+    max_attempts = mailer_setting('MAX_ATTEMPTS')
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    connection = get_connection(mailer_setting('DELIVERY_BACKEND'), fail_silently=False)
+    sent = failed = 0
+    retry_at = None
+    is_open = False
+    
+    try:
+        while True:
+            emails = claim_emails(batch_size, mailer_setting('LEASE'), worker_id)
+            if not emails:
+                break
+            for email in emails:
+                # Only the worker still holding the claim may record the outcome
+                lease = OutboxEmail.objects.filter(pk=email.pk, locked_by=email.locked_by, status=OutboxStatus.SENDING)
+                if not is_open:
+                    try:
+                        connection.open()
+                    except Exception:
+                        OutboxEmail.objects.filter(
+                            locked_by=email.locked_by, status=OutboxStatus.SENDING
+                        ).update(status=OutboxStatus.QUEUED, locked_until=None)
+                        raise
+                    is_open = True
+                try:
+                    connection.send_messages([to_message(email)])
+                except Exception as exc:
+                    attempts = email.attempts + 1
+                    if attempts >= max_attempts:
+                        logger.error("Outbox email %s failed permanently: %s", email.pk, exc)
+                        lease.update(status=OutboxStatus.FAILED, attempts=attempts, locked_until=None, last_error=str(exc))
+                        failed += 1
+                    else:
+                        next_attempt_at = timezone.now() + retry_delay(attempts)
+                        retry_at = min(retry_at or next_attempt_at, next_attempt_at)
+                        lease.update(
+                            status=OutboxStatus.QUEUED,
+                            attempts=attempts,
+                            next_attempt_at=next_attempt_at,
+                            locked_until=None,
+                            last_error=str(exc)
+                        )
+                    # The server may have dropped the connection, so start a fresh one
+                    connection.close()
+                    is_open = False
+                    continue
+                
+                now = timezone.now()
+                latency = now - email.created_at
+                lease.update(
+                    status=OutboxStatus.SENT,
+                    attempts=email.attempts + 1,
+                    sent_at=now,
+                    latency=latency,
+                    locked_until=None,
+                    last_error=None
+                )
+                logger.info("Delivered outbox email %s in %.3fs", email.pk, latency.total_seconds())
+                sent += 1
+    finally:
+        if is_open:
+            connection.close()
+    
+    return DeliveryReport(sent, failed, retry_at)
@@ -0,0 +1,46 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class OutboxStatus(models.TextChoices):
+    QUEUED = 'queued', _('Queued')
+    SENDING = 'sending', _('Sending')
+    SENT = 'sent', _('Sent')
+    FAILED = 'failed', _('Failed')
+
+
+class OutboxEmail(models.Model):
+    """An email accepted by the outbox backend and waiting for, or done with, delivery."""
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    html = models.TextField(blank=True, default='', help_text=_('HTML alternative, if any'))
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=OutboxStatus.choices, default=OutboxStatus.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    latency = models.DurationField(
+        null=True, blank=True,
+        help_text=_('Time between the email being queued and the server accepting it')
+    )
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = _('Outbox email')
+        verbose_name_plural = _('Outbox emails')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_ready_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)}"
@@ -0,0 +1,83 @@
+import re
+
+from django.conf import settings
+from django.template.context import make_context
+from django.template.loader import get_template
+from django.utils.html import escape
+from django.utils.translation import get_language
+
+from .conf import mailer_setting
+
+
+_TOKEN = '[[mailer:{}]]'
+_TOKEN_RE = re.compile(r'\[\[mailer:([\w.]+)\]\]')
+
+# (template name, language, template version, protocol, domain, site name) -> rendered parts
+_prerendered = {}
+
+
+class _PlaceholderUser:
+    """Stands in for the recipient while pre-rendering; every attribute renders as a token."""
+    
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _TOKEN.format(f'user.{name}')
+
+
+class PrerenderedEmailMixin:
+    """
+    Render a templated email once per template, language and template version.
+    
+    The template is rendered with placeholder tokens for the per-recipient
+    values (``placeholders`` and attributes of ``user``), and the cached result
+    is filled in for every message. Placeholder values are inserted verbatim,
+    as the templates do with ``|safe``; user attributes are HTML escaped, as
+    autoescaping would. Bump ``MAILER['TEMPLATE_VERSION']`` when templates
+    change. With DEBUG on, templates are rendered on every send.
+    """
+    placeholders = ('url', 'uid', 'token')
+    
+    def render(self):
+        context = self.get_context_data()
+        key = (
+            self.template_name,
+            get_language() or settings.LANGUAGE_CODE,
+            mailer_setting('TEMPLATE_VERSION'),
+            context.get('protocol'),
+            context.get('domain'),
+            context.get('site_name'),
+        )
+        parts = _prerendered.get(key)
+        if parts is None:
+            parts = self._prerender(context)
+            if not settings.DEBUG:
+                _prerendered[key] = parts
+        
+        user = context.get('user')
+        
+        def fill(match):
+            name = match.group(1)
+            if name.startswith('user.'):
+                value = getattr(user, name[5:], '')
+                return escape(value() if callable(value) else value)
+            return str(context.get(name, ''))
+        
+        for attr, text in parts.items():
+            setattr(self, attr, _TOKEN_RE.sub(fill, text))
+        self._attach_body()
+    
+    def _prerender(self, context):
+        context = dict(context, user=_PlaceholderUser())
+        for name in self.placeholders:
+            context[name] = _TOKEN.format(name)
+        
+        template = get_template(self.template_name)
+        template_context = make_context(context, request=self.request)
+        parts = {}
+        with template_context.bind_template(template.template):
+            for node in template.template.nodelist:
+                attr = self._node_map.get(getattr(node, 'name', ''))
+                if attr is not None:
+                    parts[attr] = node.render(template_context).strip()
+        return parts
@@ -0,0 +1,15 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.tasks.registry import task
+
+from .delivery import deliver_outbox
+
+
+@task('mailer.flush_outbox')
+def flush_outbox():
+    """Deliver every queued email, then schedule another flush for any retries."""
+    report = deliver_outbox()
+    if report.retry_at is not None:
+        flush_outbox.enqueue(delay=max(report.retry_at - timezone.now(), timedelta(0)))
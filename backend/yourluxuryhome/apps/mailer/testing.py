@@ -0,0 +1,118 @@
+import email
+import socketserver
+import threading
+from collections import namedtuple
+
+
+SinkMessage = namedtuple('SinkMessage', ['mail_from', 'rcpt_to', 'message'])
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP and QUIT."""
+    
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+    
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        self.reply('220 localhost SMTP sink ready')
+        mail_from, rcpt_to = None, []
+        
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            argument = command.partition(':')[2].strip().split(' ')[0].strip('<>')
+            
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif verb == 'MAIL':
+                mail_from, rcpt_to = argument, []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                if argument in sink.reject:
+                    self.reply('550 Mailbox unavailable')
+                else:
+                    rcpt_to.append(argument)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for data_line in iter(self.rfile.readline, b''):
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(data_line[1:] if data_line.startswith(b'..') else data_line)
+                with sink.lock:
+                    sink.messages.append(SinkMessage(mail_from, rcpt_to, email.message_from_bytes(b''.join(data))))
+                mail_from, rcpt_to = None, []
+                self.reply('250 OK: queued')
+            elif verb == 'RSET':
+                mail_from, rcpt_to = None, []
+                self.reply('250 OK')
+            elif verb == 'NOOP':
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                break
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPSink:
+    """
+    A local SMTP server that accepts mail and keeps it in memory, for tests.
+    
+    Use it as a context manager and point Django's SMTP settings at it::
+    
+        with SMTPSink() as sink, override_settings(**sink.settings()):
+            ...
+        sink.messages     # SinkMessage(mail_from, rcpt_to, message) tuples
+        sink.connections  # number of SMTP connections opened
+    
+    Recipients listed in ``reject`` are refused with a 550 reply.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=0, reject=()):
+        self.host = host
+        self.port = port
+        self.reject = set(reject)
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = None
+    
+    def start(self):
+        self._server = _SMTPServer((self.host, self.port), _SMTPHandler)
+        self._server.sink = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def settings(self):
+        return {
+            'EMAIL_HOST': self.host,
+            'EMAIL_PORT': self.port,
+            'EMAIL_USE_TLS': False,
+            'EMAIL_USE_SSL': False,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+        }
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
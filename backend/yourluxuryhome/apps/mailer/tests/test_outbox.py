@@ -0,0 +1,124 @@
+from django.core import mail
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from djoser import email as djoser_email
+from rest_framework.test import APITestCase
+
+from apps.mailer import rendering
+from apps.mailer.models import OutboxEmail, OutboxStatus
+from apps.mailer.tasks import flush_outbox
+from apps.mailer.testing import SMTPSink
+from apps.tasks.models import Task
+from apps.tasks.worker import Worker
+from apps.users.email import ActivationEmail
+from apps.users.models import User
+
+
+OUTBOX = 'apps.mailer.backends.OutboxEmailBackend'
+SMTP = {'DELIVERY_BACKEND': 'django.core.mail.backends.smtp.EmailBackend', 'MAX_ATTEMPTS': 2}
+LOCMEM = {'DELIVERY_BACKEND': 'django.core.mail.backends.locmem.EmailBackend'}
+
+
+@override_settings(EMAIL_BACKEND=OUTBOX, MAILER=SMTP)
+class OutboxDeliveryTests(TestCase):
+    def _send(self, count, to='guest@example.com'):
+        for i in range(count):
+            mail.send_mail(f'Message {i}', 'Hello', 'noreply@example.com', [to])
+
+    def test_send_only_stores_message(self):
+        """Sending writes outbox rows and a single flush task, without contacting a server."""
+        self._send(3)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxStatus.QUEUED).count(), 3)
+        self.assertEqual(Task.objects.filter(name='mailer.flush_outbox').count(), 1)
+
+    def test_delayed_retry_flush_does_not_hold_back_new_mail(self):
+        """New mail gets a flush due now even while a retry flush waits for its backoff."""
+        flush_outbox.enqueue(delay=600)
+        self._send(2)
+        flushes = Task.objects.filter(name='mailer.flush_outbox', run_at__lte=timezone.now())
+        self.assertEqual(flushes.count(), 1)
+
+    def test_batch_reuses_one_connection(self):
+        """The worker delivers the whole outbox over one SMTP connection and records latency."""
+        self._send(5)
+        with SMTPSink() as sink, override_settings(**sink.settings()):
+            Worker().run(burst=True)
+
+        self.assertEqual(sink.connections, 1)
+        self.assertEqual(len(sink.messages), 5)
+        self.assertEqual(sink.messages[0].rcpt_to, ['guest@example.com'])
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxStatus.SENT, latency__isnull=False).count(), 5)
+
+    def test_rejected_message_is_retried_then_failed(self):
+        """A rejected recipient does not block the batch and fails after MAX_ATTEMPTS."""
+        self._send(2)
+        self._send(1, to='bounce@example.com')
+        with SMTPSink(reject=['bounce@example.com']) as sink, override_settings(**sink.settings()):
+            Worker().run(burst=True)
+            bounced = OutboxEmail.objects.get(to=['bounce@example.com'])
+            self.assertEqual(bounced.status, OutboxStatus.QUEUED)
+            self.assertEqual(bounced.attempts, 1)
+            self.assertEqual(len(sink.messages), 2)
+
+            OutboxEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=bounced.created_at)
+            Task.objects.update(run_at=bounced.created_at)
+            Worker().run(burst=True)
+
+        bounced.refresh_from_db()
+        self.assertEqual(bounced.status, OutboxStatus.FAILED)
+        self.assertIn('bounce@example.com', bounced.last_error)
+
+    def test_unreachable_server_releases_claim(self):
+        """When the server cannot be reached, claimed emails go back to the queue untouched."""
+        self._send(2)
+        sink = SMTPSink().start()
+        sink.stop()
+        with override_settings(**sink.settings()):
+            Worker().run(burst=True)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxStatus.QUEUED, attempts=0).count(), 2)
+
+
+@override_settings(EMAIL_BACKEND=OUTBOX, MAILER=LOCMEM)
+class PasswordResetOutboxTests(APITestCase):
+    def test_password_reset_email_is_sent_by_worker(self):
+        """The password reset view only stores the email; the worker delivers it."""
+        User.objects.create_user(username='resetuser', email='reset@example.com', password='userpassword')
+        response = self.client.post(reverse('users:password_reset'), {'email': 'reset@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        Worker().run(burst=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reset@example.com'])
+
+
+class PrerenderedEmailTests(TestCase):
+    def setUp(self):
+        """Create two users and clear the pre-rendered template cache."""
+        rendering._prerendered.clear()
+        self.users = [
+            User.objects.create_user(username=f'render{i}', email=f'render{i}@example.com', password='userpassword')
+            for i in range(2)
+        ]
+        self.request = RequestFactory().get('/')
+
+    def test_matches_full_render(self):
+        """Pre-rendered emails are identical to a full template render, for each recipient."""
+        for user in self.users:
+            context = {'user': user, 'domain': 'example.com', 'site_name': 'Your Luxury Home'}
+            expected = djoser_email.ActivationEmail(self.request, context, template_name='email/activation.html')
+            expected.render()
+            actual = ActivationEmail(self.request, context)
+            actual.render()
+            self.assertNotIn('[[mailer:', actual.html)
+            self.assertEqual((actual.subject, actual.body, actual.html), (expected.subject, expected.body, expected.html))
+        self.assertEqual(len(rendering._prerendered), 1)
+
+    def test_template_version_starts_a_new_render(self):
+        """Bumping the template version renders the template again."""
+        context = {'user': self.users[0], 'domain': 'example.com', 'site_name': 'Your Luxury Home'}
+        ActivationEmail(self.request, context).render()
+        with override_settings(MAILER={'TEMPLATE_VERSION': '2'}):
+            ActivationEmail(self.request, context).render()
+        self.assertEqual(len(rendering._prerendered), 2)
@@ -1,10 +1,12 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from .models import Reservation, ReservationService, ReservationStatus
+from .pricing import price_service_line, price_stay, refresh_service_totals
 
 class ReservationServiceInline(admin.TabularInline):
     model = ReservationService
     extra = 0
-    fields = ['service', 'quantity', 'price', 'notes']
+    fields = ['service', 'quantity', 'unit_price', 'price', 'notes']
+    readonly_fields = ['unit_price', 'price']
     autocomplete_fields = ['service']
 
 @admin.register(Reservation)
@@ -12,9 +14,12 @@ class ReservationAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'apartment', 'check_in_date', 'check_out_date', 'guests', 'status', 'total_price', 'created_at']
     list_filter = ['status', 'check_in_date', 'check_out_date', 'created_at']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'apartment__name', 'whatsapp_number']
-    list_editable = ['status']
     date_hierarchy = 'check_in_date'
-    readonly_fields = ['id', 'created_at', 'updated_at', 'duration_days']
+    # Status changes only through the mark_as_* actions, which use transition()
+    readonly_fields = [
+        'id', 'status', 'created_at', 'updated_at', 'duration_days',
+        'nightly_rates', 'accommodation_price', 'services_price', 'total_price'
+    ]
     inlines = [ReservationServiceInline]
     autocomplete_fields = ['user', 'apartment']
     
@@ -26,10 +31,10 @@ class ReservationAdmin(admin.ModelAdmin):
             'fields': ('check_in_date', 'check_out_date', 'duration_days', 'guests')
         }),
         ('Pricing', {
-            'fields': ('total_price',)
+            'fields': ('nightly_rates', 'accommodation_price', 'services_price', 'total_price')
         }),
         ('Status & Contact', {
-            'fields': ('status', 'whatsapp_number', 'special_requests')
+            'fields': ('status', 'expires_at', 'whatsapp_number', 'special_requests')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -46,21 +51,61 @@ class ReservationAdmin(admin.ModelAdmin):
         queryset = queryset.select_related('user', 'apartment')
         return queryset
     
+    def save_model(self, request, obj, form, change):
+        update_fields = set(form.changed_data)
+        # Price new stays, or stays whose apartment or dates were edited
+        if not change or {'apartment', 'check_in_date', 'check_out_date'} & update_fields:
+            price_stay(obj)
+            update_fields |= {'nightly_rates', 'accommodation_price', 'services_price', 'total_price'}
+        if change:
+            # Only the edited columns are written, so a concurrent status change is never overwritten
+            obj.save(update_fields=[*update_fields, 'updated_at'])
+        else:
+            obj.save()
+    
+    def save_formset(self, request, form, formset, change):
+        # Snapshot prices for service lines added through the inline, and re-price edited ones
+        lines = formset.save(commit=False)
+        changed_fields = {line.pk: fields for line, fields in formset.changed_objects}
+        for line in lines:
+            if isinstance(line, ReservationService):
+                fields = changed_fields.get(line.pk, [])
+                if line.price is None or 'service' in fields:
+                    price_service_line(line)
+                elif 'quantity' in fields:
+                    price_service_line(line, line.unit_price)
+            line.save()
+        for line in formset.deleted_objects:
+            line.delete()
+        formset.save_m2m()
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        refresh_service_totals(form.instance)
+    
     actions = ['mark_as_confirmed', 'mark_as_cancelled', 'mark_as_completed']
     
+    def _apply_transition(self, request, queryset, target_status, label):
+        changed = queryset.transition(target_status)
+        self.message_user(request, f'{len(changed)} reservation(s) marked as {label}.')
+        skipped = queryset.count() - len(changed)
+        if skipped:
+            self.message_user(
+                request,
+                f'{skipped} reservation(s) skipped because their status does not allow this change.',
+                messages.WARNING
+            )
+    
     def mark_as_confirmed(self, request, queryset):
-        updated = queryset.update(status=ReservationStatus.CONFIRMED)
-        self.message_user(request, f'{updated} reservation(s) marked as confirmed.')
+        self._apply_transition(request, queryset, ReservationStatus.CONFIRMED, 'confirmed')
     mark_as_confirmed.short_description = 'Mark selected reservations as confirmed'
     
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(status=ReservationStatus.CANCELLED)
-        self.message_user(request, f'{updated} reservation(s) marked as cancelled.')
+        self._apply_transition(request, queryset, ReservationStatus.CANCELLED, 'cancelled')
     mark_as_cancelled.short_description = 'Mark selected reservations as cancelled'
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status=ReservationStatus.COMPLETED)
-        self.message_user(request, f'{updated} reservation(s) marked as completed.')
+        self._apply_transition(request, queryset, ReservationStatus.COMPLETED, 'completed')
     mark_as_completed.short_description = 'Mark selected reservations as completed'
 
 @admin.register(ReservationService)
@@ -68,7 +113,7 @@ class ReservationServiceAdmin(admin.ModelAdmin):
     list_display = ['reservation', 'service', 'quantity', 'price', 'created_at']
     list_filter = ['created_at', 'service__type']
     search_fields = ['reservation__id', 'service__name', 'notes']
-    readonly_fields = ['created_at']
+    readonly_fields = ['unit_price', 'price', 'created_at']
     autocomplete_fields = ['reservation', 'service']
     
     fieldsets = (
@@ -76,7 +121,7 @@ class ReservationServiceAdmin(admin.ModelAdmin):
             'fields': ('reservation', 'service')
         }),
         ('Details', {
-            'fields': ('quantity', 'price', 'notes')
+            'fields': ('quantity', 'unit_price', 'price', 'notes')
         }),
         ('Timestamps', {
             'fields': ('created_at',),
@@ -87,4 +132,29 @@ class ReservationServiceAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         queryset = queryset.select_related('reservation', 'service')
-        return queryset
\ No newline at end of file
+        return queryset
+    
+    def get_readonly_fields(self, request, obj=None):
+        # A line stays on the reservation it was booked with, so only that reservation's totals move
+        if obj is not None:
+            return [*self.readonly_fields, 'reservation']
+        return self.readonly_fields
+    
+    def save_model(self, request, obj, form, change):
+        # Snapshot prices for new lines, and re-price edited ones like the inline does
+        if not change or 'service' in form.changed_data:
+            price_service_line(obj)
+        elif 'quantity' in form.changed_data:
+            price_service_line(obj, obj.unit_price)
+        obj.save()
+        refresh_service_totals(obj.reservation)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_service_totals(obj.reservation)
+    
+    def delete_queryset(self, request, queryset):
+        reservations = list(Reservation.objects.filter(pk__in=queryset.values('reservation')))
+        super().delete_queryset(request, queryset)
+        for reservation in reservations:
+            refresh_service_totals(reservation)
@@ -0,0 +1,164 @@
+"""
+Streaming exports of reservations, their service lines and the availability calendar.
+
+Rows are read with ``values_list().iterator()``, which uses a server-side cursor
+where the database supports one, and written out chunk by chunk, so memory use
+does not grow with the size of the export. CSV is always available; Parquet
+needs the optional ``pyarrow`` package.
+"""
+import csv
+import io
+from itertools import islice
+
+from apps.apartments.models import ApartmentAvailability
+
+from .models import Reservation, ReservationService
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+FORMATS = ['csv', 'parquet']
+CHUNK_SIZE = 2000
+
+# Dataset -> [(column, lookup, Parquet type), ...]
+COLUMNS = {
+    'reservations': [
+        ('id', 'id', 'string'),
+        ('user_email', 'user__email', 'string'),
+        ('apartment_id', 'apartment_id', 'string'),
+        ('apartment_name', 'apartment__name', 'string'),
+        ('city', 'apartment__city', 'string'),
+        ('check_in_date', 'check_in_date', 'date'),
+        ('check_out_date', 'check_out_date', 'date'),
+        ('guests', 'guests', 'int'),
+        ('status', 'status', 'string'),
+        ('accommodation_price', 'accommodation_price', 'money'),
+        ('services_price', 'services_price', 'money'),
+        ('total_price', 'total_price', 'money'),
+        ('created_at', 'created_at', 'timestamp'),
+        ('updated_at', 'updated_at', 'timestamp'),
+    ],
+    'services': [
+        ('id', 'id', 'int'),
+        ('reservation_id', 'reservation_id', 'string'),
+        ('service_id', 'service_id', 'string'),
+        ('service_name', 'service__name', 'string'),
+        ('quantity', 'quantity', 'int'),
+        ('unit_price', 'unit_price', 'money'),
+        ('price', 'price', 'money'),
+        ('created_at', 'created_at', 'timestamp'),
+    ],
+    'availability': [
+        ('apartment_id', 'apartment_id', 'string'),
+        ('apartment_name', 'apartment__name', 'string'),
+        ('date', 'date', 'date'),
+        ('status', 'status', 'string'),
+        ('price_override', 'price_override', 'money'),
+        ('notes', 'notes', 'string'),
+    ],
+}
+
+DATASETS = list(COLUMNS)
+
+
+def export_queryset(dataset, start=None, end=None, status=None, apartment=None):
+    """
+    Return the rows of ``dataset`` as a values_list queryset, filtered and ordered.
+    
+    ``start`` and ``end`` bound the check-in date of reservations (and of the
+    reservation a service line belongs to) or the calendar date of availability
+    rows; ``end`` is exclusive. ``status`` filters reservation or availability
+    status, ``apartment`` the apartment id.
+    """
+    if dataset == 'availability':
+        queryset = ApartmentAvailability.objects.order_by('apartment_id', 'date')
+        date_field, prefix = 'date', ''
+    elif dataset == 'services':
+        queryset = ReservationService.objects.order_by('reservation_id', 'id')
+        date_field, prefix = 'reservation__check_in_date', 'reservation__'
+    else:
+        queryset = Reservation.objects.order_by('check_in_date', 'id')
+        date_field, prefix = 'check_in_date', ''
+    
+    if start:
+        queryset = queryset.filter(**{f'{date_field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{date_field}__lt': end})
+    if status:
+        queryset = queryset.filter(**{f'{prefix}status': status})
+    if apartment:
+        queryset = queryset.filter(**{f'{prefix}apartment_id': apartment})
+    return queryset.values_list(*[lookup for _, lookup, _ in COLUMNS[dataset]])
+
+
+def _rows(queryset):
+    return queryset.iterator(chunk_size=CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object whose write() hands the written value back, for csv.writer."""
+    
+    def write(self, value):
+        return value
+
+
+def stream_csv(dataset, queryset):
+    """Yield the export as CSV lines."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column for column, _, _ in COLUMNS[dataset]])
+    for row in _rows(queryset):
+        yield writer.writerow(row)
+
+
+def _parquet_schema(dataset):
+    types = {
+        'string': pyarrow.string(),
+        'int': pyarrow.int64(),
+        'date': pyarrow.date32(),
+        'timestamp': pyarrow.timestamp('us', tz='UTC'),
+        'money': pyarrow.decimal128(12, 2),
+    }
+    return pyarrow.schema([(column, types[kind]) for column, _, kind in COLUMNS[dataset]])
+
+
+def stream_parquet(dataset, queryset):
+    """Yield the export as a Parquet file, one row group per chunk of rows."""
+    schema = _parquet_schema(dataset)
+    string_columns = [i for i, (_, _, kind) in enumerate(COLUMNS[dataset]) if kind == 'string']
+    buffer = io.BytesIO()
+    writer = pyarrow.parquet.ParquetWriter(buffer, schema)
+    rows = _rows(queryset)
+    
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+        columns = [list(values) for values in zip(*chunk)]
+        for i in string_columns:
+            # UUID keys come back as uuid.UUID objects
+            columns[i] = [None if value is None else str(value) for value in columns[i]]
+        writer.write_table(pyarrow.Table.from_arrays(columns, schema=schema))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    writer.close()
+    yield buffer.getvalue()
+
+
+def stream_export(dataset, export_format, **filters):
+    """
+    Return an iterator over the chunks of an export of ``dataset`` in ``export_format``.
+    
+    Raises RuntimeError for Parquet when pyarrow is not installed.
+    """
+    queryset = export_queryset(dataset, **filters)
+    if export_format == 'parquet':
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires the pyarrow package.")
+        return stream_parquet(dataset, queryset)
+    return stream_csv(dataset, queryset)
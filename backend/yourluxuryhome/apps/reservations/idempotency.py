@@ -0,0 +1,119 @@
+"""
+``Idempotency-Key`` support for create endpoints.
+
+Clients on unreliable connections retry POSTs whose response they never saw.
+With an ``Idempotency-Key`` header, the first successful response is stored in
+``IdempotencyRecord`` and every retry with the same key gets it back instead of
+creating a second object.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyRecord
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    """Hash the method, path and parsed body, so equivalent JSON bodies match."""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    digest = hashlib.sha256()
+    for part in (request.method, request.path, body):
+        digest.update(part.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class IdempotentCreateMixin:
+    """
+    Make ``create`` safe to retry when the client sends an ``Idempotency-Key`` header.
+    
+    The key is reserved in the same transaction as the create, so concurrent
+    retries wait for the first one and then replay its response, marked with
+    ``Idempotent-Replayed: true``. Replays do not run ``create`` again and do not
+    count against the throttles. Reusing a key for a different request is
+    rejected with 422. Failed requests are not stored and may be retried with
+    the same key.
+    """
+    
+    def _idempotency_key(self, request):
+        if self.action != 'create':
+            return None
+        return request.headers.get(IDEMPOTENCY_HEADER) or None
+    
+    def _stored_record(self, request, key):
+        """The unexpired record for ``key``, looked up once per request."""
+        if not hasattr(self, '_idempotency_record'):
+            self._idempotency_record = IdempotencyRecord.objects.filter(
+                user=request.user, key=key, expires_at__gt=timezone.now()
+            ).first()
+        return self._idempotency_record
+    
+    def check_throttles(self, request):
+        key = self._idempotency_key(request)
+        if key and self._stored_record(request, key) is not None:
+            return
+        super().check_throttles(request)
+    
+    def _reserve_key(self, request, key, fingerprint):
+        """Insert the record for ``key``, or return the one a concurrent request committed."""
+        now = timezone.now()
+        IdempotencyRecord.objects.filter(user=request.user, key=key, expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                return IdempotencyRecord.objects.create(
+                    user=request.user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+                ), True
+        except IntegrityError:
+            return IdempotencyRecord.objects.get(user=request.user, key=key), False
+    
+    def _replay(self, record, fingerprint):
+        if record.fingerprint != fingerprint:
+            return Response(
+                {"error": f"This {IDEMPOTENCY_HEADER} was already used for a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        if record.status_code is None:
+            return Response(
+                {"error": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'})
+    
+    def create(self, request, *args, **kwargs):
+        key = self._idempotency_key(request)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        fingerprint = request_fingerprint(request)
+        record = self._stored_record(request, key)
+        if record is None:
+            with transaction.atomic():
+                record, reserved = self._reserve_key(request, key, fingerprint)
+                if reserved:
+                    response = super().create(request, *args, **kwargs)
+                    if status.is_success(response.status_code):
+                        record.status_code = response.status_code
+                        record.response_body = response.data
+                        record.save(update_fields=['status_code', 'response_body'])
+                    else:
+                        transaction.set_rollback(True)
+                    return response
+        return self._replay(record, fingerprint)
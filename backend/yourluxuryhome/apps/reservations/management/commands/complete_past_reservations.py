@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.reservations.services import complete_past_reservations
+
+
+class Command(BaseCommand):
+    help = 'Mark confirmed reservations whose check-out date has passed as completed (run daily)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of reservations completed per UPDATE')
+    
+    def handle(self, *args, **options):
+        completed = complete_past_reservations(batch_size=options['batch_size'])
+        self.stdout.write(f'Completed {completed} past reservation(s)')
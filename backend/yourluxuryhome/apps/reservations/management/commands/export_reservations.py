@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservations.exports import DATASETS, FORMATS, stream_export
+
+
+def _date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = 'Stream reservations, their service lines or the availability calendar to CSV or Parquet'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=DATASETS, default='reservations')
+        parser.add_argument('--format', dest='export_format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', '-o', help='File to write to (default: standard output, CSV only)')
+        parser.add_argument('--start', type=_date, help='First date to include (YYYY-MM-DD)')
+        parser.add_argument('--end', type=_date, help='Date to stop before (YYYY-MM-DD)')
+        parser.add_argument('--status', help='Only rows with this status')
+        parser.add_argument('--apartment', type=uuid.UUID, help='Only rows of this apartment id')
+    
+    def handle(self, *args, **options):
+        export_format = options['export_format']
+        if export_format == 'parquet' and not options['output']:
+            raise CommandError('Parquet exports need --output.')
+        try:
+            chunks = stream_export(
+                options['dataset'], export_format,
+                start=options['start'], end=options['end'],
+                status=options['status'], apartment=options['apartment']
+            )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        
+        if export_format == 'parquet':
+            output = open(options['output'], 'wb')
+        else:
+            output = open(options['output'], 'w', encoding='utf-8', newline='')
+        with output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {options['dataset']} to {options['output']}"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.reservations.services import prune_idempotency_records
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses older than IDEMPOTENCY_KEY_TTL (run periodically, e.g. hourly from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of records deleted per DELETE')
+    
+    def handle(self, *args, **options):
+        deleted = prune_idempotency_records(batch_size=options['batch_size'])
+        self.stdout.write(f'Deleted {deleted} expired idempotency record(s)')
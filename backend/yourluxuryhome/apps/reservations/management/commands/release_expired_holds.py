@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.reservations.services import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Cancel pending reservations whose hold has expired (run periodically, e.g. every minute from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of reservations released per UPDATE')
+    
+    def handle(self, *args, **options):
+        released = release_expired_holds(batch_size=options['batch_size'])
+        self.stdout.write(f'Released {released} expired reservation hold(s)')
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservation_overlap_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='accommodation_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='nightly_rates',
+            field=models.JSONField(blank=True, default=list, help_text='Price of each night at booking time, as [{"date": ..., "price": ...}]'),
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='services_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='reservationservice',
+            name='unit_price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Service price per unit at booking time', max_digits=10, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reservationservice',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Line total (unit price x quantity) at booking time', max_digits=10, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0006_alter_roomconnection_hotspot_color'),
+        ('reservations', '0004_reservation_price_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, help_text='When a pending reservation stops holding its dates; empty means it never expires', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'expires_at'], name='reservation_hold_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apartments', '0006_alter_roomconnection_hotspot_color'),
+        ('reservations', '0005_reservation_expires_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['status', 'check_out_date'], name='reservation_completion_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 import uuid
 
@@ -12,6 +14,89 @@ class ReservationStatus(models.TextChoices):
     COMPLETED = 'completed', _('Completed')
 
 
+ACTIVE_RESERVATION_STATUSES = [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]
+
+# Target status -> statuses a reservation may move from
+RESERVATION_TRANSITIONS = {
+    ReservationStatus.CONFIRMED: [ReservationStatus.PENDING],
+    ReservationStatus.CANCELLED: [ReservationStatus.PENDING, ReservationStatus.CONFIRMED],
+    ReservationStatus.COMPLETED: [ReservationStatus.CONFIRMED],
+}
+
+
+def _unexpired_q(now):
+    """Excludes pending holds that have run out. Holds without an expiry never run out."""
+    return ~Q(status=ReservationStatus.PENDING, expires_at__lte=now)
+
+
+class ReservationQuerySet(models.QuerySet):
+    def active(self):
+        """Reservations that hold their dates: confirmed ones and pending holds that have not expired."""
+        return self.filter(_unexpired_q(timezone.now()), status__in=ACTIVE_RESERVATION_STATUSES)
+    
+    def expired_holds(self, now=None):
+        """Pending reservations whose hold has run out and that wait to be released."""
+        return self.filter(status=ReservationStatus.PENDING, expires_at__lte=now or timezone.now())
+    
+    def due_for_completion(self, today=None):
+        """Confirmed reservations whose guests have checked out."""
+        return self.filter(
+            status=ReservationStatus.CONFIRMED,
+            check_out_date__lt=today or timezone.now().date()
+        )
+    
+    def overlapping(self, check_in_date, check_out_date):
+        """Active reservations sharing at least one night with the given stay."""
+        return self.active().filter(
+            check_in_date__lt=check_out_date,
+            check_out_date__gt=check_in_date
+        )
+    
+    def revenue(self):
+        """Sum the booking-time price snapshots of the reservations in this queryset."""
+        return self.aggregate(
+            accommodation=models.Sum('accommodation_price'),
+            services=models.Sum('services_price'),
+            total=models.Sum('total_price'),
+        )
+    
+    def with_details(self):
+        """Load everything ReservationSerializer reads in a fixed number of queries."""
+        return self.select_related('user', 'apartment').prefetch_related(
+            models.Prefetch('services', queryset=ReservationService.objects.select_related('service'))
+        )
+    
+    def transition(self, status):
+        """
+        Move the reservations in this queryset to ``status`` where the transition is allowed.
+        
+        The change is applied as one ``UPDATE ... WHERE status IN (...)`` touching only
+        ``status`` and ``updated_at``, so rows whose status changed concurrently are
+        skipped rather than overwritten. Expired holds cannot be confirmed. Sends
+        ``reservations_transitioned`` and returns the ids of the rows that changed.
+        """
+        from .signals import reservations_transitioned
+        
+        now = timezone.now()
+        allowed = Q(status__in=RESERVATION_TRANSITIONS[status])
+        if status == ReservationStatus.CONFIRMED:
+            allowed &= _unexpired_q(now)
+        
+        with transaction.atomic():
+            candidates = self.filter(allowed).order_by()
+            if connections[self.db].features.has_select_for_update:
+                candidates = candidates.select_for_update(of=('self',))
+            changed = list(candidates.values_list('pk', flat=True))
+            if changed:
+                Reservation.objects.using(self.db).filter(allowed, pk__in=changed).update(
+                    status=status, updated_at=now
+                )
+        
+        if changed:
+            reservations_transitioned.send(sender=Reservation, reservation_ids=changed, status=status)
+        return changed
+
+
 class Reservation(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(
@@ -27,6 +112,13 @@ class Reservation(models.Model):
     check_in_date = models.DateField()
     check_out_date = models.DateField()
     guests = models.PositiveSmallIntegerField(default=1)
+    # Price snapshots taken at booking time; reports sum these instead of re-pricing
+    nightly_rates = models.JSONField(
+        default=list, blank=True,
+        help_text=_('Price of each night at booking time, as [{"date": ..., "price": ...}]')
+    )
+    accommodation_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    services_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     status = models.CharField(
         max_length=20,
@@ -35,19 +127,40 @@ class Reservation(models.Model):
     )
     special_requests = models.TextField(blank=True, null=True)
     whatsapp_number = models.CharField(max_length=20, blank=True, null=True)
+    expires_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text=_('When a pending reservation stops holding its dates; empty means it never expires')
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ReservationQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = _('Reservation')
         verbose_name_plural = _('Reservations')
+        indexes = [
+            # Serves the overlap check run under the booking lock
+            models.Index(fields=['apartment', 'check_out_date', 'check_in_date'], name='reservation_overlap_idx'),
+            # Serves the expired hold sweep
+            models.Index(fields=['status', 'expires_at'], name='reservation_hold_expiry_idx'),
+            # Serves the completion sweep
+            models.Index(fields=['status', 'check_out_date'], name='reservation_completion_idx'),
+        ]
     
     def __str__(self):
         return f"Reservation {self.id} - {self.user.email} - {self.check_in_date} to {self.check_out_date}"
     
     def is_active(self):
-        return self.status in [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]
+        return self.status in ACTIVE_RESERVATION_STATUSES and not self.is_expired_hold()
+    
+    def is_expired_hold(self):
+        return (
+            self.status == ReservationStatus.PENDING
+            and self.expires_at is not None
+            and self.expires_at <= timezone.now()
+        )
     
     def is_past_reservation(self):
         return self.check_out_date < timezone.now().date()
@@ -68,7 +181,10 @@ class ReservationService(models.Model):
         related_name='reservation_services'
     )
     quantity = models.PositiveSmallIntegerField(default=1)
-    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True,
+                                     help_text=_('Service price per unit at booking time'))
+    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True,
+                                help_text=_('Line total (unit price x quantity) at booking time'))
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -79,3 +195,39 @@ class ReservationService(models.Model):
     
     def __str__(self):
         return f"{self.service.name} for {self.reservation.id}"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Response stored for a create request sent with an ``Idempotency-Key`` header.
+    
+    A retry with the same key and body gets the stored response back instead of
+    creating the object again. Records expire after ``IDEMPOTENCY_KEY_TTL``.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64, help_text=_('SHA-256 of the request method, path and body'))
+    # Filled in when the request succeeds, in the transaction that reserved the key,
+    # so other requests never see a record without them
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = _('Idempotency Record')
+        verbose_name_plural = _('Idempotency Records')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            # Serves the pruning of expired records
+            models.Index(fields=['expires_at'], name='idempotency_expiry_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.key} ({self.status_code})"
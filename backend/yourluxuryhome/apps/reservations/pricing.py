@@ -0,0 +1,76 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.apartments.models import ApartmentAvailability
+
+
+CENT = Decimal('0.01')
+
+
+def nightly_rates(apartment, check_in_date, check_out_date):
+    """
+    Return ``[(date, price), ...]`` for every night of a stay.
+    
+    Each night uses the availability calendar's ``price_override`` when one is set
+    and the apartment's ``price_per_night`` otherwise. Overrides are loaded in a
+    single query.
+    """
+    overrides = dict(
+        ApartmentAvailability.objects.filter(
+            apartment=apartment,
+            date__gte=check_in_date,
+            date__lt=check_out_date,
+            price_override__isnull=False
+        ).values_list('date', 'price_override')
+    )
+    
+    rates = []
+    night = check_in_date
+    while night < check_out_date:
+        rates.append((night, overrides.get(night, apartment.price_per_night)))
+        night += timedelta(days=1)
+    return rates
+
+
+def price_stay(reservation):
+    """Snapshot the nightly breakdown and accommodation price onto ``reservation`` (not saved)."""
+    rates = nightly_rates(reservation.apartment, reservation.check_in_date, reservation.check_out_date)
+    reservation.nightly_rates = [
+        {'date': night.isoformat(), 'price': str(Decimal(price).quantize(CENT))}
+        for night, price in rates
+    ]
+    reservation.accommodation_price = sum((Decimal(price) for _, price in rates), Decimal('0')).quantize(CENT)
+    reservation.services_price = reservation.services_price or Decimal('0')
+    reservation.total_price = reservation.accommodation_price + reservation.services_price
+
+
+def price_service_line(line, unit_price=None):
+    """
+    Snapshot the unit price and the line total onto ``line`` (not saved).
+    
+    The unit price is the service's current price unless ``unit_price`` is given,
+    e.g. to keep the booked price when only the quantity changes.
+    """
+    line.unit_price = line.service.price if unit_price is None else unit_price
+    line.price = (line.unit_price * line.quantity).quantize(CENT)
+
+
+def refresh_service_totals(reservation):
+    """
+    Recompute a reservation's stored ``services_price`` and ``total_price`` from its service lines.
+    
+    Only the snapshotted line prices are summed, so later changes to ``Service.price``
+    do not affect existing reservations.
+    """
+    from .models import Reservation, ReservationService
+    
+    services_price = ReservationService.objects.filter(reservation=reservation).aggregate(
+        total=Coalesce(Sum('price'), Value(Decimal('0')))
+    )['total']
+    Reservation.objects.filter(pk=reservation.pk).update(
+        services_price=services_price,
+        total_price=Coalesce(F('accommodation_price'), Value(Decimal('0'))) + services_price
+    )
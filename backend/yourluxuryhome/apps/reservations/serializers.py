@@ -1,6 +1,17 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from rest_framework import serializers
+from django.conf import settings
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
+
+from apps.services.models import Service
+
 from .models import Reservation, ReservationService, ReservationStatus
+from .pricing import price_service_line, price_stay
+from .services import apartment_booking_lock
+from .tasks import notify_reservation_created
 
 
 class ReservationServiceSerializer(serializers.ModelSerializer):
@@ -9,8 +20,8 @@ class ReservationServiceSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = ReservationService
-        fields = ['id', 'service', 'service_name', 'service_description', 'quantity', 'price', 'notes']
-        read_only_fields = ['price']
+        fields = ['id', 'service', 'service_name', 'service_description', 'quantity', 'unit_price', 'price', 'notes']
+        read_only_fields = ['unit_price', 'price']
 
 
 class ReservationSerializer(serializers.ModelSerializer):
@@ -25,11 +36,14 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = [
             'id', 'user', 'user_email', 'user_name', 'apartment', 'apartment_name',
-            'check_in_date', 'check_out_date', 'guests', 'total_price', 'status',
-            'status_display', 'special_requests', 'whatsapp_number', 'duration',
-            'services', 'created_at', 'updated_at'
+            'check_in_date', 'check_out_date', 'guests', 'nightly_rates', 'accommodation_price',
+            'services_price', 'total_price', 'status', 'status_display', 'special_requests',
+            'whatsapp_number', 'duration', 'services', 'expires_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'user', 'nightly_rates', 'accommodation_price', 'services_price', 'total_price',
+            'expires_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'total_price', 'created_at', 'updated_at']
     
     def get_user_name(self, obj):
         return f"{obj.user.first_name} {obj.user.last_name}"
@@ -52,27 +66,89 @@ class ReservationSerializer(serializers.ModelSerializer):
         return data
 
 
+class ReservationServiceItemSerializer(serializers.Serializer):
+    """A service to book together with a reservation."""
+    service = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
 class ReservationCreateSerializer(ReservationSerializer):
-    services = serializers.PrimaryKeyRelatedField(many=True, queryset=ReservationService.objects.all(), required=False)
+    services = ReservationServiceItemSerializer(many=True, required=False, write_only=True)
     
     class Meta(ReservationSerializer.Meta):
         fields = ReservationSerializer.Meta.fields
-        read_only_fields = ['id', 'user', 'total_price', 'created_at', 'updated_at']
+        # New reservations always start as pending holds; staff confirm them afterwards
+        read_only_fields = [*ReservationSerializer.Meta.read_only_fields, 'status']
+    
+    def validate_services(self, items):
+        """Resolve every requested service with one query and check it can be booked."""
+        service_ids = [item['service'] for item in items]
+        services = Service.objects.in_bulk(service_ids)
+        
+        seen = set()
+        errors = []
+        for item in items:
+            service_id = item['service']
+            service = services.get(service_id)
+            if service is None or not service.is_active:
+                errors.append({"service": ["This service is not available."]})
+            elif service_id in seen:
+                errors.append({"service": ["This service is already in the list."]})
+            elif item['quantity'] > service.max_quantity:
+                errors.append({"quantity": [f"At most {service.max_quantity} can be booked."]})
+            else:
+                errors.append({})
+                item['service'] = service
+            seen.add(service_id)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+    
+    def to_representation(self, instance):
+        # Respond with the booked lines, loaded with their services in two queries
+        prefetch_related_objects([instance], 'services__service')
+        return ReservationSerializer(instance, context=self.context).data
     
     def create(self, validated_data):
         services_data = validated_data.pop('services', [])
         user = self.context['request'].user
         validated_data['user'] = user
+        apartment = validated_data['apartment']
         
-        # Create reservation
-        reservation = Reservation.objects.create(**validated_data)
-        
-        # Add services if provided
-        for service_id in services_data:
-            ReservationService.objects.create(
-                reservation=reservation,
-                service_id=service_id
+        # Check and insert under the apartment's booking lock so concurrent
+        # requests for the same dates cannot both pass the overlap check
+        with apartment_booking_lock(apartment.pk):
+            if Reservation.objects.filter(apartment=apartment).overlapping(
+                validated_data['check_in_date'], validated_data['check_out_date']
+            ).exists():
+                raise serializers.ValidationError(
+                    {"check_in_date": "The apartment is already booked for the selected dates."}
+                )
+            
+            # Create a pending reservation with the nightly prices in effect now;
+            # it only holds the dates for RESERVATION_HOLD_TTL
+            reservation = Reservation(
+                **validated_data,
+                status=ReservationStatus.PENDING,
+                expires_at=timezone.now() + timedelta(seconds=settings.RESERVATION_HOLD_TTL)
             )
+            price_stay(reservation)
+            
+            # Price the service lines first, so the reservation is saved with its totals
+            lines = [
+                ReservationService(reservation=reservation, service=item['service'], quantity=item['quantity'])
+                for item in services_data
+            ]
+            for line in lines:
+                price_service_line(line)
+            reservation.services_price = sum((line.price for line in lines), Decimal('0'))
+            reservation.total_price = reservation.accommodation_price + reservation.services_price
+            reservation.save()
+            # One INSERT for all lines; the reservation's post_save already refreshes the rollups
+            ReservationService.objects.bulk_create(lines)
+            
+            # Queued in the booking transaction, so a rolled back booking is never announced
+            notify_reservation_created.enqueue(reservation_id=str(reservation.pk))
         
         return reservation
 
@@ -80,14 +156,40 @@ class ReservationCreateSerializer(ReservationSerializer):
 class ReservationUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reservation
-        fields = ['check_in_date', 'check_out_date', 'guests', 'special_requests', 'status', 'whatsapp_number']
+        # Status changes only through the cancel and confirm actions, which use transition()
+        fields = ['check_in_date', 'check_out_date', 'guests', 'special_requests', 'whatsapp_number']
     
-    def validate_status(self, value):
-        # Only allow certain status transitions
-        if self.instance.status == ReservationStatus.CANCELLED and value != ReservationStatus.CANCELLED:
-            raise serializers.ValidationError("Cannot change status once reservation is cancelled.")
+    def update(self, instance, validated_data):
+        dates_changed = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in ('check_in_date', 'check_out_date')
+        )
+        if not dates_changed:
+            return self._save(instance, validated_data)
         
-        if self.instance.status == ReservationStatus.COMPLETED and value != ReservationStatus.COMPLETED:
-            raise serializers.ValidationError("Cannot change status once reservation is completed.")
+        # Moving a stay is checked and saved under the apartment's booking lock, like a new booking
+        with apartment_booking_lock(instance.apartment_id):
+            check_in = validated_data.get('check_in_date', instance.check_in_date)
+            check_out = validated_data.get('check_out_date', instance.check_out_date)
+            if check_out <= check_in:
+                raise serializers.ValidationError({"check_out_date": "Check-out date must be after check-in date."})
+            if Reservation.objects.filter(apartment_id=instance.apartment_id).exclude(pk=instance.pk).overlapping(
+                check_in, check_out
+            ).exists():
+                raise serializers.ValidationError(
+                    {"check_in_date": "The apartment is already booked for the selected dates."}
+                )
+            return self._save(instance, validated_data, reprice=True)
+    
+    def _save(self, instance, validated_data, reprice=False):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        update_fields = [*validated_data, 'updated_at']
         
-        return value
+        # A new stay is priced at today's rates; otherwise the booking snapshot is kept
+        if reprice:
+            price_stay(instance)
+            update_fields += ['nightly_rates', 'accommodation_price', 'services_price', 'total_price']
+        # Only the edited columns are written, so a concurrent status change is never overwritten
+        instance.save(update_fields=update_fields)
+        return instance
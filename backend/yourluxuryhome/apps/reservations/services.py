@@ -0,0 +1,94 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.apartments.models import Apartment
+
+from .models import IdempotencyRecord, Reservation, ReservationStatus
+
+
+_apartment_locks = {}
+_apartment_locks_guard = threading.Lock()
+
+
+def _process_lock(apartment_id):
+    with _apartment_locks_guard:
+        return _apartment_locks.setdefault(apartment_id, threading.Lock())
+
+
+@contextmanager
+def apartment_booking_lock(apartment_id):
+    """
+    Run the enclosed block as a transaction that holds the apartment's booking lock.
+    
+    On databases with row locks the apartment row is taken with SELECT ... FOR UPDATE.
+    SQLite has no row locks; there, threads of this process queue on a per-apartment
+    lock, and the ``IMMEDIATE`` transaction mode set in the database settings makes
+    every transaction take SQLite's write lock up front, which serializes bookings
+    made by other processes.
+    """
+    with _process_lock(apartment_id):
+        with transaction.atomic():
+            if connection.features.has_select_for_update:
+                list(
+                    Apartment.objects.select_for_update().filter(pk=apartment_id).values_list('pk', flat=True)
+                )
+            yield
+
+
+def _transition_in_batches(queryset, order_by, status, batch_size):
+    """
+    Move the rows of ``queryset`` to ``status`` ``batch_size`` at a time and return the count.
+    
+    Each chunk is one conditional ``transition()`` in its own transaction, so a
+    sweep never holds locks for long and an interrupted run simply resumes with
+    the rows that are still left on the next call.
+    """
+    changed = 0
+    while True:
+        chunk = list(queryset.order_by(order_by).values_list('pk', flat=True)[:batch_size])
+        if not chunk:
+            return changed
+        changed += len(queryset.filter(pk__in=chunk).transition(status))
+
+
+def release_expired_holds(batch_size=500):
+    """
+    Cancel pending reservations whose hold has expired and return how many were released.
+    
+    Holds are found through ``reservation_hold_expiry_idx`` in expiry order, and a
+    hold confirmed meanwhile is left alone. Expired holds already stop blocking
+    their dates before this runs; the sweep makes the status match and notifies
+    ``reservations_transitioned`` listeners.
+    """
+    expired = Reservation.objects.expired_holds(timezone.now())
+    return _transition_in_batches(expired, 'expires_at', ReservationStatus.CANCELLED, batch_size)
+
+
+def complete_past_reservations(batch_size=500, today=None):
+    """
+    Mark confirmed reservations that have checked out as completed and return the count.
+    
+    Candidates are found through ``reservation_completion_idx``. Running it again
+    is harmless: completed rows no longer match.
+    """
+    due = Reservation.objects.due_for_completion(today)
+    return _transition_in_batches(due, 'check_out_date', ReservationStatus.COMPLETED, batch_size)
+
+
+def prune_idempotency_records(batch_size=1000):
+    """
+    Delete idempotency records past their expiry and return how many were removed.
+    
+    Records are found through ``idempotency_expiry_idx`` and deleted a batch at a
+    time, so the sweep never holds locks for long.
+    """
+    deleted = 0
+    expired = IdempotencyRecord.objects.filter(expires_at__lte=timezone.now())
+    while True:
+        chunk = list(expired.order_by('expires_at').values_list('pk', flat=True)[:batch_size])
+        if not chunk:
+            return deleted
+        deleted += IdempotencyRecord.objects.filter(pk__in=chunk).delete()[0]
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# Sent by ReservationQuerySet.transition() after reservations change status.
+# Arguments: ``reservation_ids`` (the changed ids) and ``status`` (the new status).
+reservations_transitioned = Signal()
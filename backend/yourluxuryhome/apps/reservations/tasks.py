@@ -0,0 +1,25 @@
+import logging
+
+from apps.tasks.registry import task
+
+from .models import Reservation
+
+
+logger = logging.getLogger(__name__)
+
+
+@task('reservations.notify_created')
+def notify_reservation_created(reservation_id):
+    """
+    Notify the guest that their reservation was received.
+    
+    WhatsApp delivery is not integrated yet; until it is, the message is logged.
+    """
+    reservation = Reservation.objects.select_related('user', 'apartment').filter(pk=reservation_id).first()
+    if reservation is None or not reservation.whatsapp_number:
+        return
+    logger.info(
+        "WhatsApp to %s: reservation %s at %s from %s to %s received.",
+        reservation.whatsapp_number, reservation.pk, reservation.apartment.name,
+        reservation.check_in_date, reservation.check_out_date
+    )
@@ -0,0 +1,128 @@
+import threading
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from apps.apartments.models import Apartment
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.users.models import User
+
+
+def create_apartment(name='Booking Test Apartment'):
+    return Apartment.objects.create(
+        name=name,
+        description='An apartment used by booking tests.',
+        address='1 Booking Street',
+        city='Paris',
+        country='France',
+        price_per_night=150.00,
+        max_guests=4
+    )
+
+
+class ReservationOverlapTests(APITestCase):
+    def setUp(self):
+        """Create a guest, an apartment and an existing reservation."""
+        self.user = User.objects.create_user(
+            username='bookinguser',
+            email='booking@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartment = create_apartment()
+        self.check_in = timezone.now().date() + timedelta(days=7)
+        self.check_out = self.check_in + timedelta(days=3)
+        Reservation.objects.create(
+            user=self.user,
+            apartment=self.apartment,
+            check_in_date=self.check_in,
+            check_out_date=self.check_out
+        )
+        self.url = reverse('reservations:reservation-list')
+
+    def _book(self, check_in, check_out):
+        return self.client.post(self.url, {
+            'apartment': str(self.apartment.id),
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': check_out.isoformat(),
+            'guests': 2
+        }, format='json')
+
+    def test_overlapping_reservation_is_rejected(self):
+        """A stay sharing a night with an active reservation is rejected."""
+        response = self._book(self.check_in + timedelta(days=2), self.check_out + timedelta(days=2))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_back_to_back_reservation_is_accepted(self):
+        """Checking in on another guest's check-out day is allowed."""
+        response = self._book(self.check_out, self.check_out + timedelta(days=2))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_moving_onto_booked_nights_is_rejected(self):
+        """Changing a booking's dates runs the same overlap check as a new booking."""
+        later = self._book(self.check_out, self.check_out + timedelta(days=2))
+        url = reverse('reservations:reservation-detail', kwargs={'pk': later.data['id']})
+        response = self.client.patch(url, {'check_in_date': (self.check_out - timedelta(days=1)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Reservation.objects.get(pk=later.data['id']).check_in_date, self.check_out)
+
+        response = self.client.patch(url, {'check_out_date': (self.check_out + timedelta(days=4)).isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {'check_out_date': self.check_out.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cancelled_reservation_frees_dates(self):
+        """Dates held by a cancelled reservation can be booked again."""
+        Reservation.objects.update(status=ReservationStatus.CANCELLED)
+        response = self._book(self.check_in, self.check_out)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class ConcurrentReservationTests(TransactionTestCase):
+    def test_concurrent_bookings_have_exactly_one_winner(self):
+        """Many threads booking the same dates produce exactly one reservation."""
+        apartment = create_apartment()
+        users = [
+            User.objects.create_user(
+                username=f'racer{i}',
+                email=f'racer{i}@example.com',
+                password='userpassword'
+            )
+            for i in range(8)
+        ]
+        check_in = timezone.now().date() + timedelta(days=30)
+        payload = {
+            'apartment': str(apartment.id),
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + timedelta(days=4)).isoformat(),
+            'guests': 2
+        }
+        url = reverse('reservations:reservation-list')
+        barrier = threading.Barrier(len(users))
+        status_codes = []
+
+        def book(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            try:
+                barrier.wait()
+                status_codes.append(client.post(url, payload, format='json').status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(status_codes.count(status.HTTP_400_BAD_REQUEST), len(users) - 1)
+        self.assertEqual(Reservation.objects.filter(apartment=apartment).count(), 1)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.apartments.models import Apartment
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.services import complete_past_reservations
+from apps.users.models import User
+
+
+class CompletionSweepTests(TestCase):
+    def setUp(self):
+        """Create confirmed past stays plus reservations the sweep must not touch."""
+        user = User.objects.create_user(
+            username='completionuser',
+            email='completion@example.com',
+            password='userpassword'
+        )
+        apartment = Apartment.objects.create(
+            name='Completion Test Apartment',
+            description='An apartment used by completion tests.',
+            address='1 Completion Street',
+            city='Athens',
+            country='Greece',
+            price_per_night=95.00
+        )
+        today = timezone.now().date()
+
+        def create(check_out, reservation_status):
+            return Reservation.objects.create(
+                user=user,
+                apartment=apartment,
+                check_in_date=check_out - timedelta(days=2),
+                check_out_date=check_out,
+                status=reservation_status
+            )
+
+        self.past = [create(today - timedelta(days=i * 3 + 1), ReservationStatus.CONFIRMED) for i in range(5)]
+        self.checking_out_today = create(today, ReservationStatus.CONFIRMED)
+        self.past_pending = create(today - timedelta(days=20), ReservationStatus.PENDING)
+        self.past_cancelled = create(today - timedelta(days=30), ReservationStatus.CANCELLED)
+
+    def test_completes_only_confirmed_past_stays(self):
+        """Confirmed reservations that checked out before today become completed, in batches."""
+        self.assertEqual(complete_past_reservations(batch_size=2), 5)
+        self.assertCountEqual(
+            Reservation.objects.filter(status=ReservationStatus.COMPLETED).values_list('pk', flat=True),
+            [r.pk for r in self.past]
+        )
+        for reservation, expected in [(self.checking_out_today, ReservationStatus.CONFIRMED),
+                                      (self.past_pending, ReservationStatus.PENDING),
+                                      (self.past_cancelled, ReservationStatus.CANCELLED)]:
+            reservation.refresh_from_db()
+            self.assertEqual(reservation.status, expected)
+
+    def test_sweep_is_idempotent(self):
+        """A second run finds nothing left to do."""
+        complete_past_reservations()
+        self.assertEqual(complete_past_reservations(), 0)
+
+    def test_management_command_reports_count(self):
+        """complete_past_reservations reports the rows it touched."""
+        out = StringIO()
+        call_command('complete_past_reservations', '--batch-size', '3', stdout=out)
+        self.assertIn('Completed 5 past reservation(s)', out.getvalue())
@@ -0,0 +1,158 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, ApartmentAvailability
+from apps.reservations import exports
+from apps.reservations.models import Reservation, ReservationService, ReservationStatus
+from apps.services.models import Service, ServiceType
+from apps.users.models import User
+
+
+class ReservationExportTests(APITestCase):
+    def setUp(self):
+        """Create an admin, a guest, two apartments, reservations, a service line and calendar rows."""
+        self.admin_user = User.objects.create_superuser(
+            username='exportadmin',
+            email='exportadmin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(
+            username='exportuser',
+            email='export@example.com',
+            password='userpassword'
+        )
+        self.apartment, self.other_apartment = [
+            Apartment.objects.create(
+                name=name,
+                description='An apartment used by export tests.',
+                address='1 Export Street',
+                city='Lisbon',
+                country='Portugal',
+                price_per_night=Decimal('100.00')
+            )
+            for name in ['Export Apartment', 'Other Export Apartment']
+        ]
+        self.march = Reservation.objects.create(
+            user=self.user,
+            apartment=self.apartment,
+            check_in_date=date(2030, 3, 1),
+            check_out_date=date(2030, 3, 4),
+            status=ReservationStatus.CONFIRMED,
+            accommodation_price=Decimal('300.00'),
+            services_price=Decimal('40.00'),
+            total_price=Decimal('340.00')
+        )
+        self.april = Reservation.objects.create(
+            user=self.user,
+            apartment=self.other_apartment,
+            check_in_date=date(2030, 4, 1),
+            check_out_date=date(2030, 4, 3),
+            status=ReservationStatus.CANCELLED
+        )
+        service = Service.objects.create(
+            name='Breakfast',
+            price=Decimal('20.00'),
+            type=ServiceType.objects.create(name='Food')
+        )
+        ReservationService.objects.create(
+            reservation=self.march,
+            service=service,
+            quantity=2,
+            unit_price=Decimal('20.00'),
+            price=Decimal('40.00')
+        )
+        ApartmentAvailability.objects.create(
+            apartment=self.apartment,
+            date=date(2030, 3, 10),
+            status='maintenance',
+            notes='Painting, "kitchen"'
+        )
+        self.url = reverse('reservations:reservation-export')
+
+    def _csv(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_export_requires_admin(self):
+        """Only staff can export."""
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reservations_csv(self):
+        """The reservations export streams one CSV row per reservation, with prices."""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('reservations.csv', response['Content-Disposition'])
+
+        rows = self._csv()
+        self.assertEqual([row['id'] for row in rows], [str(self.march.pk), str(self.april.pk)])
+        self.assertEqual(rows[0]['user_email'], 'export@example.com')
+        self.assertEqual(rows[0]['total_price'], '340.00')
+
+    def test_filters(self):
+        """Date, status and apartment filters narrow the export."""
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(len(self._csv(start='2030-03-15')), 1)
+        self.assertEqual(len(self._csv(start='2030-03-01', end='2030-04-01')), 1)
+        self.assertEqual(len(self._csv(status=ReservationStatus.CANCELLED)), 1)
+        rows = self._csv(apartment=str(self.other_apartment.pk))
+        self.assertEqual([row['id'] for row in rows], [str(self.april.pk)])
+
+    def test_services_and_availability_datasets(self):
+        """Service lines and calendar rows can be exported too."""
+        self.client.force_authenticate(user=self.admin_user)
+        services = self._csv(dataset='services')
+        self.assertEqual(len(services), 1)
+        self.assertEqual(services[0]['reservation_id'], str(self.march.pk))
+        self.assertEqual(services[0]['price'], '40.00')
+
+        availability = self._csv(dataset='availability', apartment=str(self.apartment.pk))
+        self.assertEqual(availability[0]['notes'], 'Painting, "kitchen"')
+
+    def test_invalid_parameters(self):
+        """Unknown datasets or formats and malformed filters are rejected."""
+        self.client.force_authenticate(user=self.admin_user)
+        for params in [{'dataset': 'users'}, {'file_format': 'xlsx'}, {'start': '01/03/2030'}, {'apartment': 'nope'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.data)
+
+    @unittest.skipIf(exports.pyarrow, 'pyarrow is installed')
+    def test_parquet_without_pyarrow(self):
+        """Asking for Parquet without pyarrow is a client error, not a crash."""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.url, {'file_format': 'parquet'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @unittest.skipUnless(exports.pyarrow, 'pyarrow is not installed')
+    def test_parquet_export(self):
+        """The Parquet export holds the same rows, with typed columns."""
+        import pyarrow.parquet
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(self.url, {'file_format': 'parquet'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = pyarrow.parquet.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.column('id').to_pylist(), [str(self.march.pk), str(self.april.pk)])
+        self.assertEqual(table.column('total_price').to_pylist()[0], Decimal('340.00'))
+
+    def test_export_command(self):
+        """export_reservations writes the filtered CSV to a file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reservations.csv')
+            call_command('export_reservations', output=path, status='confirmed', stdout=io.StringIO())
+            with open(path, encoding='utf-8') as output:
+                rows = list(csv.DictReader(output))
+        self.assertEqual([row['id'] for row in rows], [str(self.march.pk)])
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.services import release_expired_holds
+from apps.reservations.signals import reservations_transitioned
+from apps.users.models import User
+
+
+@override_settings(RESERVATION_HOLD_TTL=600)
+class ReservationHoldTests(APITestCase):
+    def setUp(self):
+        """Create a guest, an admin and an apartment."""
+        self.user = User.objects.create_user(
+            username='holduser',
+            email='hold@example.com',
+            password='userpassword'
+        )
+        self.admin_user = User.objects.create_superuser(
+            username='holdadmin',
+            email='holdadmin@example.com',
+            password='adminpassword'
+        )
+        self.apartment = Apartment.objects.create(
+            name='Hold Test Apartment',
+            description='An apartment used by hold tests.',
+            address='1 Hold Street',
+            city='Lisbon',
+            country='Portugal',
+            price_per_night=110.00
+        )
+        self.check_in = timezone.now().date() + timedelta(days=14)
+        self.check_out = self.check_in + timedelta(days=3)
+
+    def _hold(self, expires_in, status=ReservationStatus.PENDING, offset=0):
+        return Reservation.objects.create(
+            user=self.user,
+            apartment=self.apartment,
+            check_in_date=self.check_in + timedelta(days=offset),
+            check_out_date=self.check_out + timedelta(days=offset),
+            status=status,
+            expires_at=None if expires_in is None else timezone.now() + timedelta(seconds=expires_in)
+        )
+
+    def _book(self, **extra):
+        self.client.force_authenticate(user=self.user)
+        return self.client.post(reverse('reservations:reservation-list'), {
+            'apartment': str(self.apartment.id),
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': self.check_out.isoformat(),
+            'guests': 2,
+            **extra
+        }, format='json')
+
+    def test_booking_sets_hold_expiry(self):
+        """A new pending reservation holds its dates for RESERVATION_HOLD_TTL."""
+        response = self._book()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        expires_at = Reservation.objects.get(pk=response.data['id']).expires_at
+        self.assertAlmostEqual(
+            (expires_at - timezone.now()).total_seconds(), 600, delta=30
+        )
+
+    def test_booking_cannot_choose_its_status(self):
+        """A status sent with a booking is ignored; it starts as a pending hold."""
+        response = self._book(status=ReservationStatus.CONFIRMED)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], ReservationStatus.PENDING)
+        self.assertIsNotNone(Reservation.objects.get(pk=response.data['id']).expires_at)
+
+    def test_expired_hold_does_not_block_dates(self):
+        """Once a hold expires its dates can be booked, even before the sweeper runs."""
+        self._hold(expires_in=-60)
+        self.assertFalse(self.apartment.is_booked(self.check_in, self.check_out))
+        self.assertEqual(self._book().status_code, status.HTTP_201_CREATED)
+
+    def test_live_hold_blocks_dates(self):
+        """A hold that has not expired still blocks its dates."""
+        self._hold(expires_in=60)
+        self.assertTrue(self.apartment.is_booked(self.check_in, self.check_out))
+        self.assertEqual(self._book().status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sweeper_releases_only_expired_holds(self):
+        """The sweeper cancels expired holds in chunks and leaves everything else alone."""
+        expired = [self._hold(expires_in=-60, offset=i * 4) for i in range(5)]
+        live = self._hold(expires_in=60, offset=20)
+        legacy = self._hold(expires_in=None, offset=24)
+        confirmed = self._hold(expires_in=-60, status=ReservationStatus.CONFIRMED, offset=28)
+
+        notified = []
+        handler = lambda sender, reservation_ids, status, **kwargs: notified.extend(reservation_ids)
+        reservations_transitioned.connect(handler)
+        try:
+            self.assertEqual(release_expired_holds(batch_size=2), 5)
+        finally:
+            reservations_transitioned.disconnect(handler)
+
+        self.assertCountEqual(notified, [r.pk for r in expired])
+        self.assertEqual(Reservation.objects.filter(status=ReservationStatus.CANCELLED).count(), 5)
+        for reservation, expected in [(live, ReservationStatus.PENDING), (legacy, ReservationStatus.PENDING),
+                                      (confirmed, ReservationStatus.CONFIRMED)]:
+            reservation.refresh_from_db()
+            self.assertEqual(reservation.status, expected)
+        self.assertEqual(release_expired_holds(), 0)
+
+    def test_expired_hold_cannot_be_confirmed(self):
+        """Confirming a hold after it expired is rejected."""
+        hold = self._hold(expires_in=-60)
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(reverse('reservations:reservation-confirm', kwargs={'pk': hold.pk}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'The reservation hold has expired.')
+
+    def test_management_command(self):
+        """release_expired_holds reports how many holds it released."""
+        self._hold(expires_in=-60)
+        out = StringIO()
+        call_command('release_expired_holds', stdout=out)
+        self.assertIn('Released 1 expired reservation hold(s)', out.getvalue())
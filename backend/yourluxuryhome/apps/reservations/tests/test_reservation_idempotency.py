@@ -0,0 +1,113 @@
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment
+from apps.reservations.models import IdempotencyRecord, Reservation, ReservationService
+from apps.reservations.serializers import ReservationCreateSerializer
+from apps.services.models import Service, ServiceType
+from apps.users.models import User
+
+
+class IdempotencyKeyTests(APITestCase):
+    def setUp(self):
+        """Create a guest, an apartment and a service."""
+        self.user = User.objects.create_user(
+            username='idempotentuser',
+            email='idempotent@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartment = Apartment.objects.create(
+            name='Idempotency Test Apartment',
+            description='An apartment used by idempotency tests.',
+            address='1 Retry Street',
+            city='Oslo',
+            country='Norway',
+            price_per_night=Decimal('100.00')
+        )
+        self.service = Service.objects.create(
+            name='Late Checkout',
+            price=Decimal('30.00'),
+            type=ServiceType.objects.create(name='Stay')
+        )
+        check_in = timezone.now().date() + timedelta(days=10)
+        self.payload = {
+            'apartment': str(self.apartment.id),
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + timedelta(days=2)).isoformat(),
+            'guests': 2
+        }
+        self.url = reverse('reservations:reservation-list')
+
+    def _book(self, key, payload=None):
+        return self.client.post(self.url, payload or self.payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        """A retry with the same key returns the first response without creating again."""
+        first = self._book('key-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with mock.patch.object(ReservationCreateSerializer, 'create') as create:
+            retry = self._book('key-1')
+        create.assert_not_called()
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_key_reused_for_other_body_is_rejected(self):
+        """Reusing a key with a different body is a client error."""
+        self._book('key-2')
+        response = self._book('key-2', {**self.payload, 'guests': 3})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_failed_request_is_not_stored(self):
+        """A rejected request leaves the key free for a corrected retry."""
+        response = self._book('key-3', {**self.payload, 'apartment': 'not-an-id'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+        self.assertEqual(self._book('key-3').status_code, status.HTTP_201_CREATED)
+
+    def test_replays_skip_the_throttle(self):
+        """Retries do not use up the reservation_create throttle budget."""
+        self._book('key-4')
+        with mock.patch('apps.common.throttling.ReservationCreateRateThrottle.allow_request') as allow:
+            self.assertEqual(self._book('key-4').status_code, status.HTTP_201_CREATED)
+        allow.assert_not_called()
+
+    def test_without_key_requests_are_not_deduplicated(self):
+        """Requests without the header behave as before."""
+        self.assertEqual(self._book('').status_code, status.HTTP_201_CREATED)
+        self.assertFalse(IdempotencyRecord.objects.exists())
+
+    def test_service_line_retry(self):
+        """Adding a service to a reservation is idempotent too."""
+        reservation_id = self._book('key-5').data['id']
+        url = reverse('reservations:reservation-services-list', kwargs={'reservation_pk': reservation_id})
+        payload = {'service': str(self.service.id), 'quantity': 1}
+        first = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='line-1')
+        retry = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='line-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(ReservationService.objects.count(), 1)
+
+    def test_expired_records_are_pruned_and_key_reusable(self):
+        """Expired records no longer replay and are removed by prune_idempotency_keys."""
+        self._book('key-6')
+        IdempotencyRecord.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        Reservation.objects.all().delete()
+        self.assertEqual(self._book('key-6').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+        IdempotencyRecord.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        call_command('prune_idempotency_keys', stdout=io.StringIO())
+        self.assertFalse(IdempotencyRecord.objects.exists())
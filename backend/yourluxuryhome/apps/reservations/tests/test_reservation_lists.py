@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment
+from apps.reservations.models import Reservation, ReservationService, ReservationStatus
+from apps.services.models import Service, ServiceType
+from apps.users.models import User
+
+
+class ReservationListQueryTests(APITestCase):
+    def setUp(self):
+        """Create a staff user, a guest, an apartment and two services."""
+        self.admin_user = User.objects.create_superuser(
+            username='listadmin',
+            email='listadmin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(
+            username='listuser',
+            email='list@example.com',
+            password='userpassword',
+            first_name='List',
+            last_name='User'
+        )
+        self.apartment = Apartment.objects.create(
+            name='List Test Apartment',
+            description='An apartment used by list tests.',
+            address='1 List Street',
+            city='Madrid',
+            country='Spain',
+            price_per_night=90.00
+        )
+        service_type = ServiceType.objects.create(name='Wellness')
+        self.services = [
+            Service.objects.create(name='Massage', price=80, type=service_type),
+            Service.objects.create(name='Yoga', price=40, type=service_type),
+        ]
+        self.next_check_in = timezone.now().date() + timedelta(days=3)
+
+    def _create_reservations(self, count):
+        for _ in range(count):
+            reservation = Reservation.objects.create(
+                user=self.user,
+                apartment=self.apartment,
+                check_in_date=self.next_check_in,
+                check_out_date=self.next_check_in + timedelta(days=2),
+                status=ReservationStatus.CONFIRMED
+            )
+            for service in self.services:
+                ReservationService.objects.create(reservation=reservation, service=service)
+            self.next_check_in += timedelta(days=2)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_active_list_query_count_is_constant(self):
+        """A staff user's active list costs the same number of queries for 2 or 8 reservations."""
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse('reservations:reservation-active')
+
+        self._create_reservations(2)
+        small, _ = self._count_queries(url)
+        self._create_reservations(6)
+        large, response = self._count_queries(url)
+
+        self.assertEqual(small, large)
+        self.assertEqual(response.data['count'], 8)
+        first = response.data['results'][0]
+        self.assertEqual(first['user_name'], 'List User')
+        self.assertEqual({s['service_name'] for s in first['services']}, {'Massage', 'Yoga'})
+
+    def test_custom_actions_are_paginated(self):
+        """active, past and upcoming return paginated responses."""
+        self.client.force_authenticate(user=self.user)
+        self._create_reservations(12)
+        for name in ['active', 'past', 'upcoming']:
+            response = self.client.get(reverse(f'reservations:reservation-{name}'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('results', response.data)
+            self.assertLessEqual(len(response.data['results']), 10)
+
+        response = self.client.get(reverse('reservations:reservation-upcoming'), {'page': 2})
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_nested_user_reservations_query_count_is_constant(self):
+        """The nested user reservations list uses the same prefetch plan."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('users:user-reservations-list', kwargs={'user_pk': self.user.pk})
+
+        self._create_reservations(2)
+        small, _ = self._count_queries(url)
+        self._create_reservations(4)
+        large, _ = self._count_queries(url)
+        self.assertEqual(small, large)
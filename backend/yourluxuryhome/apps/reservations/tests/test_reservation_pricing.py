@@ -0,0 +1,198 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment, ApartmentAvailability
+from apps.reservations.models import Reservation, ReservationService
+from apps.services.models import Service, ServiceType
+from apps.users.models import User
+
+
+class ReservationPricingTests(APITestCase):
+    def setUp(self):
+        """Create a guest, an apartment with one overridden night and a service."""
+        self.user = User.objects.create_user(
+            username='pricinguser',
+            email='pricing@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartment = Apartment.objects.create(
+            name='Pricing Test Apartment',
+            description='An apartment used by pricing tests.',
+            address='1 Pricing Street',
+            city='Vienna',
+            country='Austria',
+            price_per_night=Decimal('100.00')
+        )
+        self.check_in = timezone.now().date() + timedelta(days=10)
+        ApartmentAvailability.objects.create(
+            apartment=self.apartment,
+            date=self.check_in + timedelta(days=1),
+            status='available',
+            price_override=Decimal('150.00')
+        )
+        self.service = Service.objects.create(
+            name='Airport Transfer',
+            price=Decimal('45.00'),
+            max_quantity=4,
+            type=ServiceType.objects.create(name='Transport')
+        )
+
+    def _post(self, nights=3, services=None):
+        payload = {
+            'apartment': str(self.apartment.id),
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': (self.check_in + timedelta(days=nights)).isoformat(),
+            'guests': 2
+        }
+        if services is not None:
+            payload['services'] = services
+        return self.client.post(reverse('reservations:reservation-list'), payload, format='json')
+
+    def _book(self, nights=3, services=None):
+        response = self._post(nights, services)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Reservation.objects.get(pk=response.data['id'])
+
+    def _extra_services(self, count):
+        return [
+            Service.objects.create(name=f'Extra {i}', price=Decimal('10.00'), max_quantity=3, type=self.service.type)
+            for i in range(count)
+        ]
+
+    def test_booking_snapshots_nightly_breakdown(self):
+        """Each night is priced at booking time, using calendar overrides."""
+        reservation = self._book()
+        self.assertEqual([night['price'] for night in reservation.nightly_rates], ['100.00', '150.00', '100.00'])
+        self.assertEqual(reservation.accommodation_price, Decimal('350.00'))
+        self.assertEqual(reservation.total_price, Decimal('350.00'))
+
+    def test_snapshot_survives_price_changes(self):
+        """Changing the apartment price later does not alter existing reservations."""
+        reservation = self._book()
+        Apartment.objects.filter(pk=self.apartment.pk).update(price_per_night=Decimal('500.00'))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.total_price, Decimal('350.00'))
+
+    def test_adding_and_removing_service_updates_totals(self):
+        """Service lines snapshot unit price and line total, and roll into the reservation totals."""
+        reservation = self._book()
+        url = reverse('reservations:reservation-services-list', kwargs={'reservation_pk': reservation.pk})
+        response = self.client.post(url, {'service': str(self.service.id), 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['unit_price'], '45.00')
+        self.assertEqual(response.data['price'], '90.00')
+
+        Service.objects.filter(pk=self.service.pk).update(price=Decimal('60.00'))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.services_price, Decimal('90.00'))
+        self.assertEqual(reservation.total_price, Decimal('440.00'))
+
+        detail_url = reverse(
+            'reservations:reservation-services-detail',
+            kwargs={'reservation_pk': reservation.pk, 'pk': response.data['id']}
+        )
+        self.assertEqual(self.client.delete(detail_url).status_code, status.HTTP_204_NO_CONTENT)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.services_price, Decimal('0.00'))
+        self.assertEqual(reservation.total_price, Decimal('350.00'))
+
+    def test_changing_service_quantity_updates_totals(self):
+        """A PATCH of the quantity re-prices the line at its booked unit price and updates the totals."""
+        reservation = self._book()
+        url = reverse('reservations:reservation-services-list', kwargs={'reservation_pk': reservation.pk})
+        line_id = self.client.post(url, {'service': str(self.service.id), 'quantity': 1}, format='json').data['id']
+        Service.objects.filter(pk=self.service.pk).update(price=Decimal('60.00'))
+
+        detail_url = reverse(
+            'reservations:reservation-services-detail',
+            kwargs={'reservation_pk': reservation.pk, 'pk': line_id}
+        )
+        response = self.client.patch(detail_url, {'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['unit_price'], response.data['price']), ('45.00', '135.00'))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.services_price, Decimal('135.00'))
+        self.assertEqual(reservation.total_price, Decimal('485.00'))
+
+    def test_service_line_admin_prices_lines_and_updates_totals(self):
+        """Lines added, edited or deleted in the service line admin are priced and roll into the totals."""
+        reservation = self._book()
+        self.client.force_login(User.objects.create_superuser(
+            username='pricingadmin', email='pricingadmin@example.com', password='adminpassword'
+        ))
+        response = self.client.post(reverse('admin:reservations_reservationservice_add'), {
+            'reservation': str(reservation.pk), 'service': str(self.service.pk), 'quantity': 2, 'notes': ''
+        })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        line = ReservationService.objects.get(reservation=reservation)
+        self.assertEqual((line.unit_price, line.price), (Decimal('45.00'), Decimal('90.00')))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.total_price, Decimal('440.00'))
+
+        Service.objects.filter(pk=self.service.pk).update(price=Decimal('60.00'))
+        self.client.post(reverse('admin:reservations_reservationservice_change', args=[line.pk]), {
+            'service': str(self.service.pk), 'quantity': 3, 'notes': ''
+        })
+        line.refresh_from_db()
+        self.assertEqual((line.unit_price, line.price), (Decimal('45.00'), Decimal('135.00')))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.total_price, Decimal('485.00'))
+
+        self.client.post(reverse('admin:reservations_reservationservice_delete', args=[line.pk]), {'post': 'yes'})
+        reservation.refresh_from_db()
+        self.assertEqual((reservation.services_price, reservation.total_price), (Decimal('0.00'), Decimal('350.00')))
+
+    def test_revenue_sums_snapshots(self):
+        """revenue() sums the stored totals."""
+        self._book(nights=2)
+        self.check_in += timedelta(days=5)
+        self._book(nights=1)
+        self.assertEqual(Reservation.objects.revenue()['total'], Decimal('350.00'))
+
+    def test_booking_with_services(self):
+        """Services booked with the reservation are priced per quantity and added to the totals."""
+        response = self._post(services=[{'service': str(self.service.id), 'quantity': 2}])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([line['price'] for line in response.data['services']], ['90.00'])
+
+        reservation = Reservation.objects.get(pk=response.data['id'])
+        self.assertEqual(reservation.services_price, Decimal('90.00'))
+        self.assertEqual(reservation.total_price, Decimal('440.00'))
+        line = reservation.services.get()
+        self.assertEqual((line.quantity, line.unit_price), (2, Decimal('45.00')))
+
+    def test_booking_query_count_does_not_grow_with_services(self):
+        """Services are validated in one query and inserted in one bulk INSERT."""
+        def count_queries(services):
+            with CaptureQueriesContext(connection) as queries:
+                self._book(services=[{'service': str(service.id)} for service in services])
+            self.check_in += timedelta(days=5)
+            return len(queries)
+
+        self.assertEqual(count_queries(self._extra_services(1)), count_queries(self._extra_services(6)))
+        self.assertEqual(ReservationService.objects.count(), 7)
+
+    def test_invalid_services_are_rejected(self):
+        """Inactive, unknown, repeated or over-quantity services fail validation and book nothing."""
+        inactive = Service.objects.create(name='Retired', price=Decimal('5.00'), is_active=False, type=self.service.type)
+        service_id = str(self.service.id)
+        cases = [
+            [{'service': str(inactive.id)}],
+            [{'service': str(self.apartment.id)}],
+            [{'service': service_id}, {'service': service_id}],
+            [{'service': service_id, 'quantity': 5}],
+        ]
+        for services in cases:
+            response = self._post(services=services)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('services', response.data)
+        self.assertEqual(response.data['services'][0], {'quantity': ['At most 4 can be booked.']})
+        self.assertFalse(Reservation.objects.exists())
@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment
+from apps.reservations.admin import ReservationAdmin
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.reservations.serializers import ReservationUpdateSerializer
+from apps.users.models import User
+
+
+class ReservationTransitionTests(APITestCase):
+    def setUp(self):
+        """Create a guest, an admin and one reservation per status."""
+        self.admin_user = User.objects.create_superuser(
+            username='statusadmin',
+            email='statusadmin@example.com',
+            password='adminpassword'
+        )
+        self.user = User.objects.create_user(
+            username='statususer',
+            email='status@example.com',
+            password='userpassword'
+        )
+        self.apartment = Apartment.objects.create(
+            name='Status Test Apartment',
+            description='An apartment used by status tests.',
+            address='1 Status Street',
+            city='Rome',
+            country='Italy',
+            price_per_night=120.00
+        )
+        check_in = timezone.now().date() + timedelta(days=5)
+        self.reservations = {}
+        for offset, reservation_status in enumerate(ReservationStatus.values):
+            self.reservations[reservation_status] = Reservation.objects.create(
+                user=self.user,
+                apartment=self.apartment,
+                check_in_date=check_in + timedelta(days=offset * 3),
+                check_out_date=check_in + timedelta(days=offset * 3 + 2),
+                status=reservation_status
+            )
+
+    def test_transition_only_moves_allowed_rows(self):
+        """transition() changes rows in an allowed source status and returns their ids."""
+        changed = Reservation.objects.all().transition(ReservationStatus.CANCELLED)
+        self.assertCountEqual(changed, [
+            self.reservations[ReservationStatus.PENDING].pk,
+            self.reservations[ReservationStatus.CONFIRMED].pk,
+        ])
+        completed = self.reservations[ReservationStatus.COMPLETED]
+        completed.refresh_from_db()
+        self.assertEqual(completed.status, ReservationStatus.COMPLETED)
+
+    def test_transition_is_idempotent(self):
+        """Repeating a transition changes nothing the second time."""
+        queryset = Reservation.objects.filter(pk=self.reservations[ReservationStatus.PENDING].pk)
+        self.assertEqual(len(queryset.transition(ReservationStatus.CONFIRMED)), 1)
+        self.assertEqual(queryset.transition(ReservationStatus.CONFIRMED), [])
+
+    def test_stale_instance_does_not_overwrite_status(self):
+        """A transition based on a stale read does not resurrect a cancelled reservation."""
+        reservation = self.reservations[ReservationStatus.PENDING]
+        Reservation.objects.filter(pk=reservation.pk).update(status=ReservationStatus.CANCELLED)
+        self.assertEqual(
+            Reservation.objects.filter(pk=reservation.pk).transition(ReservationStatus.CONFIRMED),
+            []
+        )
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, ReservationStatus.CANCELLED)
+
+    def test_cancel_endpoint(self):
+        """Cancelling works once, then reports the reservation as already cancelled."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('reservations:reservation-cancel', kwargs={'pk': self.reservations[ReservationStatus.PENDING].pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ReservationStatus.CANCELLED)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Reservation is already cancelled.')
+
+    def test_cancel_completed_reservation(self):
+        """Completed reservations cannot be cancelled."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('reservations:reservation-cancel', kwargs={'pk': self.reservations[ReservationStatus.COMPLETED].pk})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Cannot cancel a completed reservation.')
+
+    def test_confirm_endpoint(self):
+        """Only pending reservations can be confirmed, and only by staff."""
+        url = reverse('reservations:reservation-confirm', kwargs={'pk': self.reservations[ReservationStatus.PENDING].pk})
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ReservationStatus.CONFIRMED)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_action_skips_disallowed_rows(self):
+        """The admin bulk action only completes confirmed reservations."""
+        request = RequestFactory().post('/')
+        request.user = self.admin_user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+
+        model_admin = ReservationAdmin(Reservation, AdminSite())
+        model_admin.mark_as_completed(request, Reservation.objects.all())
+
+        self.assertEqual(Reservation.objects.filter(status=ReservationStatus.COMPLETED).count(), 2)
+        self.assertEqual(Reservation.objects.filter(status=ReservationStatus.PENDING).count(), 1)
+        self.assertEqual(
+            [str(message) for message in request._messages],
+            [
+                '1 reservation(s) marked as completed.',
+                '3 reservation(s) skipped because their status does not allow this change.',
+            ]
+        )
+
+    def test_update_cannot_change_status(self):
+        """A PATCH ignores status and leaves it to the cancel and confirm actions."""
+        reservation = self.reservations[ReservationStatus.PENDING]
+        self.client.force_authenticate(user=self.user)
+        url = reverse('reservations:reservation-detail', kwargs={'pk': reservation.pk})
+        response = self.client.patch(url, {'status': ReservationStatus.CONFIRMED, 'guests': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, ReservationStatus.PENDING)
+        self.assertEqual(reservation.guests, 2)
+
+    def test_update_does_not_overwrite_concurrent_transition(self):
+        """Saving an edit from a stale instance keeps a status changed meanwhile."""
+        reservation = self.reservations[ReservationStatus.PENDING]
+        Reservation.objects.filter(pk=reservation.pk).transition(ReservationStatus.CANCELLED)
+        serializer = ReservationUpdateSerializer(reservation, data={'guests': 3}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        reservation.refresh_from_db()
+        self.assertEqual((reservation.status, reservation.guests), (ReservationStatus.CANCELLED, 3))
+
+    def test_admin_cannot_edit_status_directly(self):
+        """The admin has no editable status column or form field."""
+        model_admin = ReservationAdmin(Reservation, AdminSite())
+        self.assertNotIn('status', model_admin.list_editable)
+        self.assertIn('status', model_admin.readonly_fields)
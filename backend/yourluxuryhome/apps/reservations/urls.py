@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
-from .views import ReservationViewSet, ReservationServiceViewSet
+from .views import ReservationViewSet, ReservationServiceViewSet, ReservationExportView
 
 app_name = 'reservations'
 
@@ -14,6 +14,9 @@ reservation_router = routers.NestedDefaultRouter(router, r'', lookup='reservatio
 reservation_router.register(r'services', ReservationServiceViewSet, basename='reservation-services')
 
 urlpatterns = [
+    # Streaming export for finance (admin only); before the router so it is not taken for an id
+    path('export/', ReservationExportView.as_view(), name='reservation-export'),
+    
     # Main reservation endpoints
     path('', include(router.urls)),
     
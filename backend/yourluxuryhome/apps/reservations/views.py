@@ -1,4 +1,9 @@
+import uuid
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
@@ -7,10 +12,14 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from django_filters.rest_framework import DjangoFilterBackend
 from apps.common.throttling import ReservationCreateRateThrottle, ReservationListRateThrottle
 
+from .exports import DATASETS, FORMATS, stream_export
+from .idempotency import IdempotentCreateMixin
 from .models import Reservation, ReservationService, ReservationStatus
+from .pricing import price_service_line, refresh_service_totals
 from .serializers import (
     ReservationSerializer,
     ReservationCreateSerializer,
@@ -19,7 +28,7 @@ from .serializers import (
 )
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """ViewSet for viewing and editing Reservation instances."""
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -40,10 +49,11 @@ class ReservationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = Reservation.objects.with_details()
         # Admin can see all reservations, regular users can only see their own
         if user.is_staff:
-            return Reservation.objects.all()
-        return Reservation.objects.filter(user=user)
+            return queryset
+        return queryset.filter(user=user)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -54,23 +64,29 @@ class ReservationViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-        # Here you could add logic to send WhatsApp notification
+    
+    def _list_response(self, queryset):
+        """Filter, order and paginate ``queryset`` the same way as the list action."""
+        queryset = self.filter_queryset(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def active(self, request):
         """List all active reservations (pending or confirmed)."""
-        active_statuses = [ReservationStatus.PENDING, ReservationStatus.CONFIRMED]
-        queryset = self.get_queryset().filter(status__in=active_statuses)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.get_queryset().active()
+        return self._list_response(queryset)
     
     @action(detail=False, methods=['get'])
     def past(self, request):
         """List all past reservations."""
         today = timezone.now().date()
         queryset = self.get_queryset().filter(check_out_date__lt=today)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self._list_response(queryset)
     
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
@@ -80,23 +96,30 @@ class ReservationViewSet(viewsets.ModelViewSet):
             check_in_date__gte=today,
             status__in=[ReservationStatus.PENDING, ReservationStatus.CONFIRMED]
         )
-        serializer = self.get_serializer(queryset, many=True)
+        return self._list_response(queryset)
+    
+    def _transition(self, reservation, target_status, errors):
+        """Apply a status transition and respond with the updated reservation or an error."""
+        if not Reservation.objects.filter(pk=reservation.pk).transition(target_status):
+            reservation.refresh_from_db(fields=['status'])
+            detail = errors.get(
+                reservation.status,
+                f"Cannot change a reservation with status {reservation.status} to {target_status}."
+            )
+            return Response({"detail": detail}, status=status.HTTP_400_BAD_REQUEST)
+        
+        reservation.refresh_from_db(fields=['status', 'updated_at'])
+        serializer = self.get_serializer(reservation)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Cancel a reservation."""
         reservation = self.get_object()
-        if reservation.status == ReservationStatus.CANCELLED:
-            return Response({"detail": "Reservation is already cancelled."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        if reservation.status == ReservationStatus.COMPLETED:
-            return Response({"detail": "Cannot cancel a completed reservation."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        reservation.status = ReservationStatus.CANCELLED
-        reservation.save()
-        serializer = self.get_serializer(reservation)
-        return Response(serializer.data)
+        return self._transition(reservation, ReservationStatus.CANCELLED, {
+            ReservationStatus.CANCELLED: "Reservation is already cancelled.",
+            ReservationStatus.COMPLETED: "Cannot cancel a completed reservation.",
+        })
     
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
@@ -106,24 +129,22 @@ class ReservationViewSet(viewsets.ModelViewSet):
                             status=status.HTTP_403_FORBIDDEN)
         
         reservation = self.get_object()
-        if reservation.status != ReservationStatus.PENDING:
-            return Response({"detail": f"Cannot confirm a reservation with status {reservation.status}."}, 
-                            status=status.HTTP_400_BAD_REQUEST)
-        
-        reservation.status = ReservationStatus.CONFIRMED
-        reservation.save()
-        serializer = self.get_serializer(reservation)
-        return Response(serializer.data)
+        errors = {
+            current: f"Cannot confirm a reservation with status {current}."
+            for current in ReservationStatus.values
+        }
+        errors[ReservationStatus.PENDING] = "The reservation hold has expired."
+        return self._transition(reservation, ReservationStatus.CONFIRMED, errors)
 
 
-class ReservationServiceViewSet(viewsets.ModelViewSet):
+class ReservationServiceViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """ViewSet for viewing and editing ReservationService instances."""
     serializer_class = ReservationServiceSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
         reservation_id = self.kwargs.get('reservation_pk')
-        return ReservationService.objects.filter(reservation__id=reservation_id)
+        return ReservationService.objects.filter(reservation__id=reservation_id).select_related('service')
     
     def perform_create(self, serializer):
         reservation_id = self.kwargs.get('reservation_pk')
@@ -133,12 +154,29 @@ class ReservationServiceViewSet(viewsets.ModelViewSet):
         if self.request.user != reservation.user and not self.request.user.is_staff:
             raise PermissionDenied("You do not have permission to add services to this reservation.")
         
-        # Get the service price if not provided
-        service = serializer.validated_data.get('service')
-        if not serializer.validated_data.get('price') and service:
-            serializer.validated_data['price'] = service.price
-        
-        serializer.save(reservation=reservation)
+        # Snapshot the service price and add the line to the reservation totals
+        line = ReservationService(**serializer.validated_data)
+        price_service_line(line)
+        with transaction.atomic():
+            serializer.save(reservation=reservation, unit_price=line.unit_price, price=line.price)
+            refresh_service_totals(reservation)
+    
+    def perform_update(self, serializer):
+        # Re-price the line, keeping the booked unit price unless it now points at another service
+        line = serializer.instance
+        repriced = ReservationService(
+            service=serializer.validated_data.get('service', line.service),
+            quantity=serializer.validated_data.get('quantity', line.quantity)
+        )
+        price_service_line(repriced, line.unit_price if repriced.service.pk == line.service_id else None)
+        with transaction.atomic():
+            serializer.save(unit_price=repriced.unit_price, price=repriced.price)
+            refresh_service_totals(line.reservation)
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            refresh_service_totals(instance.reservation)
 
 
 class UserReservationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -158,6 +196,59 @@ class UserReservationViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Only allow users to see their own reservations or admins to see any user's reservations
         if str(self.request.user.id) == user_id or self.request.user.is_staff:
-            return Reservation.objects.filter(user__id=user_id)
+            return Reservation.objects.with_details().filter(user__id=user_id)
         else:
             return Reservation.objects.none()
+
+
+class ReservationExportView(APIView):
+    """
+    Stream reservations, their service lines or the availability calendar (admin only).
+    
+    Query parameters: ``dataset`` (reservations, services or availability),
+    ``file_format`` (csv or parquet), and the optional filters ``start`` and
+    ``end`` (YYYY-MM-DD, end exclusive), ``status`` and ``apartment``.
+    """
+    permission_classes = [IsAdminUser]
+    
+    CONTENT_TYPES = {
+        'csv': 'text/csv',
+        'parquet': 'application/vnd.apache.parquet',
+    }
+    
+    def get(self, request):
+        params = request.query_params
+        dataset = params.get('dataset', 'reservations')
+        export_format = params.get('file_format', 'csv')
+        if dataset not in DATASETS:
+            return Response(
+                {"error": f"dataset must be one of: {', '.join(DATASETS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if export_format not in FORMATS:
+            return Response(
+                {"error": f"file_format must be one of: {', '.join(FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            filters = {
+                'start': datetime.strptime(params['start'], '%Y-%m-%d').date() if params.get('start') else None,
+                'end': datetime.strptime(params['end'], '%Y-%m-%d').date() if params.get('end') else None,
+                'apartment': uuid.UUID(params['apartment']) if params.get('apartment') else None,
+                'status': params.get('status'),
+            }
+        except ValueError:
+            return Response(
+                {"error": "start and end must be YYYY-MM-DD and apartment a valid id."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            chunks = stream_export(dataset, export_format, **filters)
+        except RuntimeError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(chunks, content_type=self.CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{export_format}"'
+        return response
@@ -11,6 +11,9 @@ class ServiceTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'icon', 'order', 'service_count']
     
     def get_service_count(self, obj):
+        # Annotated by ServiceTypeViewSet; single objects fall back to a COUNT
+        if hasattr(obj, 'active_service_count'):
+            return obj.active_service_count
         return obj.services.filter(is_active=True).count()
 
 
@@ -44,8 +47,8 @@ class ServiceCreateUpdateSerializer(serializers.ModelSerializer):
 
 
 class ServiceTypeWithServicesSerializer(serializers.ModelSerializer):
-    """Serializer for service types with their associated services"""
-    services = ServiceListSerializer(many=True, read_only=True, source='services.filter(is_active=True)')
+    """Serializer for service types with their active services, as grouped by services.build_catalog()"""
+    services = ServiceListSerializer(many=True, read_only=True, source='active_services')
     
     class Meta:
         model = ServiceType
@@ -0,0 +1,114 @@
+"""
+Grouped catalog of active services, as shown on the booking form.
+
+The catalog is built from one query and cached in each process together with
+the catalog version it was built for. The version is read from the database
+on every request: the number of services and types and the latest
+``updated_at`` among them, so every process rebuilds on its next request once
+a save or delete commits. Bulk ``QuerySet.update()`` calls must set
+``updated_at`` for the change to be seen.
+
+Services included with apartments are cached per apartment, keyed by data
+read from the database with the apartment itself: its ``updated_at`` (touched
+when its included services change), and the number of included services and
+the latest ``updated_at`` among them and their types. Every process therefore
+sees the same key once a change commits.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Service, ServiceType
+from .serializers import ServiceForReservationSerializer, ServiceTypeWithServicesSerializer
+
+
+INCLUDED_SERVICES_TTL = 24 * 60 * 60
+
+# (version, data) of the catalog last built by this process
+_catalog = None
+
+
+def catalog_version():
+    """Return the current catalog version, read in one query over service types and their services."""
+    version = ServiceType.objects.aggregate(
+        type_count=Count('pk', distinct=True),
+        types_changed=Max('updated_at'),
+        service_count=Count('services', distinct=True),
+        services_changed=Max('services__updated_at'),
+    )
+    return tuple(version.values())
+
+
+def build_catalog():
+    """
+    Return the service types that have active services, each with those services.
+    
+    Services and their types come from a single query ordered the way the
+    catalog is shown, and are grouped by type in Python.
+    """
+    services = Service.objects.filter(is_active=True).select_related('type').order_by(
+        'type__order', 'type__name', 'type_id', 'name'
+    )
+    types = {}
+    for service in services:
+        service_type = types.get(service.type_id)
+        if service_type is None:
+            service_type = types[service.type_id] = service.type
+            service_type.active_services = []
+        service_type.active_services.append(service)
+    return list(ServiceTypeWithServicesSerializer(list(types.values()), many=True).data)
+
+
+def get_catalog():
+    """Return the catalog, rebuilding it only when the catalog version has changed."""
+    global _catalog
+    version = catalog_version()
+    cached = _catalog
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    data = build_catalog()
+    _catalog = (version, data)
+    return data
+
+
+def _included_services_key(apartment_id, updated_at, services_changed, types_changed, service_count):
+    stamps = [stamp.timestamp() if stamp else 0 for stamp in (updated_at, services_changed, types_changed)]
+    return 'services:included:{}:{}:{}:{}:{}'.format(apartment_id, *stamps, service_count)
+
+
+def included_services_by_apartment(apartment_ids):
+    """
+    Return ``{apartment_id: [service, ...]}`` with the active services included with each apartment.
+    
+    Unknown apartment ids are left out. Apartments whose entry is not cached
+    are filled in with a single query on the ``included_services`` through
+    table joined to ``Service`` and ``ServiceType``.
+    """
+    from apps.apartments.models import Apartment
+    
+    versions = Apartment.objects.filter(pk__in=apartment_ids).order_by().values_list(
+        'pk', 'updated_at',
+        Max('included_services__updated_at'),
+        Max('included_services__type__updated_at'),
+        Count('included_services', distinct=True),
+    )
+    keys = {version[0]: _included_services_key(*version) for version in versions}
+    cached = cache.get_many(keys.values())
+    included = {
+        apartment_id: cached[key] for apartment_id, key in keys.items() if key in cached
+    }
+    
+    missing = [apartment_id for apartment_id in keys if apartment_id not in included]
+    if missing:
+        built = {apartment_id: [] for apartment_id in missing}
+        links = Apartment.included_services.through.objects.filter(
+            apartment_id__in=missing, service__is_active=True
+        ).select_related('service__type').order_by('service__type__order', 'service__type__name', 'service__name')
+        for link in links:
+            built[link.apartment_id].append(link.service)
+        built = {
+            apartment_id: list(ServiceForReservationSerializer(services, many=True).data)
+            for apartment_id, services in built.items()
+        }
+        cache.set_many({keys[apartment_id]: data for apartment_id, data in built.items()}, INCLUDED_SERVICES_TTL)
+        included.update(built)
+    return included
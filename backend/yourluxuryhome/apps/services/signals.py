@@ -0,0 +1,17 @@
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.apartments.models import Apartment
+
+
+@receiver(m2m_changed, sender=Apartment.included_services.through)
+def touch_apartments(sender, instance, action, reverse, pk_set, **kwargs):
+    """Move ``updated_at`` of apartments whose included services changed, so their cache entry is replaced."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # A clear from the service side does not name the apartments; it changes their service count instead
+    if not reverse:
+        Apartment.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif pk_set:
+        Apartment.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.services import services as catalog
+from apps.services.models import Service, ServiceType
+from apps.users.models import User
+
+
+class ServiceCatalogTests(APITestCase):
+    def setUp(self):
+        """Create a user and three service types, one of them without active services."""
+        self.user = User.objects.create_user(
+            username='cataloguser',
+            email='catalog@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.wellness = ServiceType.objects.create(name='Wellness', order=2)
+        self.transport = ServiceType.objects.create(name='Transport', order=1)
+        retired = ServiceType.objects.create(name='Retired', order=0)
+        Service.objects.create(name='Yoga', price=Decimal('40.00'), type=self.wellness)
+        Service.objects.create(name='Massage', price=Decimal('80.00'), type=self.wellness)
+        Service.objects.create(name='Airport Transfer', price=Decimal('45.00'), type=self.transport)
+        Service.objects.create(name='Sauna', price=Decimal('0.00'), type=retired, is_active=False)
+
+    def test_catalog_groups_active_services_by_type(self):
+        """Types come in display order with their active services sorted by name."""
+        for url in [reverse('service-by-type'), reverse('service-type-with-services')]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([group['name'] for group in response.data], ['Transport', 'Wellness'])
+            self.assertEqual([s['name'] for s in response.data[1]['services']], ['Massage', 'Yoga'])
+            self.assertEqual(response.data[1]['services'][0]['type_name'], 'Wellness')
+
+    def test_catalog_is_built_once(self):
+        """The catalog costs one query to build and only the version query while it is cached."""
+        catalog._catalog = None
+        with self.assertNumQueries(2):
+            catalog.get_catalog()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('service-by-type'))
+        self.assertEqual(len(response.data), 2)
+
+    def test_writes_invalidate_the_catalog(self):
+        """Saving or deleting a service or type rebuilds the catalog on the next read."""
+        catalog.get_catalog()
+        Service.objects.create(name='Bike Rental', price=Decimal('15.00'), type=self.transport)
+        self.assertEqual([s['name'] for s in catalog.get_catalog()[0]['services']], ['Airport Transfer', 'Bike Rental'])
+
+        self.transport.name = 'Getting Around'
+        self.transport.save()
+        self.assertEqual(catalog.get_catalog()[0]['name'], 'Getting Around')
+
+        self.wellness.delete()
+        self.assertEqual(len(catalog.get_catalog()), 1)
+
+    def test_changes_from_other_processes_invalidate_the_catalog(self):
+        """The version comes from the database, so changes made without this process's signals are seen."""
+        catalog.get_catalog()
+        Service.objects.filter(name='Yoga').update(is_active=False, updated_at=timezone.now())
+        self.assertEqual([s['name'] for s in catalog.get_catalog()[1]['services']], ['Massage'])
+
+    def test_type_list_counts_services_in_one_query(self):
+        """The service type list annotates active service counts instead of counting per type."""
+        with self.assertNumQueries(2):  # page count and page
+            response = self.client.get(reverse('service-type-list'))
+        counts = {row['name']: row['service_count'] for row in response.data['results']}
+        self.assertEqual(counts, {'Retired': 0, 'Transport': 1, 'Wellness': 2})
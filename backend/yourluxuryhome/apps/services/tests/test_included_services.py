@@ -0,0 +1,93 @@
+import uuid
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment
+from apps.services.models import Service, ServiceType
+from apps.users.models import User
+
+
+class IncludedServicesTests(APITestCase):
+    def setUp(self):
+        """Create a user, three apartments and services included with two of them."""
+        self.user = User.objects.create_user(
+            username='includeduser',
+            email='included@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartments = [
+            Apartment.objects.create(
+                name=f'Included Apartment {i}', description='-', address='-',
+                city='Athens', country='Greece', price_per_night=Decimal('100.00')
+            )
+            for i in range(3)
+        ]
+        comfort = ServiceType.objects.create(name='Comfort')
+        self.wifi = Service.objects.create(name='Wi-Fi', price=0, type=comfort)
+        self.cleaning = Service.objects.create(name='Cleaning', price=0, type=comfort)
+        retired = Service.objects.create(name='Fax', price=0, type=comfort, is_active=False)
+        self.apartments[0].included_services.set([self.wifi, self.cleaning, retired])
+        self.apartments[1].included_services.set([self.wifi])
+        self.url = reverse('service-included-with-apartments')
+
+    def _get(self, apartments):
+        return self.client.get(self.url, {'apartment_ids': ','.join(str(a.id) for a in apartments)})
+
+    def test_batch_maps_apartments_to_active_included_services(self):
+        """Every requested apartment is mapped to its active included services."""
+        response = self._get(self.apartments)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = {apartment_id: [s['name'] for s in services] for apartment_id, services in response.data.items()}
+        self.assertEqual(names, {
+            str(self.apartments[0].id): ['Cleaning', 'Wi-Fi'],
+            str(self.apartments[1].id): ['Wi-Fi'],
+            str(self.apartments[2].id): [],
+        })
+        self.assertEqual(response.data[str(self.apartments[1].id)][0]['type_name'], 'Comfort')
+
+    def test_batch_uses_one_query_then_cache(self):
+        """A cold batch costs one key query plus one join; a warm one only the key query."""
+        with self.assertNumQueries(2):
+            self._get(self.apartments)
+        with self.assertNumQueries(1):
+            self._get(self.apartments)
+
+    def test_changing_included_services_refreshes_entry(self):
+        """Adding a service to an apartment replaces its cached entry."""
+        self._get(self.apartments)
+        self.apartments[2].included_services.add(self.cleaning)
+        self.wifi.included_in_apartments.remove(self.apartments[1])
+        response = self._get(self.apartments)
+        self.assertEqual([s['name'] for s in response.data[str(self.apartments[2].id)]], ['Cleaning'])
+        self.assertEqual(response.data[str(self.apartments[1].id)], [])
+
+    def test_service_changes_refresh_entries_without_signals(self):
+        """Renamed, deactivated or unlinked services change the key read from the database."""
+        self._get(self.apartments)
+        Service.objects.filter(pk=self.cleaning.pk).update(is_active=False, updated_at=timezone.now())
+        ServiceType.objects.filter(pk=self.wifi.type_id).update(name='Basics', updated_at=timezone.now())
+        response = self._get(self.apartments)
+        self.assertEqual([s['name'] for s in response.data[str(self.apartments[0].id)]], ['Wi-Fi'])
+        self.assertEqual(response.data[str(self.apartments[1].id)][0]['type_name'], 'Basics')
+
+        self.wifi.included_in_apartments.clear()
+        response = self._get(self.apartments)
+        self.assertEqual(response.data[str(self.apartments[1].id)], [])
+
+    def test_single_apartment_lookup(self):
+        """The single lookup reads included services, not amenities, and 404s on unknown ids."""
+        url = reverse('service-included-with-apartment')
+        response = self.client.get(url, {'apartment_id': str(self.apartments[1].id)})
+        self.assertEqual([s['name'] for s in response.data], ['Wi-Fi'])
+        for apartment_id in [str(uuid.uuid4()), 'nope']:
+            self.assertEqual(self.client.get(url, {'apartment_id': apartment_id}).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_batch_requests(self):
+        """Missing or malformed ids are rejected."""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'apartment_ids': 'a,b'}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,3 +1,5 @@
+import uuid
+
 from django.shortcuts import render, get_object_or_404
 from django.db.models import Count, Q
 
@@ -8,6 +10,7 @@ from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import ServiceType, Service
+from .services import get_catalog, included_services_by_apartment
 from .serializers import (
     ServiceTypeSerializer,
     ServiceListSerializer,
@@ -18,6 +21,10 @@ from .serializers import (
 )
 
 
+# Cards on one list or comparison page
+MAX_BATCH_APARTMENTS = 100
+
+
 class IsAdminOrReadOnly(permissions.BasePermission):
     """Custom permission to only allow admin users to edit objects."""
     
@@ -31,9 +38,13 @@ class IsAdminOrReadOnly(permissions.BasePermission):
 
 class ServiceTypeViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and editing ServiceType instances."""
-    queryset = ServiceType.objects.all()
+    queryset = ServiceType.objects.annotate(
+        active_service_count=Count('services', filter=Q(services__is_active=True))
+    )
     serializer_class = ServiceTypeSerializer
     permission_classes = [IsAuthenticated]
+    # Reads that only need the user id: authenticated from the token claims (see apps.users.authentication)
+    token_user_actions = ['list', 'retrieve', 'with_services', 'services']
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
     ordering_fields = ['order', 'name']
@@ -46,16 +57,14 @@ class ServiceTypeViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def with_services(self, request):
-        """List all service types with their associated services."""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        """List the service types that have active services, with those services."""
+        return Response(get_catalog())
     
     @action(detail=True, methods=['get'])
     def services(self, request, pk=None):
         """List all services for a specific service type."""
         service_type = self.get_object()
-        services = service_type.services.filter(is_active=True)
+        services = service_type.services.filter(is_active=True).select_related('type')
         serializer = ServiceListSerializer(services, many=True)
         return Response(serializer.data)
 
@@ -63,6 +72,11 @@ class ServiceTypeViewSet(viewsets.ModelViewSet):
 class ServiceViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and editing Service instances."""
     permission_classes = [IsAuthenticated]
+    # Reads that only need the user id: authenticated from the token claims (see apps.users.authentication)
+    token_user_actions = [
+        'list', 'retrieve', 'featured', 'by_type', 'for_reservation',
+        'included_with_apartment', 'included_with_apartments'
+    ]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['type', 'is_active', 'is_featured']
     search_fields = ['name', 'description']
@@ -70,7 +84,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
     ordering = ['type__order', 'name']
     
     def get_queryset(self):
-        queryset = Service.objects.all()
+        queryset = Service.objects.select_related('type')
         
         # Filter by price range
         min_price = self.request.query_params.get('min_price')
@@ -109,10 +123,8 @@ class ServiceViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_type(self, request):
-        """Group services by their types."""
-        types = ServiceType.objects.all()
-        serializer = ServiceTypeWithServicesSerializer(types, many=True)
-        return Response(serializer.data)
+        """Group active services by their types (cached catalog)."""
+        return Response(get_catalog())
     
     @action(detail=False, methods=['get'])
     def for_reservation(self, request):
@@ -130,17 +142,40 @@ class ServiceViewSet(viewsets.ModelViewSet):
                 {"error": "apartment_id query parameter is required."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Import here to avoid circular imports
-        from apps.apartments.models import Apartment
-        
         try:
-            apartment = Apartment.objects.get(id=apartment_id)
-            included_services = apartment.amenities.all()
-            serializer = ServiceForReservationSerializer(included_services, many=True)
-            return Response(serializer.data)
-        except Apartment.DoesNotExist:
+            apartment_id = uuid.UUID(apartment_id)
+        except ValueError:
+            apartment_id = None
+        
+        included = included_services_by_apartment([apartment_id]) if apartment_id else {}
+        if apartment_id not in included:
             return Response(
                 {"error": "Apartment not found."},
                 status=status.HTTP_404_NOT_FOUND
             )
+        return Response(included[apartment_id])
+    
+    @action(detail=False, methods=['get'])
+    def included_with_apartments(self, request):
+        """Map each of the comma-separated ``apartment_ids`` to the services included with it."""
+        raw_ids = [value for value in request.query_params.get('apartment_ids', '').split(',') if value]
+        if not raw_ids:
+            return Response(
+                {"error": "apartment_ids query parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(raw_ids) > MAX_BATCH_APARTMENTS:
+            return Response(
+                {"error": f"At most {MAX_BATCH_APARTMENTS} apartment ids can be requested at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            apartment_ids = [uuid.UUID(value) for value in raw_ids]
+        except ValueError:
+            return Response(
+                {"error": "apartment_ids must be a comma-separated list of apartment ids."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        included = included_services_by_apartment(apartment_ids)
+        return Response({str(apartment_id): services for apartment_id, services in included.items()})
@@ -0,0 +1,22 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task, TaskStatus
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_until', 'updated_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'updated_at']
+    date_hierarchy = 'created_at'
+    
+    actions = ['retry_tasks']
+    
+    def retry_tasks(self, request, queryset):
+        updated = queryset.filter(status=TaskStatus.FAILED).update(
+            status=TaskStatus.QUEUED, attempts=0, run_at=timezone.now(), updated_at=timezone.now()
+        )
+        self.message_user(request, f'{updated} failed task(s) queued for retry.')
+    retry_tasks.short_description = 'Retry selected failed tasks'
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.tasks'
+    
+    def ready(self):
+        """Import every installed app's tasks module so its tasks get registered."""
+        autodiscover_modules('tasks')
@@ -0,0 +1,37 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run background tasks stored in the database'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Number of tasks to run in parallel')
+        parser.add_argument('--visibility-timeout', type=int, default=None,
+                            help='Seconds before a task claimed by a crashed worker is retried')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no task is ready instead of polling forever')
+    
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            visibility_timeout=options['visibility_timeout'],
+            poll_interval=options['poll_interval'],
+        )
+        
+        def shutdown(signum, frame):
+            self.stdout.write('Finishing running tasks before exiting...')
+            worker.stop()
+        
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+        
+        self.stdout.write(f'Worker {worker.worker_id} started with concurrency {worker.concurrency}')
+        worker.run(burst=options['burst'])
+        self.stdout.write('Worker stopped')
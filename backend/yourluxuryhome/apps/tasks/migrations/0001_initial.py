@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered task name, e.g. "users.send_email"', max_length=200)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Keyword arguments passed to the task')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the task may run')),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Visibility timeout: a running task is handed to another worker after this time', null=True)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=64)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Task',
+                'verbose_name_plural': 'Tasks',
+                'ordering': ['run_at'],
+                'indexes': [models.Index(fields=['status', 'run_at'], name='task_ready_idx'), models.Index(fields=['status', 'locked_until'], name='task_lease_idx')],
+            },
+        ),
+    ]
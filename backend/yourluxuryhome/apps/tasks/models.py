@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class TaskStatus(models.TextChoices):
+    QUEUED = 'queued', _('Queued')
+    RUNNING = 'running', _('Running')
+    SUCCEEDED = 'succeeded', _('Succeeded')
+    FAILED = 'failed', _('Failed')
+
+
+class Task(models.Model):
+    """A unit of background work stored in the application database."""
+    name = models.CharField(max_length=200, help_text=_('Registered task name, e.g. "users.send_email"'))
+    payload = models.JSONField(default=dict, blank=True, help_text=_('Keyword arguments passed to the task'))
+    status = models.CharField(max_length=20, choices=TaskStatus.choices, default=TaskStatus.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now, help_text=_('Earliest time the task may run'))
+    locked_until = models.DateTimeField(
+        null=True, blank=True,
+        help_text=_('Visibility timeout: a running task is handed to another worker after this time')
+    )
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['run_at']
+        verbose_name = _('Task')
+        verbose_name_plural = _('Tasks')
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_ready_idx'),
+            models.Index(fields=['status', 'locked_until'], name='task_lease_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
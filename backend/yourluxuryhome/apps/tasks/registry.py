@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+
+DEFAULTS = {
+    'MAX_ATTEMPTS': 5,
+    'VISIBILITY_TIMEOUT': 300,  # seconds a claimed task stays invisible to other workers
+    'RETRY_BACKOFF': 10,  # seconds before the first retry, doubled on every attempt
+    'RETRY_BACKOFF_MAX': 3600,
+    'POLL_INTERVAL': 1.0,
+    'BATCH_SIZE': 10,
+    'SUCCEEDED_RETENTION': 86400,  # seconds to keep succeeded tasks for inspection
+}
+
+_tasks = {}
+
+
+def queue_setting(name):
+    return getattr(settings, 'TASK_QUEUE', {}).get(name, DEFAULTS[name])
+
+
+def task(name, max_attempts=None):
+    """
+    Register a function as a background task under ``name``.
+    
+    The function receives the enqueued keyword arguments, which must be JSON
+    serializable. The decorated function gains an ``enqueue(**kwargs)`` helper.
+    """
+    def decorator(func):
+        _tasks[name] = func
+        func.task_name = name
+        func.enqueue = lambda delay=None, **kwargs: enqueue(name, delay=delay, max_attempts=max_attempts, **kwargs)
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def enqueue(name, delay=None, max_attempts=None, **kwargs):
+    """
+    Store a task for the worker and return it.
+    
+    The row is written in the caller's transaction, so a task enqueued inside a
+    transaction that rolls back is never run.
+    """
+    from .models import Task
+    
+    if name not in _tasks:
+        raise KeyError(f"No task registered as {name!r}")
+    run_at = timezone.now()
+    if delay:
+        run_at += delay if isinstance(delay, timedelta) else timedelta(seconds=delay)
+    return Task.objects.create(
+        name=name,
+        payload=kwargs,
+        run_at=run_at,
+        max_attempts=max_attempts or queue_setting('MAX_ATTEMPTS')
+    )
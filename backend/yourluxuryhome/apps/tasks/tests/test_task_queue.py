@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.tasks.models import Task, TaskStatus
+from apps.tasks.registry import enqueue, task
+from apps.tasks.worker import Worker, claim_tasks, run_task
+
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.explode')
+def explode():
+    raise RuntimeError('boom')
+
+
+@task('tests.outlive_lease')
+def outlive_lease():
+    # Runs past the visibility timeout of its batch, and another worker takes over the rest
+    Task.objects.exclude(name='tests.outlive_lease').update(locked_until=timezone.now() - timedelta(seconds=1))
+    for claimed in claim_tasks(10, 300, 'worker-b'):
+        run_task(claimed, 300)
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_queued_tasks(self):
+        """Queued tasks run once and are marked as succeeded."""
+        record.enqueue(value=1)
+        record.enqueue(value=2)
+        Worker().run(burst=True)
+        self.assertCountEqual(calls, [1, 2])
+        self.assertEqual(Task.objects.filter(status=TaskStatus.SUCCEEDED).count(), 2)
+
+    def test_delayed_task_waits(self):
+        """A task scheduled in the future is not run early."""
+        record.enqueue(delay=60, value=1)
+        Worker().run(burst=True)
+        self.assertEqual(calls, [])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        """A failing task goes back to the queue with a later run_at until attempts run out."""
+        queued = enqueue('tests.explode', max_attempts=2)
+        Worker().run(burst=True)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, TaskStatus.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn('RuntimeError: boom', queued.last_error)
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        Worker().run(burst=True)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, TaskStatus.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_claimed_task_is_invisible_until_timeout(self):
+        """A claimed task is not handed out again until its visibility timeout expires."""
+        record.enqueue(value=1)
+        self.assertEqual(len(claim_tasks(10, 300, 'worker-a')), 1)
+        self.assertEqual(claim_tasks(10, 300, 'worker-b'), [])
+
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        reclaimed = claim_tasks(10, 300, 'worker-b')
+        self.assertEqual(len(reclaimed), 1)
+        self.assertEqual(reclaimed[0].attempts, 2)
+
+
+    def test_task_reclaimed_while_waiting_in_batch_runs_once(self):
+        """A task whose lease lapsed behind a slow one in its batch is left to the worker that reclaimed it."""
+        enqueue('tests.outlive_lease')
+        record.enqueue(value=1)
+        Worker(visibility_timeout=1).run(burst=True)
+        self.assertEqual(calls, [1])
+        self.assertEqual(Task.objects.filter(status=TaskStatus.SUCCEEDED).count(), 2)
+
+class ConcurrentWorkerTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_thread_pool_runs_each_task_once(self):
+        """A worker with several threads runs every task exactly once."""
+        for value in range(20):
+            record.enqueue(value=value)
+        Worker(concurrency=4).run(burst=True)
+        self.assertCountEqual(calls, list(range(20)))
+        self.assertEqual(Task.objects.filter(status=TaskStatus.SUCCEEDED).count(), 20)
+
@@ -0,0 +1,164 @@
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task, TaskStatus
+from .registry import get_task, queue_setting
+
+
+logger = logging.getLogger(__name__)
+
+
+def _ready(now):
+    """Tasks due to run, including running tasks whose visibility timeout has expired."""
+    return (
+        Q(status=TaskStatus.QUEUED, run_at__lte=now) |
+        Q(status=TaskStatus.RUNNING, locked_until__lt=now)
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for a task that has failed ``attempts`` times."""
+    delay = min(queue_setting('RETRY_BACKOFF') * 2 ** (attempts - 1), queue_setting('RETRY_BACKOFF_MAX'))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+def claim_tasks(limit, visibility_timeout, worker_id):
+    """
+    Claim up to ``limit`` ready tasks for ``worker_id`` and return them.
+    
+    Claiming is a single conditional UPDATE that re-checks readiness, so when two
+    workers race for the same rows each row goes to exactly one of them. Claimed
+    tasks stay invisible to other workers until ``visibility_timeout`` seconds pass.
+    """
+    now = timezone.now()
+    candidates = list(
+        Task.objects.filter(_ready(now)).order_by('run_at').values_list('pk', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+    
+    token = f"{worker_id}:{uuid.uuid4().hex[:12]}"
+    Task.objects.filter(_ready(now), pk__in=candidates).update(
+        status=TaskStatus.RUNNING,
+        locked_until=now + timedelta(seconds=visibility_timeout),
+        locked_by=token,
+        attempts=F('attempts') + 1,
+        updated_at=now
+    )
+    return list(Task.objects.filter(pk__in=candidates, locked_by=token))
+
+
+def run_task(task, visibility_timeout=None):
+    """
+    Execute a claimed task and record its outcome.
+    
+    The lease is renewed for ``visibility_timeout`` seconds as the task starts,
+    so time spent waiting behind earlier tasks of its batch does not count
+    against it. A task whose lease lapsed and was claimed by another worker
+    meanwhile is left to that worker; returns ``None`` then.
+    """
+    # Only the worker still holding the lease may run the task and record its outcome
+    lease = Task.objects.filter(pk=task.pk, locked_by=task.locked_by, status=TaskStatus.RUNNING)
+    visibility_timeout = visibility_timeout or queue_setting('VISIBILITY_TIMEOUT')
+    if not lease.update(locked_until=timezone.now() + timedelta(seconds=visibility_timeout)):
+        logger.info("Task %s (%s) was claimed by another worker, skipping", task.pk, task.name)
+        return None
+    try:
+        get_task(task.name)(**task.payload)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if task.attempts >= task.max_attempts:
+            logger.error("Task %s (%s) failed permanently after %s attempts", task.pk, task.name, task.attempts)
+            lease.update(status=TaskStatus.FAILED, locked_until=None, last_error=error, updated_at=now)
+        else:
+            logger.warning("Task %s (%s) failed on attempt %s, retrying", task.pk, task.name, task.attempts)
+            lease.update(
+                status=TaskStatus.QUEUED,
+                run_at=now + retry_delay(task.attempts),
+                locked_until=None,
+                last_error=error,
+                updated_at=now
+            )
+        return False
+    
+    lease.update(status=TaskStatus.SUCCEEDED, locked_until=None, last_error=None, updated_at=timezone.now())
+    return True
+
+
+class Worker:
+    """
+    Polls the task table and runs ready tasks.
+    
+    With a concurrency above one, tasks run on a bounded thread pool; otherwise
+    they run in the worker's own thread.
+    """
+    
+    def __init__(self, concurrency=1, visibility_timeout=None, poll_interval=None, batch_size=None):
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout or queue_setting('VISIBILITY_TIMEOUT')
+        self.poll_interval = poll_interval if poll_interval is not None else queue_setting('POLL_INTERVAL')
+        self.batch_size = max(batch_size or queue_setting('BATCH_SIZE'), concurrency)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stop_event = threading.Event()
+    
+    def _execute(self, task):
+        close_old_connections()
+        try:
+            return run_task(task, self.visibility_timeout)
+        finally:
+            close_old_connections()
+    
+    def run_once(self, executor=None):
+        """
+        Claim one batch of ready tasks and run it to completion. Returns the batch size.
+        
+        Without an executor the batch runs in the calling thread.
+        """
+        tasks = claim_tasks(self.batch_size, self.visibility_timeout, self.worker_id)
+        if executor is None:
+            for claimed in tasks:
+                run_task(claimed, self.visibility_timeout)
+        else:
+            list(executor.map(self._execute, tasks))
+        return len(tasks)
+    
+    def purge_succeeded(self):
+        cutoff = timezone.now() - timedelta(seconds=queue_setting('SUCCEEDED_RETENTION'))
+        return Task.objects.filter(status=TaskStatus.SUCCEEDED, updated_at__lt=cutoff).delete()[0]
+    
+    def run(self, burst=False):
+        """
+        Process tasks until stopped.
+        
+        With ``burst`` the worker exits as soon as no task is ready, which suits
+        cron jobs and tests.
+        """
+        executor = None
+        if self.concurrency > 1:
+            executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='task-worker')
+        try:
+            while not self.stop_event.is_set():
+                if self.run_once(executor):
+                    continue
+                if burst:
+                    break
+                self.purge_succeeded()
+                self.stop_event.wait(self.poll_interval)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def stop(self):
+        self.stop_event.set()
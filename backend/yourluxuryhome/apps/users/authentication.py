@@ -0,0 +1,111 @@
+"""
+JWT authentication without a user query on every request.
+
+``CachedJWTAuthentication`` validates the token as usual, then:
+
+* on safe requests to view actions listed in the view's
+  ``token_user_actions``, returns a ``TokenUser`` built from the signed claims
+  (id, username, ``is_staff``) without touching the database;
+* otherwise returns the ``User`` with its ``profile`` joined in, from a
+  per-process cache that keeps entries for ``USER_CACHE_TTL`` seconds and drops
+  them when the user or profile is saved or deleted in this process. Other
+  processes notice such changes within the TTL.
+
+Each request gets its own copy of the cached user, so views may modify it.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# Entries beyond this are dropped wholesale; the cache only needs the active users
+MAX_CACHED_USERS = 10000
+
+_users = {}
+_users_lock = threading.Lock()
+
+
+def forget_user(user_id):
+    """Drop ``user_id`` from this process's user cache."""
+    with _users_lock:
+        _users.pop(str(user_id), None)
+
+
+def _copy_user(user):
+    """Copy ``user`` and its joined profile, so a request can modify them without touching the cache."""
+    user = copy.copy(user)
+    profile = user._state.fields_cache.get('profile')
+    if profile is not None:
+        profile = copy.copy(profile)
+        profile._state.fields_cache['user'] = user
+        user._state.fields_cache['profile'] = profile
+    return user
+
+
+def _cached_user(user_id, user_model):
+    key = str(user_id)
+    now = time.monotonic()
+    entry = _users.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    user = user_model.objects.select_related('profile').filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    if user is not None:
+        with _users_lock:
+            if len(_users) >= MAX_CACHED_USERS:
+                _users.clear()
+            _users[key] = (now + settings.USER_CACHE_TTL, user)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that trusts token claims on opted-in reads and caches users otherwise."""
+    
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        
+        validated_token = self.get_validated_token(raw_token)
+        if self.trusts_claims(request):
+            return self.get_token_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+    
+    def trusts_claims(self, request):
+        view = request.parser_context.get('view') if request.parser_context else None
+        return (
+            request.method in SAFE_METHODS
+            and getattr(view, 'action', None) in getattr(view, 'token_user_actions', ())
+        )
+    
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+    
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        
+        user = _cached_user(user_id, self.user_model)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return _copy_user(user)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.tokens import prune_outstanding_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted JWT refresh tokens (run periodically, e.g. daily from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of tokens deleted per DELETE')
+    
+    def handle(self, *args, **options):
+        deleted = prune_outstanding_tokens(batch_size=options['batch_size'])
+        self.stdout.write(f'Deleted {deleted} expired token(s)')
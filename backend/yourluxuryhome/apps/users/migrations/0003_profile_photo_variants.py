@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='photo_variants',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,12 +1,23 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
+
+class UserManager(BaseUserManager):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Insert the users, then their empty profiles in one more INSERT (post_save is not sent)."""
+        users = super().bulk_create(objs, *args, **kwargs)
+        Profile.objects.create_for_users([user for user in users if user.pk is not None])
+        return users
+
+
 class User(AbstractUser):
     email = models.EmailField(_('email address'), unique=True)
     is_email_verified = models.BooleanField(default=False)
     
+    objects = UserManager()
+    
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     
@@ -14,16 +25,71 @@ class User(AbstractUser):
         return self.email
 
 
+class ProfileManager(models.Manager):
+    def create_for_users(self, users):
+        """Create empty profiles for ``users`` in one INSERT and attach them to the user instances."""
+        profiles = self.bulk_create([self.model(user=user) for user in users])
+        for profile in profiles:
+            profile._mark_clean()
+        return profiles
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
     photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    # Responsive variant manifest written by the common.build_image_variants task (see apps.common.images)
+    photo_variants = models.JSONField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProfileManager()
+    
     def __str__(self):
         return f"{self.user.email}'s profile"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._mark_clean()
+        return instance
+    
+    def _tracked_values(self):
+        # Fields the user edits; deferred fields are skipped so reading them never queries
+        return {
+            field.attname: field.value_to_string(self)
+            for field in self._meta.concrete_fields
+            if field.editable and not field.primary_key and field.name != 'user' and field.attname in self.__dict__
+        }
+    
+    def _mark_clean(self, fields=None):
+        values = self._tracked_values()
+        if fields is None:
+            self._saved_values = values
+        else:
+            self._saved_values.update((name, values[name]) for name in fields if name in values)
+    
+    @property
+    def changed_fields(self):
+        """Fields changed since the profile was loaded or last saved; every field for an unsaved profile."""
+        saved = getattr(self, '_saved_values', None)
+        values = self._tracked_values()
+        if saved is None:
+            return list(values)
+        return [name for name, value in values.items() if saved.get(name) != value]
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or not hasattr(self, '_saved_values'):
+            self._mark_clean()
+        else:
+            self._mark_clean(update_fields)
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._mark_clean()
 
 
 # Signal handlers moved to signals.py
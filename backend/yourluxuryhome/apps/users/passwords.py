@@ -0,0 +1,96 @@
+"""
+Password checks for the login endpoints, with the hashing work bounded.
+
+Verifying a password runs the hasher's full work factor, which dominates the
+cost of a login. At most ``PASSWORD_HASHING_CONCURRENCY`` hashes run at once in
+a process, whichever entry point started them:
+
+- ``authenticate_login`` (sync views) hashes on the request thread while
+  holding one of the slots; the request thread stays busy while it waits.
+- ``aauthenticate_login`` (async views) hands the hash to a thread pool of the
+  same size and awaits it, so the event loop keeps serving other requests.
+
+Both follow ``ModelBackend``: unknown emails still pay for one hash, inactive
+users are rejected, outdated hashes are upgraded, and failures send
+``user_login_failed``.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import check_password, make_password
+
+from .models import User
+
+
+_slots = None
+_pool = None
+_lock = threading.Lock()
+
+
+def _hashing_slots():
+    global _slots
+    if _slots is None:
+        with _lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_CONCURRENCY)
+    return _slots
+
+
+def _hashing_pool():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASHING_CONCURRENCY, thread_name_prefix='password-hashing'
+                )
+    return _pool
+
+
+def _verify(password, encoded):
+    """
+    Return ``(valid, upgraded)`` for ``password`` against the stored hash ``encoded``.
+
+    ``upgraded`` is the password re-hashed with the default hasher when the
+    stored hash is outdated, else ``None``. With no stored hash (unknown email)
+    the password is hashed anyway, so response time does not reveal which
+    emails exist.
+    """
+    with _hashing_slots():
+        if encoded is None:
+            make_password(password)
+            return False, None
+        outdated = []
+        valid = check_password(password, encoded, setter=outdated.append)
+        return valid, make_password(password) if valid and outdated else None
+
+
+def authenticate_login(email, password, request=None):
+    """Return the active user with this email and password, or ``None``."""
+    user = User._default_manager.filter(email=email).first()
+    valid, upgraded = _verify(password, user.password if user else None)
+    if valid and user.is_active:
+        if upgraded:
+            user.password = upgraded
+            user.save(update_fields=['password'])
+        return user
+    user_login_failed.send(sender=__name__, credentials={'email': email}, request=request)
+    return None
+
+
+async def aauthenticate_login(email, password, request=None):
+    """Async ``authenticate_login``: the hash runs in the hashing pool instead of on the event loop."""
+    user = await User._default_manager.filter(email=email).afirst()
+    valid, upgraded = await asyncio.wrap_future(
+        _hashing_pool().submit(_verify, password, user.password if user else None)
+    )
+    if valid and user.is_active:
+        if upgraded:
+            user.password = upgraded
+            await user.asave(update_fields=['password'])
+        return user
+    await user_login_failed.asend(sender=__name__, credentials={'email': email}, request=request)
+    return None
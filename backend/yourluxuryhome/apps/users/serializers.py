@@ -1,9 +1,15 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from apps.common.fields import ImageVariantsField
+
 from .models import User, Profile
+from .passwords import aauthenticate_login, authenticate_login
+from .tokens import RefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -15,10 +21,11 @@ class UserSerializer(serializers.ModelSerializer):
 
 class ProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    photo_variants = ImageVariantsField('photo')
     
     class Meta:
         model = Profile
-        fields = ['user', 'phone_number', 'bio', 'photo', 'created_at', 'updated_at']
+        fields = ['user', 'phone_number', 'bio', 'photo', 'photo_variants', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
 
@@ -81,7 +88,7 @@ class LoginSerializer(serializers.Serializer):
         password = data.get('password', '')
         
         if email and password:
-            user = authenticate(username=email, password=password)
+            user = authenticate_login(email, password, request=self.context.get('request'))
             if user:
                 if not user.is_active:
                     raise serializers.ValidationError("User account is disabled.")
@@ -91,7 +98,26 @@ class LoginSerializer(serializers.Serializer):
         raise serializers.ValidationError("Must include 'email' and 'password'.")
 
 
+class AsyncLoginSerializer(LoginSerializer):
+    """
+    ``LoginSerializer`` for async views: ``is_valid()`` checks the fields only,
+    and ``aauthenticate()`` then checks the credentials without blocking the event loop.
+    """
+    
+    def validate(self, data):
+        return data
+    
+    async def aauthenticate(self):
+        data = self.validated_data
+        user = await aauthenticate_login(data['email'], data['password'], request=self.context.get('request'))
+        if user is None:
+            raise serializers.ValidationError("Unable to log in with provided credentials.")
+        return user
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
@@ -101,10 +127,20 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['username'] = user.username
         token['first_name'] = user.first_name
         token['last_name'] = user.last_name
+        # Read by TokenUser on endpoints that trust token claims
+        token['is_staff'] = user.is_staff
         
         return token
 
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+class CustomTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = RefreshToken
+
+
 class PasswordResetSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
 
@@ -1,5 +1,8 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from apps.common.images import request_variants
+
+from .authentication import forget_user
 from .models import User, Profile
 
 
@@ -9,9 +12,10 @@ def create_user_profile(sender, instance, created, **kwargs):
     Signal handler to create a profile when a new user is created.
     
     This ensures every user has an associated profile automatically.
+    ``User.objects.bulk_create`` does the same for many users in one INSERT.
     """
     if created:
-        Profile.objects.create(user=instance)
+        Profile.objects.create_for_users([instance])
 
 
 @receiver(post_save, sender=User)
@@ -19,8 +23,37 @@ def save_user_profile(sender, instance, **kwargs):
     """
     Signal handler to save a user's profile when the user is saved.
     
-    This ensures profile changes are saved when the user is updated.
+    Only a profile already loaded on the user is considered, and it is saved
+    only when its own fields changed, so saves such as the last_login update
+    at login do not touch the profile table.
     """
-    # Check if profile exists to avoid errors during initial migrations
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
+    # Saves of specific fields (e.g. last_login at login) never include profile changes
+    if kwargs.get('update_fields'):
+        return
+    if not User.profile.related.is_cached(instance):
+        return
+    profile = User.profile.related.get_cached_value(instance)
+    if profile is not None and profile.pk is not None:
+        changed = profile.changed_fields
+        if changed:
+            profile.save(update_fields=[*changed, 'updated_at'])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Drop the user from the authentication cache so the next request reloads it."""
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_cached_profile_user(sender, instance, **kwargs):
+    """The cached user carries its profile, so profile changes reload it too."""
+    forget_user(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def queue_photo_variants(sender, instance, **kwargs):
+    """Queue responsive variants for a new or replaced profile photo."""
+    request_variants(instance, 'photo')
@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.services.models import ServiceType
+from apps.users.authentication import forget_user
+from apps.users.models import User
+from apps.users.serializers import CustomTokenObtainPairSerializer
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        """Create a user and authenticate the client with a real access token."""
+        self.user = User.objects.create_user(
+            username='authuser',
+            email='auth@example.com',
+            password='userpassword',
+            first_name='Auth'
+        )
+        self._use_token(self.user)
+
+    def _use_token(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_opted_in_reads_do_not_query_the_user(self):
+        """Catalog reads authenticate from the token claims alone."""
+        url = reverse('service-by-type')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Only the catalog version is read
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('users_user', queries[0]['sql'])
+
+    def test_profile_is_loaded_with_the_cached_user(self):
+        """The profile comes with the user in one query, and later requests use the cache."""
+        url = reverse('users:profile')
+        forget_user(self.user.pk)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['user']['first_name'], 'Auth')
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_saving_the_user_refreshes_the_cache(self):
+        """A saved user is reloaded on the next request."""
+        url = reverse('users:profile')
+        self.client.get(url)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.client.get(url).data['user']['first_name'], 'Renamed')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(USER_CACHE_TTL=0)
+    def test_entries_expire(self):
+        """Changes made without signals show up once the entry expires."""
+        url = reverse('users:profile')
+        self.client.get(url)
+        User.objects.filter(pk=self.user.pk).update(first_name='Bulk')
+        self.assertEqual(self.client.get(url).data['user']['first_name'], 'Bulk')
+
+    def test_writes_use_the_database_user(self):
+        """Only opted-in reads trust the token; writes on the same view check the stored user."""
+        self.user.is_active = False
+        self.user.save()
+        url = reverse('service-type-list')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(url, {'name': 'Spa'}).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(ServiceType.objects.exists())
+
+    def test_tokens_carry_the_staff_claim(self):
+        """Tokens issued at login include is_staff for claim-based reads."""
+        admin = User.objects.create_superuser(username='authadmin', email='authadmin@example.com', password='adminpassword')
+        self.assertTrue(CustomTokenObtainPairSerializer.get_token(admin)['is_staff'])
+        self.assertFalse(CustomTokenObtainPairSerializer.get_token(self.user)['is_staff'])
@@ -0,0 +1,100 @@
+import threading
+
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.users import passwords
+from apps.users.models import User
+
+
+class LoginTests(APITestCase):
+    def setUp(self):
+        """Create a user with a known password."""
+        self.password = 'StrongPassword123!'
+        self.user = User.objects.create_user(
+            username='loginuser',
+            email='login@example.com',
+            password=self.password
+        )
+        self.url = reverse('users:login')
+
+    def _login(self, email='login@example.com', password=None):
+        return self.client.post(self.url, {'email': email, 'password': password or self.password}, format='json')
+
+    def test_jwt_only_login_skips_session_and_profile_writes(self):
+        """Login issues tokens, stores no session and does not re-save the profile."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self._login()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+
+        writes = [q['sql'] for q in queries if not q['sql'].startswith('SELECT')]
+        self.assertEqual(len([sql for sql in writes if sql.startswith('UPDATE "users_user"')]), 1)
+        self.assertFalse([sql for sql in writes if 'users_profile' in sql or 'django_session' in sql])
+        self.assertFalse(Session.objects.exists())
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    @override_settings(JWT_ONLY_LOGIN=False)
+    def test_session_login_can_be_enabled(self):
+        """With JWT_ONLY_LOGIN off, login also starts a Django session."""
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        self.assertTrue(Session.objects.exists())
+
+    def test_bad_credentials_are_rejected(self):
+        """Wrong passwords, unknown emails and inactive users fail and signal user_login_failed."""
+        failures = []
+        def record(sender, credentials, **kwargs):
+            failures.append(credentials['email'])
+        user_login_failed.connect(record)
+        self.addCleanup(user_login_failed.disconnect, record)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self._login().status_code, status.HTTP_400_BAD_REQUEST)
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.assertEqual(self._login(password='wrong-password').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._login(email='nobody@example.com').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(failures, ['login@example.com', 'login@example.com', 'nobody@example.com'])
+
+    def test_outdated_hash_is_upgraded(self):
+        """A password stored with a non-default hasher is re-hashed with the default one at login."""
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password(self.password, hasher='pbkdf2_sha1')
+        )
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    async def test_async_login_verifies_in_the_hashing_pool(self):
+        """The async view answers like the sync one, with the hash run on a pool thread."""
+        threads = []
+        check_password = passwords.check_password
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return check_password(*args, **kwargs)
+        passwords.check_password = record
+        self.addCleanup(setattr, passwords, 'check_password', check_password)
+
+        url = reverse('users:login-async')
+        response = await self.async_client.post(
+            url, {'email': 'login@example.com', 'password': self.password}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['user']['email'], 'login@example.com')
+        self.assertIn('access', response.json())
+        self.assertTrue(threads[0].startswith('password-hashing'))
+        self.assertFalse(await Session.objects.aexists())
+        await self.user.arefresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+        response = await self.async_client.post(
+            url, {'email': 'login@example.com', 'password': 'wrong-password'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', response.json())
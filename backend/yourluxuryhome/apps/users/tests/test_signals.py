@@ -53,3 +53,37 @@ class UserProfileSignalTests(TestCase):
         # Check that the profile was updated
         self.assertEqual(user.profile.bio, 'This is a test bio')
         self.assertEqual(user.profile.phone_number, '+1234567890')
+
+    def test_user_save_skips_unchanged_profile(self):
+        """Saving a user whose profile is unloaded or unchanged writes only the user row."""
+        User.objects.create_user(username='quietuser', email='quiet@example.com', password='quietpassword123')
+        user = User.objects.get(email='quiet@example.com')
+        with self.assertNumQueries(1):
+            user.save()
+        
+        user = User.objects.select_related('profile').get(email='quiet@example.com')
+        user.first_name = 'Quiet'
+        with self.assertNumQueries(1):
+            user.save()
+    
+    def test_only_changed_profile_fields_are_written(self):
+        """A changed profile is saved with just its changed fields and is clean afterwards."""
+        user = User.objects.create_user(username='dirtyuser', email='dirty@example.com', password='dirtypassword123')
+        profile = Profile.objects.get(user=user)
+        self.assertEqual(profile.changed_fields, [])
+        profile.bio = 'Changed'
+        self.assertEqual(profile.changed_fields, ['bio'])
+        
+        user.profile = profile
+        with self.assertNumQueries(2):
+            user.save()
+        self.assertEqual(profile.changed_fields, [])
+        self.assertEqual(Profile.objects.get(user=user).bio, 'Changed')
+    
+    def test_bulk_created_users_get_profiles(self):
+        """bulk_create inserts the users and all of their profiles in two queries."""
+        users = [User(username=f'bulk{i}', email=f'bulk{i}@example.com') for i in range(5)]
+        with self.assertNumQueries(2):
+            User.objects.bulk_create(users)
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 5)
+        self.assertEqual(users[0].profile.changed_fields, [])
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users.models import User
+from apps.users.serializers import CustomTokenObtainPairSerializer
+from apps.users.tokens import BloomFilter, RefreshToken, blacklist_filter, prune_outstanding_tokens
+
+
+class TokenBlacklistFilterTests(APITestCase):
+    def setUp(self):
+        """Create a user and issue them a refresh token."""
+        self.user = User.objects.create_user(
+            username='tokenuser',
+            email='token@example.com',
+            password='userpassword'
+        )
+        self.refresh = CustomTokenObtainPairSerializer.get_token(self.user)
+        self.url = reverse('users:token_refresh')
+
+    def _blacklist_elsewhere(self, token):
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.create(token=outstanding)
+
+    def test_rotated_refresh_token_cannot_be_reused(self):
+        """Refreshing blacklists the old token, which is then rejected while the new one works."""
+        response = self.client.post(self.url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        replay = self.client.post(self.url, {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(self.url, {'refresh': response.data['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_REFRESH=0)
+    def test_tokens_blacklisted_by_other_processes_are_picked_up(self):
+        """Rows written outside this process reach the filter on its next top-up."""
+        self.refresh.check_blacklist()
+        self._blacklist_elsewhere(self.refresh)
+        with self.assertRaises(TokenError):
+            RefreshToken(str(self.refresh))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_REFRESH=0)
+    def test_rows_committed_below_the_last_seen_id_are_picked_up(self):
+        """A row that becomes visible after higher ids were synced still reaches the filter."""
+        other = CustomTokenObtainPairSerializer.get_token(self.user)
+        later = BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=other['jti']), id=100)
+        self.assertTrue(blacklist_filter.might_contain(other['jti']))
+        self.assertEqual(blacklist_filter.last_id, later.id)
+
+        # Took its id before the row above, but its transaction committed after the sync
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=self.refresh['jti']), id=50)
+        with self.assertRaises(TokenError):
+            RefreshToken(str(self.refresh))
+
+    @override_settings(TOKEN_BLACKLIST_FILTER_REFRESH=60)
+    def test_unknown_tokens_are_checked_without_queries(self):
+        """Between top-ups, a token the filter has not seen is accepted without touching the database."""
+        self.refresh.check_blacklist()
+        other = CustomTokenObtainPairSerializer.get_token(self.user)
+        with self.assertNumQueries(0):
+            other.check_blacklist()
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Every added value is found, and unrelated values rarely are."""
+        bloom = BloomFilter(1000)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 50)
+        bloom.add('one-more')
+        self.assertTrue(bloom.is_full)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        """Expired tokens and their blacklist entries are deleted in batches; live ones stay."""
+        now = timezone.now()
+        for i in range(5):
+            expired = OutstandingToken.objects.create(
+                user=self.user, jti=f'expired-{i}', token='x', expires_at=now - timedelta(days=1)
+            )
+            BlacklistedToken.objects.create(token=expired)
+        self._blacklist_elsewhere(self.refresh)
+
+        self.assertEqual(prune_outstanding_tokens(batch_size=2), 5)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [self.refresh['jti']])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+        out = StringIO()
+        call_command('prune_tokens', stdout=out)
+        self.assertIn('Deleted 0 expired token(s)', out.getvalue())
+
+    def test_reset_filter_is_rebuilt_from_live_rows(self):
+        """A fresh filter loads the unexpired blacklist from the database."""
+        self._blacklist_elsewhere(self.refresh)
+        blacklist_filter.reset()
+        self.assertTrue(blacklist_filter.might_contain(self.refresh['jti']))
@@ -0,0 +1,164 @@
+"""
+Refresh tokens whose blacklist check usually skips the database.
+
+Every process keeps a Bloom filter of blacklisted token ids (``jti``). A token
+the filter has never seen is certainly not blacklisted; a hit is confirmed
+against ``BlacklistedToken``, so false positives only cost the query the stock
+check always pays.
+
+The filter is loaded once, then topped up at most every
+``TOKEN_BLACKLIST_FILTER_REFRESH`` seconds. Tokens blacklisted in this process
+are added immediately; those blacklisted by other processes are noticed within
+the refresh interval. Primary keys are assigned on INSERT but rows become
+visible on COMMIT, so a row can appear below ids already seen; each top-up
+therefore reads every row above the newest one blacklisted more than
+``SYNC_OVERLAP`` seconds ago, as well as everything above the last id seen.
+Both bounds walk the primary key index. The filter is rebuilt from the
+unexpired rows when it fills up and every ``REBUILD_INTERVAL`` seconds, which
+also covers longer transactions and drops pruned tokens.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Subquery, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+
+# The filter is sized for at least this many tokens, and twice the live blacklist
+MIN_FILTER_CAPACITY = 10000
+FILTER_ERROR_RATE = 0.001
+# Seconds of blacklisting that every top-up reads again, for rows committed late
+SYNC_OVERLAP = 60
+REBUILD_INTERVAL = 60 * 60
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity, error_rate=FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def is_full(self):
+        return self.count > self.capacity
+
+
+class _BlacklistFilter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.bloom = None
+        self.last_id = 0
+        self.synced_at = float('-inf')
+        self.rebuilt_at = float('-inf')
+
+    def _rebuild(self):
+        last_id = BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        jtis = list(
+            BlacklistedToken.objects.filter(id__lte=last_id, token__expires_at__gt=timezone.now())
+            .values_list('token__jti', flat=True)
+        )
+        bloom = BloomFilter(max(MIN_FILTER_CAPACITY, 2 * len(jtis)))
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom = bloom
+        self.last_id = last_id
+        self.rebuilt_at = time.monotonic()
+
+    def _top_up(self):
+        # Newest row blacklisted before the overlap window, found walking the primary key index down
+        settled = BlacklistedToken.objects.filter(
+            blacklisted_at__lt=timezone.now() - timedelta(seconds=SYNC_OVERLAP)
+        ).order_by('-id').values('id')[:1]
+        rows = BlacklistedToken.objects.filter(
+            id__gt=Least(Value(self.last_id), Coalesce(Subquery(settled), Value(0)))
+        ).values_list('id', 'token__jti')
+        for row_id, jti in rows:
+            # Rows in the overlap were usually seen before; adding them again would fill the filter
+            if jti not in self.bloom:
+                self.bloom.add(jti)
+            self.last_id = max(self.last_id, row_id)
+
+    def sync(self):
+        if time.monotonic() - self.synced_at < settings.TOKEN_BLACKLIST_FILTER_REFRESH:
+            return
+        with self.lock:
+            if self.bloom is None or self.bloom.is_full or time.monotonic() - self.rebuilt_at > REBUILD_INTERVAL:
+                self._rebuild()
+            else:
+                self._top_up()
+            self.synced_at = time.monotonic()
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self.bloom
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+
+blacklist_filter = _BlacklistFilter()
+
+
+class RefreshToken(BaseRefreshToken):
+    """A refresh token whose blacklist check goes through ``blacklist_filter``."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if blacklist_filter.might_contain(jti) and BlacklistedToken.objects.filter(token__jti=jti).exists():
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
+
+
+def prune_outstanding_tokens(batch_size=1000):
+    """
+    Delete expired outstanding tokens, with their blacklist entries, and return how many were removed.
+
+    Tokens are issued with a fixed lifetime, so the expired ones are the lowest
+    primary keys; each batch walks the primary key index from the start and
+    stops after ``batch_size`` matches instead of scanning the table.
+    """
+    deleted = 0
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    while True:
+        chunk = list(expired.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not chunk:
+            return deleted
+        BlacklistedToken.objects.filter(token_id__in=chunk).delete()
+        deleted += OutstandingToken.objects.filter(id__in=chunk).delete()[0]
@@ -5,6 +5,7 @@ from rest_framework_simplejwt.views import TokenRefreshView, TokenBlacklistView
 from .views import (
     RegisterView,
     LoginView,
+    AsyncLoginView,
     ProfileView,
     UserReservationsView,
     PasswordResetView,
@@ -28,6 +29,7 @@ urlpatterns = [
     # Authentication endpoints
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('login/async/', AsyncLoginView.as_view(), name='login-async'),
     path('logout/blacklist/', TokenBlacklistView.as_view(), name='jwt-blacklist'),
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
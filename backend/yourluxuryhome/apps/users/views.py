@@ -1,32 +1,51 @@
+import json
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
-from django.contrib.auth import login, logout
+from django.contrib.auth import login, logout, user_logged_in
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.core.mail import send_mail
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 
-from rest_framework import status, permissions, generics, viewsets
+from rest_framework import serializers, status, permissions, generics, viewsets
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.views import TokenObtainPairView
 from apps.common.throttling import LoginRateThrottle, RegisterRateThrottle
 
 from .models import User, Profile
+from .tokens import RefreshToken
 from .serializers import (
     UserSerializer, 
     ProfileSerializer, 
     ProfileUpdateSerializer,
     RegisterSerializer, 
     LoginSerializer, 
+    AsyncLoginSerializer,
     CustomTokenObtainPairSerializer,
     PasswordResetSerializer,
     PasswordResetConfirmSerializer
 )
 
 
+def login_response_data(user):
+    """The tokens and user data returned by the login views."""
+    refresh = CustomTokenObtainPairSerializer.get_token(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'user': UserSerializer(user).data
+    }
+
+
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = [AllowAny]
@@ -37,7 +56,7 @@ class RegisterView(generics.CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -55,19 +74,58 @@ class LoginView(APIView):
     permission_classes = [AllowAny]
     
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
+        serializer = LoginSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            login(request, user)
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-                'user': UserSerializer(user).data
-            })
+            if settings.JWT_ONLY_LOGIN:
+                # No session for clients that only use the tokens; receivers still update last_login
+                user_logged_in.send(sender=user.__class__, request=request, user=user)
+            else:
+                login(request, user)
+            return Response(login_response_data(user))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """
+    JWT-only login for ASGI deployments, with the same request and response as ``LoginView``.
+    
+    The password is verified in the hashing thread pool while the event loop
+    keeps serving other requests; throttling and token issuing, which use the
+    database, run through ``sync_to_async``.
+    """
+    throttle_classes = [LoginRateThrottle]
+    
+    def _throttle_wait(self, request):
+        for throttle in (throttle_class() for throttle_class in self.throttle_classes):
+            if not throttle.allow_request(request, self):
+                return throttle.wait()
+        return None
+    
+    async def post(self, request):
+        wait = await sync_to_async(self._throttle_wait)(request)
+        if wait is not None:
+            return JsonResponse(
+                {'detail': 'Request was throttled.'}, status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(int(wait))}
+            )
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'detail': 'JSON parse error.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = AsyncLoginSerializer(data=data, context={'request': request})
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            user = await serializer.aauthenticate()
+        except serializers.ValidationError as exc:
+            return JsonResponse({api_settings.NON_FIELD_ERRORS_KEY: exc.detail}, status=status.HTTP_400_BAD_REQUEST)
+        await user_logged_in.asend(sender=user.__class__, request=request, user=user)
+        return JsonResponse(await sync_to_async(login_response_data)(user))
+
+
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     
@@ -109,7 +167,7 @@ class UserReservationsView(APIView):
             from apps.reservations.models import Reservation
             from apps.reservations.serializers import ReservationSerializer
             
-            reservations = Reservation.objects.filter(user=request.user)
+            reservations = Reservation.objects.with_details().filter(user=request.user)
             serializer = ReservationSerializer(reservations, many=True)
             return Response(serializer.data)
         except ImportError:
@@ -135,7 +193,7 @@ class PasswordResetView(APIView):
                 # Create password reset link
                 reset_link = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}/"
                 
-                # Send email with reset link
+                # Send email with reset link (stored in the outbox, delivered by the task worker)
                 send_mail(
                     subject="Password Reset for Your Luxury Home",
                     message=f"Please use the following link to reset your password: {reset_link}",
@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import WaitlistEntry
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'apartment', 'city', 'guests', 'check_in_date', 'check_out_date', 'status', 'notified_at']
+    list_filter = ['status', 'city']
+    search_fields = ['user__email', 'apartment__name', 'city']
+    readonly_fields = ['matched_apartment', 'notified_at', 'created_at']
+    autocomplete_fields = ['user', 'apartment']
+    list_select_related = ['user', 'apartment']
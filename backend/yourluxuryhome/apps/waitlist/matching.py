@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.apartments.services import build_occupancy
+
+from .models import MAX_WAITLIST_NIGHTS, WaitlistEntry, WaitlistStatus
+
+
+def candidate_entries(apartment, start, end, today):
+    """
+    Return the waiting entries for ``apartment`` whose stay overlaps the nights [start, end).
+    
+    Entries name the apartment itself, or its city with a party it can host.
+    Stays are at most ``MAX_WAITLIST_NIGHTS`` long, so an overlapping stay
+    checks in after ``start - MAX_WAITLIST_NIGHTS``; with the lower bound of
+    today that becomes a bounded range on ``check_in_date``, which the two
+    waitlist indexes answer without looking at other apartments, cities or
+    dates.
+    """
+    first_check_in = max(start - timedelta(days=MAX_WAITLIST_NIGHTS - 1), today)
+    if first_check_in >= end:
+        return []
+    window = {
+        'status': WaitlistStatus.WAITING,
+        'check_in_date__gte': first_check_in,
+        'check_in_date__lt': end,
+        'check_out_date__gt': start,
+    }
+    entries = list(WaitlistEntry.objects.filter(apartment=apartment, **window))
+    entries += WaitlistEntry.objects.filter(
+        apartment__isnull=True, city=apartment.city, guests__lte=apartment.max_guests, **window
+    )
+    return entries
+
+
+def match_freed_stay(apartment, start, end, today=None):
+    """
+    Return the waiting entries that ``apartment`` can now host after [start, end) was freed.
+    
+    Candidates overlap the freed nights; an entry matches when every night of
+    its stay is free, which is checked against one occupancy array built for
+    all candidates together.
+    """
+    if not apartment.is_available:
+        return []
+    entries = candidate_entries(apartment, start, end, today or timezone.now().date())
+    if not entries:
+        return []
+    
+    window_start = min(entry.check_in_date for entry in entries)
+    window_end = max(entry.check_out_date for entry in entries)
+    nights_taken = build_occupancy([apartment.id], window_start, window_end)[apartment.id]
+    return [
+        entry for entry in entries
+        if not any(nights_taken[(entry.check_in_date - window_start).days:(entry.check_out_date - window_start).days])
+    ]
+
+
+def _notification(entry, apartment):
+    link = f"{settings.FRONTEND_URL}{apartment.get_absolute_url()}"
+    return EmailMessage(
+        subject=f"{apartment.name} is available for your dates",
+        body=(
+            f"Good news: {apartment.name} in {apartment.city} is now available "
+            f"from {entry.check_in_date} to {entry.check_out_date}.\n\n"
+            f"Book it before someone else does: {link}"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[entry.user.email],
+    )
+
+
+def notify_matches(apartment, entries):
+    """
+    Mark ``entries`` as notified about ``apartment`` and email their guests; return the count.
+    
+    Entries that another run notified meanwhile are skipped, and the status
+    change and the queued emails commit together.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        waiting = WaitlistEntry.objects.filter(
+            pk__in=[entry.pk for entry in entries], status=WaitlistStatus.WAITING
+        ).select_related('user')
+        if connection.features.has_select_for_update:
+            waiting = waiting.select_for_update(of=('self',))
+        waiting = list(waiting)
+        if not waiting:
+            return 0
+        WaitlistEntry.objects.filter(pk__in=[entry.pk for entry in waiting]).update(
+            status=WaitlistStatus.NOTIFIED, notified_at=now, matched_apartment=apartment
+        )
+        get_connection().send_messages([_notification(entry, apartment) for entry in waiting])
+    return len(waiting)
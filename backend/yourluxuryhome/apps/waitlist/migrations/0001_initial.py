@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('apartments', '0006_alter_roomconnection_hotspot_color'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(blank=True, help_text='Used when no apartment is given', max_length=100)),
+                ('guests', models.PositiveSmallIntegerField(default=1)),
+                ('check_in_date', models.DateField()),
+                ('check_out_date', models.DateField()),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('notified', 'Notified')], default='waiting', max_length=20)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('apartment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='apartments.apartment')),
+                ('matched_apartment', models.ForeignKey(blank=True, help_text='Apartment whose freed dates the guest was told about', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='apartments.apartment')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Waitlist Entry',
+                'verbose_name_plural': 'Waitlist Entries',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['apartment', 'status', 'check_in_date'], name='waitlist_apartment_idx'), models.Index(fields=['city', 'status', 'check_in_date'], name='waitlist_city_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+# Longest stay a guest can wait for. Bounding the stay length lets the matcher
+# turn "overlaps the freed nights" into a range scan on check_in_date.
+MAX_WAITLIST_NIGHTS = 30
+
+
+class WaitlistStatus(models.TextChoices):
+    WAITING = 'waiting', _('Waiting')
+    NOTIFIED = 'notified', _('Notified')
+
+
+class WaitlistEntry(models.Model):
+    """
+    A guest waiting for a stay to become bookable.
+    
+    The entry names either one apartment, or a city and a party size, in which
+    case any apartment there that fits the party will do.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    apartment = models.ForeignKey(
+        'apartments.Apartment',
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='waitlist_entries'
+    )
+    city = models.CharField(max_length=100, blank=True, help_text=_('Used when no apartment is given'))
+    guests = models.PositiveSmallIntegerField(default=1)
+    check_in_date = models.DateField()
+    check_out_date = models.DateField()
+    status = models.CharField(
+        max_length=20,
+        choices=WaitlistStatus.choices,
+        default=WaitlistStatus.WAITING
+    )
+    matched_apartment = models.ForeignKey(
+        'apartments.Apartment',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+',
+        help_text=_('Apartment whose freed dates the guest was told about')
+    )
+    notified_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = _('Waitlist Entry')
+        verbose_name_plural = _('Waitlist Entries')
+        indexes = [
+            # Serve the matcher's range scans for apartment and city entries
+            models.Index(fields=['apartment', 'status', 'check_in_date'], name='waitlist_apartment_idx'),
+            models.Index(fields=['city', 'status', 'check_in_date'], name='waitlist_city_idx'),
+        ]
+    
+    def __str__(self):
+        target = self.apartment or self.city
+        return f"{self.user} waiting for {target} from {self.check_in_date} to {self.check_out_date}"
@@ -0,0 +1,39 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import MAX_WAITLIST_NIGHTS, WaitlistEntry
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    apartment_name = serializers.ReadOnlyField(source='apartment.name')
+    matched_apartment_name = serializers.ReadOnlyField(source='matched_apartment.name')
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            'id', 'apartment', 'apartment_name', 'city', 'guests', 'check_in_date', 'check_out_date',
+            'status', 'matched_apartment', 'matched_apartment_name', 'notified_at', 'created_at'
+        ]
+        read_only_fields = ['id', 'status', 'matched_apartment', 'notified_at', 'created_at']
+    
+    def validate(self, data):
+        check_in = data['check_in_date']
+        check_out = data['check_out_date']
+        if check_in < timezone.now().date():
+            raise serializers.ValidationError({"check_in_date": "Check-in date cannot be in the past."})
+        if check_out <= check_in:
+            raise serializers.ValidationError({"check_out_date": "Check-out date must be after check-in date."})
+        if (check_out - check_in).days > MAX_WAITLIST_NIGHTS:
+            raise serializers.ValidationError(
+                {"check_out_date": f"A waitlist stay can be at most {MAX_WAITLIST_NIGHTS} nights."}
+            )
+        
+        apartment = data.get('apartment')
+        if apartment is None and not data.get('city'):
+            raise serializers.ValidationError("Give an apartment or a city to wait for.")
+        if apartment is not None:
+            if data.get('guests', 1) > apartment.max_guests:
+                raise serializers.ValidationError({"guests": f"This apartment hosts at most {apartment.max_guests} guests."})
+            # Entries for one apartment are matched by apartment only
+            data['city'] = ''
+        return data
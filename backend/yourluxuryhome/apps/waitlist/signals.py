@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.reservations.models import ACTIVE_RESERVATION_STATUSES, Reservation, ReservationStatus
+from apps.reservations.signals import reservations_transitioned
+
+from .tasks import match_freed_stays
+
+
+def _queue_matching(stays):
+    """Queue waitlist matching for ``(apartment_id, check_in, check_out)`` stays in the caller's transaction."""
+    stays = sorted({(str(apartment_id), check_in.isoformat(), check_out.isoformat())
+                    for apartment_id, check_in, check_out in stays})
+    if stays:
+        match_freed_stays.enqueue(stays=[list(stay) for stay in stays])
+
+
+@receiver(reservations_transitioned)
+def match_cancelled_stays(sender, reservation_ids, status, **kwargs):
+    """Queue waitlist matching for the nights freed by cancelled reservations."""
+    if status != ReservationStatus.CANCELLED:
+        return
+    _queue_matching(Reservation.objects.filter(pk__in=reservation_ids).values_list(
+        'apartment_id', 'check_in_date', 'check_out_date'
+    ))
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_held_stay(sender, instance, raw, update_fields=None, **kwargs):
+    """Remember the stay an active reservation held before this save, to match it if the save frees it."""
+    instance._waitlist_held_stay = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {'apartment', 'check_in_date', 'check_out_date', 'status'} & set(update_fields):
+        return
+    instance._waitlist_held_stay = Reservation.objects.filter(
+        pk=instance.pk, status__in=ACTIVE_RESERVATION_STATUSES
+    ).values_list('apartment_id', 'check_in_date', 'check_out_date').first()
+
+
+@receiver(post_save, sender=Reservation)
+def match_stay_freed_by_save(sender, instance, raw=False, **kwargs):
+    """Queue matching when a save cancels a reservation or moves it off the nights it held."""
+    held = getattr(instance, '_waitlist_held_stay', None)
+    if raw or held is None:
+        return
+    if instance.status not in ACTIVE_RESERVATION_STATUSES or held != (
+        instance.apartment_id, instance.check_in_date, instance.check_out_date
+    ):
+        _queue_matching([held])
+
+
+@receiver(post_delete, sender=Reservation)
+def match_deleted_stay(sender, instance, **kwargs):
+    """Queue matching for the nights held by a deleted active reservation."""
+    if instance.status in ACTIVE_RESERVATION_STATUSES:
+        _queue_matching([(instance.apartment_id, instance.check_in_date, instance.check_out_date)])
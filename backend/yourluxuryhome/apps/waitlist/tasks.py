@@ -0,0 +1,22 @@
+from datetime import date
+
+from apps.apartments.models import Apartment
+from apps.tasks.registry import task
+
+from .matching import match_freed_stay, notify_matches
+
+
+@task('waitlist.match_freed_stays')
+def match_freed_stays(stays):
+    """Notify the waitlist about each freed ``[apartment_id, check_in, check_out]`` stay."""
+    apartments = {
+        str(apartment.pk): apartment
+        for apartment in Apartment.objects.filter(pk__in=[apartment_id for apartment_id, _, _ in stays])
+    }
+    for apartment_id, check_in, check_out in stays:
+        apartment = apartments.get(apartment_id)
+        if apartment is None:
+            continue
+        matches = match_freed_stay(apartment, date.fromisoformat(check_in), date.fromisoformat(check_out))
+        if matches:
+            notify_matches(apartment, matches)
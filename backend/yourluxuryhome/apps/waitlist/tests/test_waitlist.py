@@ -0,0 +1,198 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core import mail
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.apartments.models import Apartment
+from apps.reservations.models import Reservation, ReservationStatus
+from apps.tasks.worker import Worker
+from apps.users.models import User
+from apps.waitlist.matching import candidate_entries, match_freed_stay, notify_matches
+from apps.waitlist.models import WaitlistEntry, WaitlistStatus
+
+
+class WaitlistMatchingTests(APITestCase):
+    def setUp(self):
+        """Create a booked apartment, a smaller one in the same city and a guest waiting for dates."""
+        self.guest = User.objects.create_user(
+            username='waitlistguest',
+            email='waitlist@example.com',
+            password='userpassword'
+        )
+        self.booker = User.objects.create_user(
+            username='waitlistbooker',
+            email='booker@example.com',
+            password='userpassword'
+        )
+        self.apartment = Apartment.objects.create(
+            name='Waitlist Apartment', description='-', address='1 Queue Street',
+            city='Vienna', country='Austria', price_per_night=Decimal('100.00'), max_guests=4
+        )
+        Apartment.objects.create(
+            name='Small Waitlist Apartment', description='-', address='2 Queue Street',
+            city='Vienna', country='Austria', price_per_night=Decimal('60.00'), max_guests=2
+        )
+        self.day = timezone.now().date() + timedelta(days=30)
+        self.reservation = self._reserve(0, 5)
+        self._reserve(5, 8)
+
+    def _reserve(self, first, last):
+        return Reservation.objects.create(
+            user=self.booker, apartment=self.apartment, status=ReservationStatus.CONFIRMED,
+            check_in_date=self.day + timedelta(days=first), check_out_date=self.day + timedelta(days=last)
+        )
+
+    def _wait(self, first, last, apartment=None, city='', guests=2):
+        return WaitlistEntry.objects.create(
+            user=self.guest, apartment=apartment, city=city, guests=guests,
+            check_in_date=self.day + timedelta(days=first), check_out_date=self.day + timedelta(days=last)
+        )
+
+    def test_cancellation_notifies_matching_entries(self):
+        """Cancelling a stay emails the entries whose whole stay is now free, and only those."""
+        inside = self._wait(1, 4, apartment=self.apartment)
+        by_city = self._wait(0, 2, city='Vienna', guests=3)
+        still_booked = self._wait(3, 7, apartment=self.apartment)
+        elsewhere = self._wait(20, 22, apartment=self.apartment)
+        too_many_guests = self._wait(1, 3, city='Vienna', guests=6)
+
+        self.client.force_authenticate(user=self.booker)
+        url = reverse('reservations:reservation-cancel', kwargs={'pk': self.reservation.pk})
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+        Worker().run(burst=True)
+
+        notified = WaitlistEntry.objects.filter(status=WaitlistStatus.NOTIFIED)
+        self.assertCountEqual(notified, [inside, by_city])
+        self.assertEqual({entry.matched_apartment for entry in notified}, {self.apartment})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['waitlist@example.com'])
+        self.assertIn('Waitlist Apartment', mail.outbox[0].subject)
+        for entry in [still_booked, elsewhere, too_many_guests]:
+            entry.refresh_from_db()
+            self.assertEqual(entry.status, WaitlistStatus.WAITING)
+
+    def test_deleted_reservation_notifies_entries(self):
+        """Deleting an active reservation frees its nights for the waitlist."""
+        entry = self._wait(1, 4, apartment=self.apartment)
+        self.client.force_authenticate(user=self.booker)
+        url = reverse('reservations:reservation-detail', kwargs={'pk': self.reservation.pk})
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        Worker().run(burst=True)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.NOTIFIED)
+
+    def test_moved_reservation_notifies_entries_for_old_nights(self):
+        """Moving a reservation to other dates frees the nights it held before."""
+        entry = self._wait(1, 4, apartment=self.apartment)
+        self.client.force_authenticate(user=self.booker)
+        url = reverse('reservations:reservation-detail', kwargs={'pk': self.reservation.pk})
+        response = self.client.patch(url, {
+            'check_in_date': (self.day + timedelta(days=40)).isoformat(),
+            'check_out_date': (self.day + timedelta(days=42)).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        Worker().run(burst=True)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.NOTIFIED)
+
+    def test_status_saved_directly_notifies_entries(self):
+        """A cancellation saved on the model, outside transition(), is matched too."""
+        entry = self._wait(1, 4, apartment=self.apartment)
+        self.reservation.status = ReservationStatus.CANCELLED
+        self.reservation.save()
+        Worker().run(burst=True)
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, WaitlistStatus.NOTIFIED)
+
+    def test_edit_keeping_the_stay_does_not_match(self):
+        """Saving a reservation without freeing nights queues nothing."""
+        self._wait(1, 4, apartment=self.apartment)
+        self.reservation.guests = 3
+        self.reservation.save()
+        Worker().run(burst=True)
+        self.assertFalse(WaitlistEntry.objects.filter(status=WaitlistStatus.NOTIFIED).exists())
+
+    def test_other_transitions_do_not_match(self):
+        """Only cancellations free dates; completing a stay queues nothing."""
+        self._wait(1, 4, apartment=self.apartment)
+        Reservation.objects.filter(pk=self.reservation.pk).transition(ReservationStatus.COMPLETED)
+        Worker().run(burst=True)
+        self.assertFalse(WaitlistEntry.objects.filter(status=WaitlistStatus.NOTIFIED).exists())
+
+    def test_entries_are_notified_once(self):
+        """A second match for an already notified entry sends nothing."""
+        entry = self._wait(1, 4, apartment=self.apartment)
+        self.assertEqual(notify_matches(self.apartment, [entry]), 1)
+        self.assertEqual(notify_matches(self.apartment, [entry]), 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_candidates_use_two_bounded_queries(self):
+        """Candidate lookup is two indexed range queries, whatever the waitlist size."""
+        for offset in range(0, 60, 3):
+            self._wait(offset, offset + 2, apartment=self.apartment)
+            self._wait(offset, offset + 2, city='Vienna')
+        with self.assertNumQueries(2):
+            entries = candidate_entries(self.apartment, self.day, self.day + timedelta(days=5), timezone.now().date())
+        self.assertEqual(len(entries), 4)
+
+    def test_unavailable_apartment_matches_nothing(self):
+        """Apartments taken off the market do not notify anyone."""
+        self._wait(1, 4, apartment=self.apartment)
+        self.reservation.status = ReservationStatus.CANCELLED
+        self.reservation.save()
+        self.apartment.is_available = False
+        self.assertEqual(match_freed_stay(self.apartment, self.day, self.day + timedelta(days=5)), [])
+
+
+class WaitlistApiTests(APITestCase):
+    def setUp(self):
+        """Create a guest and an apartment."""
+        self.user = User.objects.create_user(
+            username='waitlistapi',
+            email='waitlistapi@example.com',
+            password='userpassword'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.apartment = Apartment.objects.create(
+            name='Waitlist API Apartment', description='-', address='3 Queue Street',
+            city='Lisbon', country='Portugal', price_per_night=Decimal('90.00'), max_guests=2
+        )
+        self.check_in = timezone.now().date() + timedelta(days=14)
+        self.url = reverse('waitlist:waitlist-entry-list')
+
+    def _join(self, **data):
+        payload = {
+            'check_in_date': self.check_in.isoformat(),
+            'check_out_date': (self.check_in + timedelta(days=3)).isoformat(),
+            **data
+        }
+        return self.client.post(self.url, payload, format='json')
+
+    def test_join_and_list(self):
+        """Guests can wait for an apartment and see only their own entries."""
+        response = self._join(apartment=str(self.apartment.id))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], WaitlistStatus.WAITING)
+        other = User.objects.create_user(username='otherwaiter', email='other@example.com', password='userpassword')
+        WaitlistEntry.objects.create(user=other, city='Lisbon', check_in_date=self.check_in,
+                                     check_out_date=self.check_in + timedelta(days=1))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['apartment_name'], 'Waitlist API Apartment')
+
+    def test_invalid_entries_are_rejected(self):
+        """An entry needs a target, a stay within the limit and a party the apartment can host."""
+        self.assertEqual(self._join().status_code, status.HTTP_400_BAD_REQUEST)
+        too_long = self._join(city='Lisbon', check_out_date=(self.check_in + timedelta(days=31)).isoformat())
+        self.assertEqual(too_long.status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = self._join(apartment=str(self.apartment.id), guests=3)
+        self.assertEqual(too_many.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(WaitlistEntry.objects.exists())
@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import WaitlistEntryViewSet
+
+app_name = 'waitlist'
+
+router = DefaultRouter()
+router.register(r'', WaitlistEntryViewSet, basename='waitlist-entry')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
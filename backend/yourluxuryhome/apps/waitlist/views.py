@@ -0,0 +1,21 @@
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from .models import WaitlistEntry
+from .serializers import WaitlistEntrySerializer
+
+
+class WaitlistEntryViewSet(mixins.CreateModelMixin,
+                           mixins.ListModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """The current user's waitlist entries; an entry is emailed when its dates free up."""
+    serializer_class = WaitlistEntrySerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return WaitlistEntry.objects.filter(user=self.request.user).select_related('apartment', 'matched_apartment')
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
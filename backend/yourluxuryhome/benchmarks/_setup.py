@@ -0,0 +1,48 @@
+"""
+Shared setup for the benchmark scripts.
+
+Benchmarks run against a throwaway test database so they never touch
+development data. Run them from the project directory, e.g.
+``python -m benchmarks.bench_booking``.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yourluxuryhome.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+
+@contextmanager
+def test_database():
+    """
+    Create a fresh test database for the duration of the block.
+    
+    SQLite test databases default to a shared in-memory database, whose table
+    locks fail immediately instead of waiting, so an on-disk file is used to
+    measure the same locking behaviour as a deployment.
+    """
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timed(label, operations):
+    """Print elapsed time and throughput for ``operations`` done inside the block."""
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {operations} ops in {elapsed:.3f}s ({operations / elapsed:,.1f} ops/s)")
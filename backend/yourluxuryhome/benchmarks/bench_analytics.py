@@ -0,0 +1,61 @@
+"""
+Latency of the performance report over a year of rollup data.
+
+Seeds ``--apartments`` apartments with a booked night on most days of one
+year, then times the report grouped by month, city and apartment, once for a
+month-aligned range (read from the monthly rollups) and once for an
+unaligned one (read from the daily rollups).
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks._setup import test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--apartments', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    from apps.analytics.models import ApartmentDailyStats
+    from apps.analytics.reports import performance_report
+    from apps.analytics.rollups import _rebuild_months
+    from apps.apartments.models import Apartment
+
+    with test_database():
+        start, end = date(2030, 1, 1), date(2031, 1, 1)
+        apartments = Apartment.objects.bulk_create([
+            Apartment(
+                name=f'Bench Apartment {i}', slug=f'bench-apartment-{i}', description='-', address='-',
+                city=f'City {i % 10}', country='Bench', price_per_night=100
+            )
+            for i in range(args.apartments)
+        ])
+        rows = [
+            ApartmentDailyStats(
+                apartment=apartment, date=start + timedelta(days=day),
+                month=(start + timedelta(days=day)).replace(day=1), city=apartment.city,
+                nights_sold=1, room_revenue=Decimal(random.randint(80, 300)), check_ins=int(day % 4 == 0)
+            )
+            for apartment in apartments
+            for day in range((end - start).days)
+            if random.random() < 0.7
+        ]
+        ApartmentDailyStats.objects.bulk_create(rows, batch_size=2000)
+        _rebuild_months(start, date(2030, 12, 1), None)
+        print(f'{len(rows):,} daily rollup rows for {args.apartments} apartments')
+
+        for group_by in ['month', 'city', 'apartment']:
+            with timed(f'calendar year (monthly rollups) grouped by {group_by}', args.repeat):
+                for _ in range(args.repeat):
+                    performance_report(start, end, group_by)
+            with timed(f'365 nights from Jan 2 (daily rollups) grouped by {group_by}', args.repeat):
+                for _ in range(args.repeat):
+                    performance_report(date(2030, 1, 2), date(2031, 1, 2), group_by)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Per-request cost of JWT authentication.
+
+Times ``authenticate()`` for one access token with simplejwt's stock
+``JWTAuthentication`` (one user query per request), with
+``CachedJWTAuthentication`` on an action that trusts token claims, and with
+``CachedJWTAuthentication`` reading the per-process user cache.
+"""
+import argparse
+
+from benchmarks._setup import test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.views import APIView
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from apps.users.authentication import CachedJWTAuthentication
+    from apps.users.models import User
+    from apps.users.serializers import CustomTokenObtainPairSerializer
+
+    class CatalogView(APIView):
+        action = 'list'
+        token_user_actions = ['list']
+
+    class ProfileView(APIView):
+        action = 'retrieve'
+
+    with test_database():
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        factory = APIRequestFactory()
+
+        def request_for(view):
+            return view().initialize_request(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+        cases = [
+            ('JWTAuthentication (user query)', JWTAuthentication(), ProfileView),
+            ('CachedJWTAuthentication, token claims', CachedJWTAuthentication(), CatalogView),
+            ('CachedJWTAuthentication, cached user', CachedJWTAuthentication(), ProfileView),
+        ]
+        for label, authenticator, view in cases:
+            request = request_for(view)
+            with timed(label, args.repeat):
+                for _ in range(args.repeat):
+                    authenticator.authenticate(request)
+
+
+if __name__ == '__main__':
+    main()
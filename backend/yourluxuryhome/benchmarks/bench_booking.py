@@ -0,0 +1,93 @@
+"""
+Reservation creation throughput under contention.
+
+Each round starts ``--threads`` workers that all try to book the same nights
+of one apartment (worst case: every request contends for one lock), then a
+round where every worker books its own apartment (no contention). Reports
+throughput and checks that each contended round has exactly one winner.
+"""
+import argparse
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+from benchmarks._setup import test_database, timed
+
+from django.db import connection
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def book(user, apartment, check_in, nights=3):
+    from apps.reservations.serializers import ReservationCreateSerializer
+
+    serializer = ReservationCreateSerializer(
+        data={
+            'apartment': str(apartment.pk),
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': (check_in + timedelta(days=nights)).isoformat(),
+            'guests': 1,
+        },
+        context={'request': SimpleNamespace(user=user)}
+    )
+    serializer.is_valid(raise_exception=True)
+    try:
+        serializer.save()
+        return True
+    except ValidationError:
+        return False
+
+
+def run_round(user, apartments, check_ins):
+    winners = []
+
+    def worker(apartment, check_in):
+        try:
+            winners.append(book(user, apartment, check_in))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker, args=args) for args in zip(apartments, check_ins)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return winners.count(True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    from apps.apartments.models import Apartment
+    from apps.users.models import User
+
+    with test_database():
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench-password')
+        apartments = [
+            Apartment.objects.create(
+                name=f'Bench Apartment {i}', description='-', address='-',
+                city='Bench', country='Bench', price_per_night=100
+            )
+            for i in range(args.threads)
+        ]
+        today = timezone.now().date()
+
+        total = args.threads * args.rounds
+        with timed('contended (same apartment, same dates)', total):
+            for round_number in range(args.rounds):
+                check_in = today + timedelta(days=1 + round_number * 5)
+                winners = run_round(user, [apartments[0]] * args.threads, [check_in] * args.threads)
+                assert winners == 1, f'round {round_number}: {winners} winners'
+
+        with timed('uncontended (one apartment per thread)', total):
+            for round_number in range(args.rounds):
+                check_in = today + timedelta(days=1 + (args.rounds + round_number) * 5)
+                winners = run_round(user, apartments, [check_in] * args.threads)
+                assert winners == args.threads, f'round {round_number}: {winners} winners'
+
+
+if __name__ == '__main__':
+    main()
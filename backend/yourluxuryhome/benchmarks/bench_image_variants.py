@@ -0,0 +1,47 @@
+"""
+Cost of building responsive variants and bytes a listing card downloads.
+
+Stores a noisy ``--width`` x ``3/4 --width`` camera-sized JPEG in a temporary
+media directory, builds its variants, and compares the original with the
+variants a 300-pixel card picks from the srcset at 1x and 2x density.
+"""
+import argparse
+import io
+import os
+import tempfile
+
+from benchmarks._setup import timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=4000)
+    args = parser.parse_args()
+
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import FileSystemStorage
+    from PIL import Image
+
+    from apps.common.images import build_variants, derived_name
+
+    storage = FileSystemStorage(location=tempfile.mkdtemp())
+    photo = Image.effect_noise((args.width, args.width * 3 // 4), 32).convert('RGB')
+    buffer = io.BytesIO()
+    photo.save(buffer, 'JPEG', quality=90)
+    name = storage.save('apartment_images/photo.jpg', ContentFile(buffer.getvalue()))
+
+    with timed(f'variants of {photo.width}x{photo.height}', 1):
+        manifest = build_variants(name, storage)
+
+    def size(path):
+        return os.path.getsize(storage.path(path))
+
+    print(f"widths: {manifest['widths']}")
+    print(f'original: {size(name) / 1024:,.0f} KiB')
+    for width in (320, 640):
+        for extension in manifest['formats']:
+            print(f"{width}w {extension}: {size(derived_name(name, f'w{width}', extension)) / 1024:,.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
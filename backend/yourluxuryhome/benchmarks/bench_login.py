@@ -0,0 +1,90 @@
+"""
+Login throughput through the full middleware stack.
+
+``--threads`` clients post to the login endpoint at once, first with
+``JWT_ONLY_LOGIN`` off (Django session created on every login, as before),
+then with it on. The last run sends as many concurrent requests from one event
+loop to the async login view, whose password checks run in the hashing pool.
+At most ``PASSWORD_HASHING_CONCURRENCY`` password checks run at once in every
+run, so with the default hasher its work factor dominates all three numbers.
+``--fast-hasher`` switches to MD5 to expose the rest of the request.
+"""
+import argparse
+import asyncio
+import threading
+
+from benchmarks._setup import test_database, timed
+
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+
+def run(url, email, password, threads, logins_per_thread):
+    failures = []
+
+    def worker():
+        client = Client()
+        try:
+            for _ in range(logins_per_thread):
+                response = client.post(url, {'email': email, 'password': password}, content_type='application/json')
+                if response.status_code != 200:
+                    failures.append(response.status_code)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert not failures, failures
+
+
+def run_async(url, email, password, clients, logins_per_client):
+    failures = []
+
+    async def client_loop():
+        client = AsyncClient()
+        for _ in range(logins_per_client):
+            response = await client.post(url, {'email': email, 'password': password}, content_type='application/json')
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    async def main():
+        await asyncio.gather(*(client_loop() for _ in range(clients)))
+
+    asyncio.run(main())
+    assert not failures, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--logins', type=int, default=4, help='Logins per thread')
+    parser.add_argument('--concurrency', type=int, default=4, help='PASSWORD_HASHING_CONCURRENCY')
+    parser.add_argument('--fast-hasher', action='store_true', help='Hash with MD5 instead of PBKDF2')
+    args = parser.parse_args()
+
+    from django.urls import reverse
+
+    from apps.users.models import User
+    from apps.users.views import AsyncLoginView, LoginView
+
+    hashers = {'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher']} if args.fast_hasher else {}
+    LoginView.throttle_classes = AsyncLoginView.throttle_classes = []
+    with test_database(), override_settings(PASSWORD_HASHING_CONCURRENCY=args.concurrency, **hashers):
+        User.objects.create_user(username='bench', email='bench@example.com', password='bench-password')
+        url = reverse('users:login')
+        total = args.threads * args.logins
+
+        for label, jwt_only in [('session login', False), ('JWT-only login', True)]:
+            with override_settings(JWT_ONLY_LOGIN=jwt_only):
+                with timed(label, total):
+                    run(url, 'bench@example.com', 'bench-password', args.threads, args.logins)
+        with timed('async JWT-only login', total):
+            run_async(reverse('users:login-async'), 'bench@example.com', 'bench-password', args.threads, args.logins)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Cost of tiling a panorama and bytes needed for a viewer's first paint.
+
+Tiles a noisy ``--width`` x ``--width / 2`` JPEG panorama into a temporary
+media directory, then compares the size of the original with the preview
+strip and with the smallest level's six face tiles.
+"""
+import argparse
+import io
+import os
+import tempfile
+
+from benchmarks._setup import timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--width', type=int, default=4096)
+    args = parser.parse_args()
+
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import FileSystemStorage
+    from PIL import Image
+
+    from apps.apartments.panoramas import build_tiles
+
+    storage = FileSystemStorage(location=tempfile.mkdtemp())
+    panorama = Image.effect_noise((args.width, args.width // 2), 64).convert('RGB')
+    buffer = io.BytesIO()
+    panorama.save(buffer, 'JPEG', quality=90)
+    name = storage.save('panoramas/room.jpg', ContentFile(buffer.getvalue()))
+
+    with timed(f'tile {args.width}x{args.width // 2}', 1):
+        manifest = build_tiles(name, storage=storage)
+
+    def size(path):
+        return os.path.getsize(storage.path(path))
+
+    base, first = manifest['base'], manifest['levels'][0]
+    first_level = sum(
+        size(f"{base}/{first['size']}/{face}_{x}_{y}.jpg")
+        for face in manifest['faces'] for x in range(first['tiles']) for y in range(first['tiles'])
+    )
+    print(f"levels: {[level['size'] for level in manifest['levels']]}")
+    print(f'original: {size(name) / 1024:,.0f} KiB')
+    print(f"preview strip: {size(base + '/preview.jpg') / 1024:,.0f} KiB")
+    print(f"level {first['size']}, all six faces: {first_level / 1024:,.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
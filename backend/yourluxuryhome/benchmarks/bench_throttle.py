@@ -0,0 +1,72 @@
+"""
+Throttle accuracy and throughput with several worker processes.
+
+Forks ``--processes`` workers that all check one throttle key, once with DRF's
+stock throttle (timestamps in the per-process cache) and once with the shared
+counter store. The accuracy round sends more requests than the limit and
+counts how many were admitted in total; the throughput round uses a limit
+that is never reached and reports throttle checks per second across all
+processes.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+
+os.environ['THROTTLE_STORE_PATH'] = os.path.join(tempfile.mkdtemp(), 'throttle.sqlite3')
+
+from benchmarks._setup import timed  # noqa: E402
+
+from rest_framework.throttling import SimpleRateThrottle  # noqa: E402
+
+from apps.common.throttling import SharedRateThrottleMixin  # noqa: E402
+
+
+class StockThrottle(SimpleRateThrottle):
+    def get_cache_key(self, request, view):
+        return 'bench'
+
+
+class SharedThrottle(SharedRateThrottleMixin, StockThrottle):
+    pass
+
+
+def admit(throttle_class, rate, attempts, results):
+    throttle_class.rate = rate
+    results.put(sum(throttle_class().allow_request(None, None) for _ in range(attempts)))
+
+
+def run(throttle_class, rate, processes, attempts):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=admit, args=(throttle_class, rate, attempts, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    admitted = sum(results.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    return admitted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--checks', type=int, default=2000, help='Throttle checks per process in the throughput round')
+    args = parser.parse_args()
+
+    from apps.common.ratelimit import counter_store
+
+    for label, throttle_class in [('stock', StockThrottle), ('shared', SharedThrottle)]:
+        counter_store().clear()
+        admitted = run(throttle_class, f'{args.limit}/hour', args.processes, args.limit * 2)
+        print(f'{label}: {admitted} of {args.processes * args.limit * 2} requests admitted (limit {args.limit})')
+
+    for label, throttle_class in [('stock', StockThrottle), ('shared', SharedThrottle)]:
+        counter_store().clear()
+        with timed(f'{label} throttle checks, {args.processes} processes', args.processes * args.checks):
+            run(throttle_class, '100000000/hour', args.processes, args.checks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Cost of the refresh token blacklist check against a large blacklist.
+
+Fills the outstanding and blacklisted token tables, then times
+``check_blacklist()`` for a live refresh token with simplejwt's stock
+``RefreshToken`` (one join query per check) and with ``apps.users.tokens``'
+``RefreshToken``, whose Bloom filter answers without the database.
+"""
+import argparse
+
+from benchmarks._setup import test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--blacklisted', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5000)
+    args = parser.parse_args()
+
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    from rest_framework_simplejwt.tokens import RefreshToken as StockRefreshToken
+
+    from apps.users.models import User
+    from apps.users.tokens import RefreshToken, blacklist_filter
+
+    with test_database():
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+        expires_at = timezone.now() + timedelta(days=7)
+        OutstandingToken.objects.bulk_create(
+            [OutstandingToken(user=user, jti=f'bench-{i}', token='', expires_at=expires_at)
+             for i in range(args.blacklisted)],
+            batch_size=5000
+        )
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id in OutstandingToken.objects.values_list('id', flat=True)],
+            batch_size=5000
+        )
+        # A blacklist this size builds up over days, not within the filter's sync overlap
+        BlacklistedToken.objects.update(blacklisted_at=timezone.now() - timedelta(days=1))
+        print(f'{args.blacklisted} blacklisted tokens')
+
+        with timed('filter build', 1):
+            blacklist_filter.sync()
+
+        for label, token_class in [('stock check_blacklist', StockRefreshToken),
+                                   ('filtered check_blacklist', RefreshToken)]:
+            token = token_class.for_user(user)
+            with timed(label, args.repeat):
+                for _ in range(args.repeat):
+                    token.check_blacklist()
+
+
+if __name__ == '__main__':
+    main()
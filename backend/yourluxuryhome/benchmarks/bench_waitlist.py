@@ -0,0 +1,63 @@
+"""
+Latency of waitlist matching for a cancelled stay.
+
+Seeds ``--entries`` waitlist entries spread over ``--apartments`` apartments
+in ten cities and a year of dates, half for a specific apartment and half for
+a city, then times ``match_freed_stay`` for week-long cancellations. With the
+bounded check-in range the cost follows the number of overlapping entries,
+not the size of the waitlist.
+"""
+import argparse
+import random
+from datetime import date, timedelta
+
+from benchmarks._setup import test_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--apartments', type=int, default=200)
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    from apps.apartments.models import Apartment
+    from apps.users.models import User
+    from apps.waitlist.matching import match_freed_stay
+    from apps.waitlist.models import MAX_WAITLIST_NIGHTS, WaitlistEntry
+
+    with test_database():
+        start = date.today() + timedelta(days=1)
+        user = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+        apartments = Apartment.objects.bulk_create([
+            Apartment(
+                name=f'Bench Apartment {i}', slug=f'bench-apartment-{i}', description='-', address='-',
+                city=f'City {i % 10}', country='Bench', price_per_night=100, max_guests=4
+            )
+            for i in range(args.apartments)
+        ])
+        entries = []
+        for i in range(args.entries):
+            apartment = random.choice(apartments)
+            check_in = start + timedelta(days=random.randrange(365))
+            entries.append(WaitlistEntry(
+                user=user,
+                apartment=apartment if i % 2 else None,
+                city='' if i % 2 else apartment.city,
+                guests=random.randint(1, 6),
+                check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=random.randint(1, MAX_WAITLIST_NIGHTS)),
+            ))
+        WaitlistEntry.objects.bulk_create(entries, batch_size=2000)
+        print(f'{args.entries:,} waitlist entries for {args.apartments} apartments')
+
+        matched = 0
+        with timed('match a cancelled week', args.repeat):
+            for _ in range(args.repeat):
+                check_in = start + timedelta(days=random.randrange(358))
+                matched += len(match_freed_stay(random.choice(apartments), check_in, check_in + timedelta(days=7)))
+        print(f'{matched / args.repeat:.1f} matching entries per cancellation')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    """Start every test with empty caches and throttle counters, so no state leaks between tests."""
+    from apps.users.tokens import blacklist_filter
+
+    cache.clear()
+    blacklist_filter.reset()
+    settings.THROTTLE_STORE_PATH = tmp_path / 'throttle.sqlite3'
+    yield
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'drf_yasg',
     'django_filters',
     'rest_framework_nested',
@@ -53,6 +54,10 @@ INSTALLED_APPS = [
     'apps.apartments',
     'apps.services',
     'apps.reservations',
+    'apps.tasks',
+    'apps.mailer',
+    'apps.analytics',
+    'apps.waitlist',
 ]
 
 MIDDLEWARE = [
@@ -94,6 +99,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction begins so concurrent
+            # writers queue up instead of racing between read and write
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -149,7 +159,7 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -162,8 +172,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'apps.common.throttling.AnonRateThrottle',
+        'apps.common.throttling.UserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',  # Limit anonymous users to 100 requests per day
@@ -175,6 +185,9 @@ REST_FRAMEWORK = {
     },
 }
 
+# SQLite file holding the throttle counters shared by all worker processes on the host
+THROTTLE_STORE_PATH = os.environ.get('THROTTLE_STORE_PATH', BASE_DIR / 'throttle.sqlite3')
+
 # JWT settings
 from datetime import timedelta
 
@@ -193,8 +206,26 @@ SIMPLE_JWT = {
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 
     'JTI_CLAIM': 'jti',
+
+    # Refresh tokens check the blacklist through apps.users.tokens.blacklist_filter
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.users.serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.users.serializers.CustomTokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'apps.users.serializers.CustomTokenBlacklistSerializer',
 }
 
+# Seconds an authenticated user stays in a process's user cache (see apps.users.authentication)
+USER_CACHE_TTL = 30
+
+# Seconds between top-ups of each process's token blacklist filter from the database
+TOKEN_BLACKLIST_FILTER_REFRESH = 1
+
+# LoginView issues JWTs without creating a Django session
+JWT_ONLY_LOGIN = True
+
+# Login password hashes run at once per process, and the size of the hashing
+# pool awaited by the async login view; further logins wait their turn
+PASSWORD_HASHING_CONCURRENCY = 4
+
 # Djoser settings
 DJOSER = {
     'PASSWORD_RESET_CONFIRM_URL': 'password/reset/confirm/{uid}/{token}',
@@ -207,6 +238,11 @@ DJOSER = {
         'current_user': 'apps.users.serializers.UserSerializer',
     },
     'LOGIN_FIELD': 'email',
+    'EMAIL': {
+        'activation': 'apps.users.email.ActivationEmail',
+        'confirmation': 'apps.users.email.ConfirmationEmail',
+        'password_reset': 'apps.users.email.PasswordResetEmail',
+    },
 }
 
 # CORS settings
@@ -222,7 +258,8 @@ CORS_ALLOW_METHODS = [
 ]
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Outgoing mail is stored in the outbox and delivered in batches by the task worker
+EMAIL_BACKEND = 'apps.mailer.backends.OutboxEmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'  # Update with your SMTP server
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -230,5 +267,27 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')  # Set in .env file
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')  # Set in .env file
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@yourluxuryhome.com')
 
+MAILER = {
+    'DELIVERY_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',  # Backend the outbox delivers through
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'TEMPLATE_VERSION': '1',  # Bump when email templates change to refresh pre-rendered copies
+}
+
 # Frontend URL for password reset links
 FRONTEND_URL = 'http://localhost:3000'  # Change in production
+
+# Seconds a pending reservation holds its dates before `release_expired_holds` frees them
+RESERVATION_HOLD_TTL = 30 * 60
+
+# Seconds a response to a request sent with an Idempotency-Key header is kept for replays
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+
+# Background task queue (run with `python manage.py run_worker`)
+TASK_QUEUE = {
+    'MAX_ATTEMPTS': 5,
+    'VISIBILITY_TIMEOUT': 300,  # Seconds before a task held by a crashed worker is retried
+    'RETRY_BACKOFF': 10,  # Seconds before the first retry, doubled on each attempt
+    'RETRY_BACKOFF_MAX': 3600,
+    'POLL_INTERVAL': 1.0,
+}
@@ -42,6 +42,8 @@ api_urlpatterns = [
     path('apartments/', include('apps.apartments.urls')),
     path('services/', include('apps.services.urls')),
     path('reservations/', include('apps.reservations.urls')),
+    path('analytics/', include('apps.analytics.urls')),
+    path('waitlist/', include('apps.waitlist.urls')),
 ]
 
 urlpatterns = [